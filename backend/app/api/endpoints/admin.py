@@ -0,0 +1,76 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from ...core.config import ADMIN_TOKEN, REANALYSIS_BATCH_SIZE, REANALYSIS_CONCURRENCY
+from ...db import crud
+from ...db.database import SessionalLocal
+from ...schemas import reanalysis as reanalysis_schema
+from ...services import reanalysis
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Lets a request through only with "X-Admin-Token: <ADMIN_TOKEN>". Without a
+    configured token the admin endpoints don't exist at all (404).
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or missing admin token.")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.post("/admin/reanalyze", response_model=reanalysis_schema.ReanalysisRun, status_code=status.HTTP_202_ACCEPTED)
+async def start_reanalysis(
+    restart: bool = False,
+    limit: Optional[int] = Query(None, ge=1),
+    batch_size: int = Query(REANALYSIS_BATCH_SIZE, ge=1, le=1000),
+    concurrency: int = Query(REANALYSIS_CONCURRENCY, ge=1, le=64),
+):
+    """
+    Starts re-analyzing every resume whose analysis is from an older prompt or
+    model (see `python -m app.cli reanalyze`), in the background of this worker.
+    An interrupted run is resumed instead of starting over, unless `restart=true`.
+
+    Returns 202 with the run right away. Follow it with GET /api/admin/reanalyze/{run_id}.
+    """
+    db = SessionalLocal()
+    try:
+        db_run = await run_in_threadpool(reanalysis.start_run, db, restart=restart)
+    except reanalysis.ReanalysisInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    finally:
+        db.close()
+    reanalysis.start_background(db_run.id, batch_size=batch_size, concurrency=concurrency, limit=limit)
+    return reanalysis.run_to_dict(db_run)
+
+
+@router.get("/admin/reanalyze", response_model=reanalysis_schema.ReanalysisRun)
+async def get_latest_reanalysis():
+    """The most recently started re-analysis run, with its progress and throughput."""
+    return await _run_or_404(None)
+
+
+@router.get("/admin/reanalyze/{run_id}", response_model=reanalysis_schema.ReanalysisRun)
+async def get_reanalysis(run_id: str):
+    """A re-analysis run's progress: resumes done, failed and left, throughput and ETA."""
+    return await _run_or_404(run_id)
+
+
+async def _run_or_404(run_id: Optional[str]) -> dict:
+    db = SessionalLocal()
+    try:
+        if run_id is None:
+            db_run = await run_in_threadpool(crud.get_latest_reanalysis_run, db)
+        else:
+            db_run = await run_in_threadpool(crud.get_reanalysis_run, db, run_id)
+        if db_run is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Re-analysis run not found")
+        return reanalysis.run_to_dict(db_run)
+    finally:
+        db.close()
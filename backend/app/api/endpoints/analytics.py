@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...db import analytics, crud
+from ...db.database import get_async_db
+from ...schemas import analytics as analytics_schema
+
+router = APIRouter()
+
+# All of these read the pre-aggregated 'analytics_counts' table (see db/analytics.py),
+# so they cost the same with a hundred resumes or a million.
+
+
+@router.get("/analytics/skills", response_model=analytics_schema.TopSkills)
+async def get_top_skills(limit: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_async_db)):
+    """The most common skills (core and soft) across all stored resumes."""
+    rows = await db.run_sync(analytics.top_skills, limit=limit)
+    return {
+        "total_resumes": await db.run_sync(crud.get_resume_count),
+        "skills": [{"skill": label, "count": count} for label, count in rows],
+    }
+
+
+@router.get("/analytics/ratings", response_model=analytics_schema.RatingHistogram)
+async def get_rating_histogram(db: AsyncSession = Depends(get_async_db)):
+    """How many resumes got each `resume_rating`, from 1 to 10."""
+    histogram = await db.run_sync(analytics.rating_histogram)
+    return {
+        "total_resumes": await db.run_sync(crud.get_resume_count),
+        "ratings": [{"rating": rating, "count": count} for rating, count in histogram.items()],
+    }
+
+
+@router.get("/analytics/upskill", response_model=analytics_schema.UpskillTrends)
+async def get_upskill_trends(
+    limit: int = Query(10, ge=1, le=100),
+    months: int = Query(12, ge=1, le=60),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    The most frequently suggested upskill areas, with how often each one was
+    suggested per month (by upload date) over the last `months` months.
+    """
+    return await db.run_sync(analytics.upskill_trends, limit=limit, months=months)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.config import JOB_EVENTS_POLL_SECONDS
+from ...db import crud
+from ...db.database import AsyncSessionLocal, get_async_db
+from ...schemas import job as job_schema
+from ...services.job_queue import job_queue, job_to_dict, FINAL_STATUSES
+
+router = APIRouter()
+
+
+def _format_sse(event: dict) -> str:
+    """Formats one event in the text/event-stream wire format."""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _event_from_row(db_job, last_status: str, last_stage: str):
+    """
+    The event a change in the persisted job row stands for (the same shapes the
+    job queue publishes), or None if nothing changed since the last event sent.
+    """
+    if db_job.status == "succeeded":
+        return {"event": "succeeded", "status": "succeeded", "resume_id": db_job.resume_id}
+    if db_job.status == "failed":
+        return {"event": "failed", "status": "failed", "error": db_job.error}
+    if db_job.stage and db_job.stage != last_stage:
+        return {"event": db_job.stage, "status": db_job.status, "stage": db_job.stage}
+    if db_job.status != last_status:
+        return {"event": db_job.status, "status": db_job.status}
+    return None
+
+
+@router.get("/jobs/{job_id}", response_model=job_schema.Job)
+async def get_job_status(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Returns the current status of an async upload job, for clients that poll.
+    Once `status` is "succeeded", `resume_id` points at the finished analysis.
+    """
+    db_job = await db.run_sync(crud.get_job, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Streams a job's progress as Server-Sent Events: one event per pipeline stage
+    (parsed, extracted, analyzed, saved) and a final "succeeded" or "failed" event.
+    The first event is always a snapshot of the job's current state.
+
+    Events are pushed by the job queue of the worker process running the job.
+    Under gunicorn that may not be the worker serving this stream, so whenever
+    no event arrives for JOB_EVENTS_POLL_SECONDS the job row is read from the
+    database instead, and the stream still ends once the job is finished. Stage
+    details (like page counts) only come with pushed events.
+    """
+    # Subscribe before reading the current state, so no event can slip through the gap.
+    events = job_queue.subscribe(job_id)
+    # A short-lived session, so no connection is held for the life of the stream.
+    async with AsyncSessionLocal() as db:
+        db_job = await db.run_sync(crud.get_job, job_id=job_id)
+    if db_job is None:
+        job_queue.unsubscribe(job_id, events)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    snapshot = jsonable_encoder(job_to_dict(db_job))
+    snapshot["event"] = "snapshot"
+
+    async def event_stream():
+        try:
+            yield _format_sse(snapshot)
+            if snapshot["status"] in FINAL_STATUSES:
+                return
+            last_status, last_stage = snapshot["status"], snapshot["stage"]
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=JOB_EVENTS_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    async with AsyncSessionLocal() as db:
+                        db_job = await db.run_sync(crud.get_job, job_id=job_id)
+                    if db_job is None:
+                        # Deleted while we were watching it.
+                        return
+                    event = _event_from_row(db_job, last_status, last_stage)
+                    if event is None:
+                        continue
+                last_status = event.get("status", last_status)
+                last_stage = event.get("stage", last_stage)
+                yield _format_sse(event)
+                if event.get("status") in FINAL_STATUSES:
+                    return
+        finally:
+            job_queue.unsubscribe(job_id, events)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from ...services.llm_governor import llm_governor
+
+router = APIRouter()
+
+
+@router.get("/llm/status")
+async def get_llm_status():
+    """
+    Shows the shared LLM limiter and circuit breaker: whether calls are
+    currently allowed, how much of the per-minute quota is left, and how many
+    calls this worker process has in flight.
+    """
+    return await run_in_threadpool(llm_governor.get_state)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import List
+
+from ...db import crud
+from ...db.database import get_db
+from ...schemas import matching as matching_schema
+from ...services.matching import match_index
+
+router = APIRouter()
+
+
+@router.post("/match", response_model=List[matching_schema.MatchResult])
+def match_resumes(request: matching_schema.MatchRequest, db: Session = Depends(get_db)):
+    """
+    Ranks every stored resume against a job description and returns the top K.
+    Scoring runs locally over an in-memory index (no LLM calls), mixing text
+    relevance over skills and experience with exact skill overlap.
+    """
+    # Picks up anything added or deleted since the last request (including by other workers).
+    match_index.sync(db)
+    ranked = match_index.rank(request.job_description, top_k=request.top_k)
+
+    summaries = {row.id: row for row in crud.get_resume_summaries_by_ids(db, [resume_id for resume_id, _, _ in ranked])}
+    results = []
+    for resume_id, score, matched_skills in ranked:
+        summary = summaries.get(resume_id)
+        if summary is None:
+            # Deleted between ranking and now.
+            continue
+        results.append({
+            "id": summary.id,
+            "filename": summary.filename,
+            "name": summary.name,
+            "email": summary.email,
+            "uploaded_at": summary.uploaded_at,
+            "score": round(score, 4),
+            "matched_skills": matched_skills,
+        })
+    return results
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+
+from ...core import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Prometheus scrape endpoint: per-stage pipeline timings, HTTP latency by route,
+    LLM call/retry counts and prompt/response sizes, PDF page counts and DB
+    statement times. Each response also carries the same stage timings for that
+    request in its `Server-Timing` header.
+    """
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
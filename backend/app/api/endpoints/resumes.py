@@ -1,74 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+import asyncio
+import base64
+import datetime
+import json
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from ...db import crud
-from ...db.database import get_db
+from ...core import metrics
+from ...db import crud, search
+from ...db.database import SessionalLocal, get_db, get_async_db
+from ...schemas import job as job_schema
 from ...schemas import resume as resume_schema
-from ...services import resume_parser
+from ...services import export, pipeline, resume_details, upload_storage
+from ...services.job_queue import job_queue, job_to_dict
+from ...services.llm_governor import LLMUnavailableError
+from ...services.matching import match_index
 
 router = APIRouter()
 
-# Set a max file size for uploads to prevent abuse. 5MB should be plenty for a PDF resume.
-MAX_FILE_SIZE_MB = 5
-MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+# Pipelines still running for streamed uploads. The event loop only keeps a weak
+# reference to a task, so without this one could be garbage-collected mid-run
+# once its client has disconnected.
+_background_tasks = set()
 
 
-@router.post("/upload", response_model=resume_schema.Resume)
-async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_db)):
+@router.post(
+    "/upload",
+    response_model=resume_schema.Resume,
+    responses={202: {"model": job_schema.Job, "description": "Accepted for background processing (async_mode=true)."}},
+)
+async def upload_resume(
+    file: UploadFile = File(...),
+    async_mode: bool = False,
+    mode: Optional[Literal["two_pass", "single_pass"]] = None,
+    db: Session = Depends(get_db),
+):
     """
     The main endpoint for uploading and analyzing a resume.
     It's a multi-step process:
-    1. Validate the file (PDF, size limit).
+    1. Validate the file (PDF, size limit) and check the result cache.
     2. Parse the PDF to raw text.
-    3. Make two calls to the Gemini LLM for extraction and analysis.
+    3. Call the Gemini LLM for extraction and analysis. By default that's two calls;
+       `mode=single_pass` does both in one structured-output call (PIPELINE_MODE
+       in the config sets the default).
     4. Save the results to the database.
     5. Return the complete analysis to the client.
+
+    Every slow step is awaited (PDF parsing and the DB write run in worker threads,
+    the LLM calls use the async Gemini client), so one upload never stalls the
+    other requests being served by this worker.
+
+    With `async_mode=true` the file is queued instead and the endpoint returns
+    202 Accepted with a job right away. Follow it with GET /api/jobs/{job_id}
+    or the SSE stream at GET /api/jobs/{job_id}/events.
     """
-    # First, basic validation. We only want PDF files.
-    if not file.filename.endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF is accepted.")
-    
-    try:
-        # Read the file content into memory.
-        file_content = await file.read()
+    upload = await _store_pdf_upload(file)
 
-        # Now, check if the file is too large.
-        if len(file_content) > MAX_FILE_SIZE_BYTES:
-            raise HTTPException(
-                status_code=413, # 413: Payload Too Large
-                detail=f"File size exceeds the limit of {MAX_FILE_SIZE_MB} MB."
+    try:
+        if async_mode:
+            # Hand the work (and the stored file) to the background job queue and answer immediately.
+            db_job = await job_queue.submit(upload, file.filename)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=jsonable_encoder(job_to_dict(db_job)),
+                headers={"Location": f"/api/jobs/{db_job.id}"},
             )
-        
-        # Step 1: Parse the PDF content to get plain text.
-        resume_text = resume_parser.parse_pdf_to_text(file_content)
-        if not resume_text.strip():
-            # This can happen if the PDF is just an image or is blank.
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF. The file might be empty or image-based.")
-
-        # Step 2: Use the LLM to pull out structured data like name, email, skills, etc.
-        extracted_data = resume_parser.call_gemini_for_extraction(resume_text)
-
-        # Step 3: Use the LLM again, this time for qualitative analysis and suggestions.
-        llm_analysis = resume_parser.call_gemini_for_analysis(extracted_data)
-
-        # Step 4: Bundle up all the data we want to save in the database.
-        resume_data_to_save = {
-            "filename": file.filename,
-            "name": extracted_data.get("name"),
-            "email": extracted_data.get("email"),
-            "phone": extracted_data.get("phone"),
-            "extracted_data": extracted_data,
-            "llm_analysis": llm_analysis
-        }
-
-        # Step 5: Pass the data to our CRUD function to create the DB record.
-        db_resume = crud.create_resume(db, resume_data=resume_data_to_save)
+
+        # Run the whole pipeline (cache, parsing, both LLM calls, saving) and return the saved record.
+        db_resume = await pipeline.analyze_resume(upload.path, upload.sha256, file.filename, db, mode=mode)
         return db_resume
 
+    except pipeline.UnreadablePDFError as e:
+        # This can happen if the PDF is just an image or is blank.
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         # This might happen if the LLM returns data in an unexpected format.
         raise HTTPException(status_code=500, detail=f"LLM processing error: {str(e)}")
+    except LLMUnavailableError as e:
+        # The LLM is rate limited, down (circuit open) or kept failing after retries.
+        # Tell the client when it's worth trying again, if we know.
+        headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}", headers=headers)
     except HTTPException as e:
         # If we raised an HTTPException ourselves, just let it pass through.
         # This prevents it from being caught by the generic Exception handler below.
@@ -77,27 +94,233 @@ async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_
         # This is a catch-all for other problems, like if the LLM service is down
         # and all our retries (from the decorator) have failed.
         raise HTTPException(status_code=503, detail=f"Service unavailable after multiple retries: {str(e)}")
+    finally:
+        # In async mode the job queue has already moved the file, so this is a no-op.
+        upload.cleanup()
+
+
+async def _store_pdf_upload(file: UploadFile) -> upload_storage.StoredUpload:
+    """Validates the upload and copies it to disk, turning problems into 400/413 errors."""
+    # First, basic validation. We only want PDF files.
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF is accepted.")
+
+    try:
+        # Copy the upload to disk in chunks. This enforces the size limit and checks
+        # the PDF signature as the bytes arrive, and hashes the file on the way.
+        with metrics.timed("upload_read"):
+            return await upload_storage.store_upload(file)
+    except upload_storage.UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) # 413: Payload Too Large
+    except upload_storage.NotAPDFError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Formats one event in the text/event-stream wire format."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.post("/upload/stream")
+async def upload_resume_stream(
+    file: UploadFile = File(...),
+    mode: Optional[Literal["two_pass", "single_pass"]] = None,
+):
+    """
+    Same analysis as POST /upload, but the response is a Server-Sent Events stream
+    so the UI can render each part as soon as it's ready instead of waiting for
+    the whole pipeline:
+
+    - "parsed": the PDF text was extracted (page counts included).
+    - "extracted": the structured resume data (`extracted_data`), usually well
+      before the analysis is done in the default two-pass mode.
+    - "analyzed": the LLM analysis finished.
+    - "saved": the complete resume record, same shape as the /upload response.
+    - "error": something went wrong (`status_code` and `detail` like an HTTP error).
+
+    Validation problems (not a PDF, too large) are still plain 400/413 responses.
+    """
+    upload = await _store_pdf_upload(file)
+    events = asyncio.Queue()
+
+    async def on_stage(stage: str, **details):
+        await events.put((stage, details))
+
+    async def run_pipeline():
+        # The request's own session is gone once the response starts streaming,
+        # so the pipeline gets a session of its own.
+        db = SessionalLocal()
+        try:
+            db_resume = await pipeline.analyze_resume(upload.path, upload.sha256, file.filename, db, on_stage=on_stage, mode=mode)
+            await events.put(("resume", resume_details.resume_to_dict(db_resume)))
+        except pipeline.UnreadablePDFError as e:
+            await events.put(("error", {"status_code": 400, "detail": str(e)}))
+        except ValueError as e:
+            await events.put(("error", {"status_code": 500, "detail": f"LLM processing error: {str(e)}"}))
+        except LLMUnavailableError as e:
+            await events.put(("error", {"status_code": 503, "detail": f"Service unavailable: {str(e)}", "retry_after": e.retry_after}))
+        except Exception as e:
+            await events.put(("error", {"status_code": 503, "detail": f"Service unavailable after multiple retries: {str(e)}"}))
+        finally:
+            db.close()
+            upload.cleanup()
+
+    async def event_stream():
+        # If the client disconnects early the pipeline still runs to the end, so the
+        # analysis lands in the history instead of wasting the LLM calls.
+        task = asyncio.create_task(run_pipeline())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        while True:
+            event, data = await events.get()
+            if event == "saved":
+                # Held back until the full record arrives, which follows right after.
+                continue
+            if event == "resume":
+                yield _format_sse("saved", data)
+                return
+            yield _format_sse(event, data)
+            if event == "error":
+                return
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _encode_cursor(uploaded_at: datetime.datetime, resume_id: int) -> str:
+    """Packs the (uploaded_at, id) of a row into an opaque, URL-safe cursor string."""
+    raw = f"{uploaded_at.isoformat()}|{resume_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        uploaded_at, resume_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.datetime.fromisoformat(uploaded_at), int(resume_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
 
 
 @router.get("/resumes", response_model=List[resume_schema.ResumeSummary])
-def get_all_resumes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_all_resumes(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Fetches a summary of all previously analyzed resumes for the "History" tab.
+
+    For fast paging through a long history, pass the `X-Next-Cursor` response
+    header back as `cursor` to get the next page. It is only set when there may
+    be more rows. With `include_total=true` the `X-Total-Count` header carries
+    the total number of resumes, read from a counter rather than a table scan.
+
+    Uses the async session, so the query doesn't hold a worker thread while it waits.
     """
-    resumes = crud.get_resumes(db, skip=skip, limit=limit)
+    resumes = await db.run_sync(
+        crud.get_resumes,
+        skip=skip,
+        limit=limit,
+        cursor=_decode_cursor(cursor) if cursor else None,
+    )
+    if len(resumes) == limit:
+        last = resumes[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.uploaded_at, last.id)
+    if include_total:
+        response.headers["X-Total-Count"] = str(await db.run_sync(crud.get_resume_count))
     return resumes
 
 
+# Declared before /resumes/{resume_id} so "export" isn't taken for an ID.
+@router.get("/resumes/export")
+def export_resumes(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    fields: Optional[str] = None,
+    min_rating: Optional[int] = Query(None, ge=0, le=10),
+    skill: Optional[str] = Query(None, min_length=1, max_length=100),
+):
+    """
+    Downloads every stored analysis in one streamed response, oldest first:
+
+    - `format=ndjson` (default): one full resume record per line.
+    - `format=csv`: one flattened row per resume (rating, skills, most recent
+      experience, upskill suggestions).
+    - `format=parquet`: the same flattened columns as a Parquet file (needs pyarrow).
+
+    `since` / `until` limit the upload time (`since <= uploaded_at < until`),
+    `min_rating` and `skill` filter on the analysis, and `fields` is a
+    comma-separated list of the fields to include.
+
+    Rows are streamed from a database cursor in batches, so the export uses
+    the same small amount of memory whether there are ten resumes or a million.
+    """
+    selected = None
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in export.fields_for(format)]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s) for {format}: {', '.join(unknown)}. Available: {', '.join(export.fields_for(format))}.",
+            )
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export needs the 'pyarrow' package on the server.")
+
+    media_type, extension = export.EXPORT_FORMATS[format]
+    body = export.stream_export(format, fields=selected, since=since, until=until, min_rating=min_rating, skill=skill)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="resumes-{datetime.date.today().isoformat()}.{extension}"'},
+    )
+
+
+# Declared before /resumes/{resume_id} so "search" isn't taken for an ID.
+@router.get("/resumes/search", response_model=List[resume_schema.ResumeSearchResult])
+def search_resumes(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Full-text search over stored resumes (name, email, summary, skills and
+    experience), best matches first. Every word in `q` must match, and the
+    last word also matches as a prefix.
+    """
+    if not search.is_search_available(db):
+        raise HTTPException(status_code=501, detail="Full-text search is only available with the SQLite backend.")
+    return search.search_resumes(db, q, skip=skip, limit=limit)
+
+
 @router.get("/resumes/{resume_id}", response_model=resume_schema.Resume)
-def get_resume_details(resume_id: int, db: Session = Depends(get_db)):
+async def get_resume_details(resume_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Fetches the full, detailed analysis for a single resume by its ID.
     Used when the user clicks "View Details" on a resume in the history.
+
+    Recently viewed resumes are answered from memory, already serialized. The
+    response carries `ETag` and `Last-Modified`, and a conditional request
+    (`If-None-Match` / `If-Modified-Since`) for an unchanged resume gets an
+    empty 304 Not Modified.
     """
-    db_resume = crud.get_resume(db, resume_id=resume_id)
-    if db_resume is None:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    return db_resume
+    rendered = resume_details.get_cached(resume_id)
+    if rendered is None:
+        db_resume = await db.run_sync(crud.get_resume, resume_id=resume_id)
+        if db_resume is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        rendered = resume_details.render(db_resume)
+
+    if resume_details.is_not_modified(request.headers, rendered):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=rendered.headers)
+    return Response(content=rendered.body, media_type="application/json", headers=rendered.headers)
 
 @router.delete("/resumes/{resume_id}", status_code=status.HTTP_200_OK)
 def delete_resume_entry(resume_id: int, db: Session = Depends(get_db)):
@@ -108,4 +331,6 @@ def delete_resume_entry(resume_id: int, db: Session = Depends(get_db)):
     if deleted_resume is None:
         # Can't delete something that doesn't exist.
         raise HTTPException(status_code=404, detail="Resume not found")
+    match_index.resume_deleted(resume_id)
+    resume_details.invalidate(resume_id)
     return {"ok": True, "message": f"Resume '{deleted_resume.filename}' deleted successfully."}
\ No newline at end of file
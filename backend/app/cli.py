@@ -0,0 +1,151 @@
+"""
+Maintenance commands for the Resume Analyzer backend.
+
+Run them from the `backend` folder, e.g.:
+
+    python -m app.cli rebuild-search-index  # backfill or repair the full-text search index
+    python -m app.cli analytics rebuild     # recount the analytics tables from scratch
+    python -m app.cli analytics check       # compare them with a fresh recount
+    python -m app.cli reanalyze             # re-run the analysis on resumes from an older prompt/model
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from .core.config import REANALYSIS_BATCH_SIZE, REANALYSIS_CONCURRENCY
+from .db import analytics, crud, search
+from .db.database import engine, SessionalLocal
+from .db.schema import init_db
+
+
+def rebuild_search_index(args) -> int:
+    """Backfills (or repairs) the full-text search index from the resumes table."""
+    search.create_search_index(engine)
+    db = SessionalLocal()
+    try:
+        indexed = search.rebuild_search_index(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Indexed {indexed} resumes.")
+    return 0
+
+
+def analytics_rebuild(args) -> int:
+    db = SessionalLocal()
+    try:
+        started = time.perf_counter()
+        written = analytics.rebuild(db, batch_size=args.batch_size)
+        print(f"Rebuilt the analytics tables: {written} counters in {time.perf_counter() - started:.1f}s.")
+        return 0
+    finally:
+        db.close()
+
+
+def analytics_check(args) -> int:
+    db = SessionalLocal()
+    try:
+        differences = analytics.check(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    if not differences:
+        print("The analytics tables match the resumes.")
+        return 0
+    print(f"{len(differences)} counter(s) differ from a fresh recount:")
+    for difference in differences[:args.show]:
+        print(f"  {difference['metric']:<8} {difference['bucket']:<8} {difference['key']!r}: "
+              f"stored {difference['stored']}, expected {difference['expected']}")
+    if len(differences) > args.show:
+        print(f"  ... and {len(differences) - args.show} more")
+    print("Run `python -m app.cli analytics rebuild` to fix them.")
+    return 1
+
+
+def _print_progress(run: dict):
+    line = f"  {run['processed'] + run['failed']}/{run['total']} resumes ({run['failed']} failed)"
+    if run["throughput_per_second"]:
+        line += f", {run['throughput_per_second']:.1f}/s"
+    if run["eta_seconds"] is not None:
+        line += f", about {run['eta_seconds'] / 60:.0f} min left"
+    print(line, flush=True)
+
+
+def reanalyze(args) -> int:
+    # Imported here: it loads the LLM provider, which the analytics commands don't need.
+    from .services import reanalysis, resume_parser
+
+    db = SessionalLocal()
+    try:
+        if args.status:
+            db_run = crud.get_latest_reanalysis_run(db)
+            if db_run is None:
+                print("No re-analysis has been run yet.")
+            else:
+                print(reanalysis.run_to_dict(db_run))
+            stale = crud.count_stale_resumes(db, resume_parser.ANALYSIS_VERSION)
+            print(f"{stale} resume(s) have an analysis older than the current version ({resume_parser.ANALYSIS_VERSION}).")
+            return 0
+        try:
+            db_run = reanalysis.start_run(db, restart=args.restart)
+        except reanalysis.ReanalysisInProgressError as e:
+            print(e)
+            return 1
+    finally:
+        db.close()
+
+    resumed = db_run.processed + db_run.failed
+    print(f"{'Resuming' if resumed else 'Starting'} re-analysis run {db_run.id} to version {db_run.target_version}: "
+          f"{db_run.total - resumed} of {db_run.total} stale resume(s) left.")
+    try:
+        result = asyncio.run(reanalysis.run(
+            db_run.id, batch_size=args.batch_size, concurrency=args.concurrency, limit=args.limit, on_progress=_print_progress,
+        ))
+    except KeyboardInterrupt:
+        print("Interrupted. Run the same command again to carry on from the last saved batch.")
+        return 130
+    print(f"Run {result['id']} {result['status']}: {result['processed']} re-analyzed, {result['failed']} failed, "
+          f"{result['throughput_per_second'] or 0:.1f} resumes/s.")
+    if result["error"]:
+        print(f"Last error: {result['error']}")
+    if result["status"] == "paused":
+        print("Run the same command again to carry on.")
+    return 0 if result["failed"] == 0 else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = commands.add_parser("rebuild-search-index", help=rebuild_search_index.__doc__)
+    search_parser.add_argument("--batch-size", type=int, default=1000)
+    search_parser.set_defaults(handler=rebuild_search_index)
+
+    analytics_parser = commands.add_parser("analytics", help="Maintain the pre-aggregated analytics tables.")
+    analytics_commands = analytics_parser.add_subparsers(dest="action", required=True)
+    rebuild_parser = analytics_commands.add_parser("rebuild", help="Recount everything from the resumes table (backfill or repair).")
+    rebuild_parser.add_argument("--batch-size", type=int, default=1000)
+    rebuild_parser.set_defaults(handler=analytics_rebuild)
+    check_parser = analytics_commands.add_parser("check", help="Compare the stored counts with a fresh recount (exit code 1 if they differ).")
+    check_parser.add_argument("--batch-size", type=int, default=1000)
+    check_parser.add_argument("--show", type=int, default=20, help="How many differences to print.")
+    check_parser.set_defaults(handler=analytics_check)
+
+    reanalyze_parser = commands.add_parser(
+        "reanalyze",
+        help="Re-run the analysis on every resume analyzed with an older prompt or model. Resumes an interrupted run.",
+    )
+    reanalyze_parser.add_argument("--batch-size", type=int, default=REANALYSIS_BATCH_SIZE, help="Resumes per transaction and checkpoint.")
+    reanalyze_parser.add_argument("--concurrency", type=int, default=REANALYSIS_CONCURRENCY, help="Analysis calls in flight at once.")
+    reanalyze_parser.add_argument("--limit", type=int, default=None, help="Stop (pause) after this many resumes.")
+    reanalyze_parser.add_argument("--restart", action="store_true", help="Start over instead of resuming an interrupted run.")
+    reanalyze_parser.add_argument("--status", action="store_true", help="Only show the latest run and how many resumes are stale.")
+    reanalyze_parser.set_defaults(handler=reanalyze)
+
+    args = parser.parse_args(argv)
+    # Make sure the tables and columns exist, in case the API has never been started on this database.
+    init_db(check_analytics=False)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
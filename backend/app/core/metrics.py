@@ -0,0 +1,123 @@
+import contextlib
+import contextvars
+import os
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+# --- Metric Definitions ---
+# Exported in the Prometheus text format on GET /metrics. Under gunicorn, set
+# PROMETHEUS_MULTIPROC_DIR so every worker process writes to a shared folder and
+# /metrics reports the sum over all of them.
+
+# Latency buckets in seconds, from a fast cache hit up to a slow LLM call with retries.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+
+STAGE_SECONDS = Histogram(
+    "resume_stage_seconds",
+    "Time spent in each step of handling a resume (upload read, PDF parsing, LLM calls, DB save, ...).",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "HTTP request latency by route template, method and status code.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_CALLS = Counter("llm_calls_total", "LLM calls by task and outcome (ok, transient_error).", ["task", "outcome"])
+LLM_RETRIES = Counter("llm_retries_total", "LLM calls retried after a transient error, by function.", ["function"])
+LLM_PROMPT_CHARS = Histogram("llm_prompt_chars", "Size of the prompts sent to the LLM, in characters.", ["task"], buckets=SIZE_BUCKETS)
+LLM_RESPONSE_CHARS = Histogram("llm_response_chars", "Size of the LLM's replies, in characters.", ["task"], buckets=SIZE_BUCKETS)
+PDF_PAGES = Histogram("pdf_pages", "Pages per uploaded PDF.", buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+DB_QUERY_SECONDS = Histogram("db_query_seconds", "Database statement time by statement type.", ["operation"], buckets=LATENCY_BUCKETS)
+
+
+# --- Per-request Timings (Server-Timing) ---
+# The middleware puts a fresh dict here for every request: name -> [total ms, count].
+# Context variables follow the request into `run_in_threadpool` calls, so timings
+# recorded in worker threads (DB queries, PDF work) land in the right request too.
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> dict:
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def add_request_timing(name: str, seconds: float):
+    """Adds a duration to the current request's Server-Timing header (no-op outside a request)."""
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(name, [0.0, 0])
+        entry[0] += seconds * 1000
+        entry[1] += 1
+
+
+def format_server_timing(timings: dict) -> str:
+    """Renders timings as a Server-Timing header value, e.g. `db;dur=3.1;desc="4 calls"`."""
+    parts = []
+    for name, (total_ms, count) in timings.items():
+        part = f"{name};dur={total_ms:.1f}"
+        if count > 1:
+            part += f';desc="{count} calls"'
+        parts.append(part)
+    return ", ".join(parts)
+
+
+@contextlib.contextmanager
+def timed(stage: str):
+    """
+    Times a block as a pipeline stage: observed in the `resume_stage_seconds`
+    histogram and added to the current request's Server-Timing header.
+    Works in both regular and `async` code (`with timed("pdf_parse"): ...`).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        add_request_timing(stage, elapsed)
+
+
+def record_stage(stage: str, seconds: float):
+    """Records a stage duration that was measured elsewhere (e.g. a retry sleep)."""
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    add_request_timing(stage, seconds)
+
+
+# --- Database Query Timing ---
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return keyword if keyword in ("select", "insert", "update", "delete", "with", "pragma") else "other"
+
+
+def instrument_engine(engine):
+    """Times every statement run on `engine` (histogram plus a "db" Server-Timing entry)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        DB_QUERY_SECONDS.labels(operation=_operation(statement)).observe(elapsed)
+        add_request_timing("db", elapsed)
+
+
+# --- Exposition ---
+
+def render_latest() -> tuple:
+    """Returns (body, content type) for the /metrics endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,164 @@
+import json
+import secrets
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+
+from . import metrics
+from .profiling import SamplingProfiler, profile_path
+
+
+class MaxBodySizeMiddleware:
+    """
+    Rejects request bodies larger than `max_body_bytes` on the given paths
+    with a 413, *while they are still arriving*.
+
+    Framework-level form parsing reads (and buffers) the whole body before our
+    endpoint runs, so checking the size inside the endpoint is too late for an
+    oversized or slow-loris upload. This pure ASGI middleware checks the
+    Content-Length header up front and also counts the bytes as they stream in,
+    which covers chunked requests that don't send a length.
+    """
+
+    def __init__(self, app, max_body_bytes: int, paths: tuple, detail: str = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = paths
+        self.detail = detail or f"Request body exceeds the limit of {max_body_bytes} bytes."
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        too_large = HTTPException(status_code=413, detail=self.detail)
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            await self._send_413(send, too_large.detail)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside the app, so FastAPI turns it into a normal 413 response.
+                    raise too_large
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _send_413(self, send, detail: str):
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+
+def _route_label(scope) -> str:
+    """
+    The matched route's template with the router prefix put back, e.g.
+    "/api/resumes/{resume_id}". Unmatched paths (404s) share one label so
+    random URLs can't create new metric series.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Included routers only know their own part of the path, so take the prefix
+    # from the real path: everything before the segments the template accounts for.
+    path_segments = scope["path"].rstrip("/").split("/")
+    template_segments = template.rstrip("/").split("/")
+    prefix = "/".join(path_segments[: max(1, len(path_segments) - len(template_segments) + 1)])
+    return prefix + template
+
+
+class ServerTimingMiddleware:
+    """
+    Times every HTTP request. The duration goes into the `http_request_seconds`
+    histogram (labelled with the route template, so /api/resumes/1 and
+    /api/resumes/2 share a series), and the response gets a `Server-Timing`
+    header with the request total plus every stage recorded while handling it
+    (see `metrics.timed`), which browser dev tools show in the network panel.
+
+    For streaming responses the header goes out before the body, so it only
+    covers the work done up to that point.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = metrics.start_request_timings()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                metrics.add_request_timing("total", time.perf_counter() - started)
+                MutableHeaders(scope=message).append("Server-Timing", metrics.format_server_timing(timings))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"],
+                route=_route_label(scope),
+                status=str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+class ProfilerMiddleware:
+    """
+    The per-request profiling hook. A request carrying `X-Profile: <token>` runs
+    under a `SamplingProfiler`, and the folded stacks are saved to a file whose
+    path comes back in the `X-Profile-File` response header. Requests without the
+    header (or with the wrong token) pass straight through at no cost.
+    """
+
+    def __init__(self, app, token: str):
+        self.app = app
+        self.token = token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.token:
+            await self.app(scope, receive, send)
+            return
+        requested = Headers(scope=scope).get("x-profile")
+        if requested is None or not secrets.compare_digest(requested, self.token):
+            await self.app(scope, receive, send)
+            return
+
+        path = profile_path(scope["path"])
+
+        async def send_with_profile_path(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-File", path)
+            await send(message)
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_path)
+        finally:
+            profiler.stop()
+            await run_in_threadpool(profiler.save, path)
+            print(f"Saved a profile of {scope['method']} {scope['path']} ({profiler.sample_count} samples) to {path}")
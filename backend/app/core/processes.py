@@ -0,0 +1,19 @@
+import os
+
+
+def pid_is_alive(pid: int) -> bool:
+    """
+    Checks whether a process with this PID still exists on this machine.
+    Used to tell a job or re-analysis run whose worker crashed from one that
+    another worker is still busy with.
+    """
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # It exists, it just isn't ours.
+        return True
+    return True
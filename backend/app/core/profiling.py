@@ -0,0 +1,71 @@
+import collections
+import os
+import sys
+import threading
+import time
+
+from .config import PROFILER_INTERVAL_MS, PROFILER_OUTPUT_DIR
+
+
+class SamplingProfiler:
+    """
+    A tiny stdlib-only sampling profiler for capturing hot stacks in production.
+
+    While running, a background thread wakes up every `interval_ms` and records
+    the current stack of every other thread (`sys._current_frames()`). Nothing
+    is traced in between, so the overhead stays low and bounded by the interval.
+
+    The result is written in the "folded stacks" format (one line per unique
+    stack, frames separated by ";", then the sample count), which flamegraph.pl,
+    speedscope and similar tools read directly.
+
+    The event loop thread runs every request's coroutines, so a profile taken
+    during one request also shows whatever else the worker was doing at the time.
+    """
+
+    def __init__(self, interval_ms: float = PROFILER_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.samples = collections.Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def save(self, path: str):
+        """Writes the folded stacks to `path` (see `profile_path`)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+
+def profile_path(label: str) -> str:
+    """A new, unique-enough file name in PROFILER_OUTPUT_DIR for a profile of `label` (e.g. a URL path)."""
+    safe_label = "".join(ch if ch.isalnum() else "_" for ch in label).strip("_") or "root"
+    return os.path.join(PROFILER_OUTPUT_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{safe_label}.folded")
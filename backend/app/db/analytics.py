@@ -0,0 +1,267 @@
+import collections
+import datetime
+import re
+
+from sqlalchemy import delete, text, tuple_
+from sqlalchemy.orm import Session
+
+from . import models
+
+# The aggregates behind the /api/analytics endpoints, kept in 'analytics_counts'.
+# Each resume adds 1 to every skill it lists, to its rating and to each upskill
+# suggestion, both in the all-time bucket ("") and in the bucket for the month it
+# was uploaded. Deleting it subtracts the same counts again. The dashboards then
+# only read a few small rows instead of every JSON blob in 'resumes'.
+
+ALL_TIME = ""
+RATINGS = range(1, 11)
+
+_RATING_RE = re.compile(r"\s*(\d+)")
+# "Kubernetes: the standard for..." or "Kubernetes - because..." -> "Kubernetes"
+_SUGGESTION_SPLIT_RE = re.compile(r"\s*(?::|\s[-–—]\s)\s*")
+_MAX_SUGGESTION_NAME = 60
+
+
+def normalize(value) -> str:
+    """Case- and whitespace-insensitive key, so "Machine  Learning" and "machine learning" count together."""
+    return " ".join(str(value).split()).casefold()
+
+
+def parse_rating(value):
+    """The rating as an int. The LLM sometimes answers "7" or "7/10" instead of 7."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _RATING_RE.match(str(value or ""))
+    return int(match.group(1)) if match else None
+
+
+def suggestion_name(item) -> str:
+    """
+    The skill an upskill suggestion is about. Suggestions come back as
+    {"skill": ..., "reason": ...} objects or as strings with the reason after a
+    colon or dash.
+    """
+    if isinstance(item, dict):
+        return str(item.get("skill") or item.get("name") or next(iter(item.values()), ""))
+    head = _SUGGESTION_SPLIT_RE.split(str(item), maxsplit=1)[0].strip()
+    return head[:_MAX_SUGGESTION_NAME]
+
+
+def resume_counts(uploaded_at, extracted_data, llm_analysis) -> dict:
+    """Everything one resume counts towards, as {(metric, bucket, key): label}."""
+    extracted_data = extracted_data if isinstance(extracted_data, dict) else {}
+    llm_analysis = llm_analysis if isinstance(llm_analysis, dict) else {}
+
+    # (metric, key) -> label. A skill listed twice still counts once per resume.
+    values = {}
+    for skill in (extracted_data.get("core_skills") or []) + (extracted_data.get("soft_skills") or []):
+        if normalize(skill):
+            values.setdefault(("skill", normalize(skill)), " ".join(str(skill).split()))
+    rating = parse_rating(llm_analysis.get("resume_rating"))
+    if rating in RATINGS:
+        values[("rating", str(rating))] = str(rating)
+    for item in llm_analysis.get("upskill_suggestions") or []:
+        name = suggestion_name(item)
+        if normalize(name):
+            values.setdefault(("upskill", normalize(name)), name)
+
+    month = uploaded_at.strftime("%Y-%m") if uploaded_at else None
+    counts = {}
+    for (metric, key), label in values.items():
+        counts[(metric, ALL_TIME, key)] = label
+        if month:
+            counts[(metric, month, key)] = label
+    return counts
+
+
+def _insert(db: Session):
+    """INSERT ... ON CONFLICT for the current database (SQLite and Postgres spell it the same way)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(models.AnalyticsCount.__table__)
+
+
+def _apply(db: Session, counts: dict, delta: int):
+    """Adds `delta` to every counter in `counts` (an upsert), inside the caller's transaction."""
+    if not counts:
+        return
+    table = models.AnalyticsCount.__table__
+    statement = _insert(db).values([
+        {"metric": metric, "bucket": bucket, "key": key, "label": label, "count": delta}
+        for (metric, bucket, key), label in counts.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=["metric", "bucket", "key"],
+        set_={"count": table.c.count + statement.excluded.count},
+    )
+    db.execute(statement)
+    if delta < 0:
+        # Drop counters that reached zero, so "top N" lists never show them.
+        db.execute(
+            delete(table)
+            .where(tuple_(table.c.metric, table.c.bucket, table.c.key).in_(list(counts)))
+            .where(table.c.count <= 0)
+        )
+
+
+def add_resume(db: Session, db_resume: models.Resume):
+    """Counts a new resume inside the caller's transaction. The resume must already be flushed."""
+    _apply(db, resume_counts(db_resume.uploaded_at, db_resume.extracted_data, db_resume.llm_analysis), +1)
+
+
+def remove_resume(db: Session, db_resume: models.Resume):
+    """Un-counts a resume that is being deleted, inside the caller's transaction."""
+    _apply(db, resume_counts(db_resume.uploaded_at, db_resume.extracted_data, db_resume.llm_analysis), -1)
+
+
+# --- Queries ---
+
+def top_skills(db: Session, limit: int = 20) -> list:
+    """The most common skills across all resumes, as (label, count), most common first."""
+    return (
+        db.query(models.AnalyticsCount.label, models.AnalyticsCount.count)
+        .filter(models.AnalyticsCount.metric == "skill", models.AnalyticsCount.bucket == ALL_TIME)
+        .order_by(models.AnalyticsCount.count.desc(), models.AnalyticsCount.key)
+        .limit(limit)
+        .all()
+    )
+
+
+def rating_histogram(db: Session) -> dict:
+    """{rating: number of resumes} for every rating from 1 to 10 (zeros included)."""
+    rows = (
+        db.query(models.AnalyticsCount.key, models.AnalyticsCount.count)
+        .filter(models.AnalyticsCount.metric == "rating", models.AnalyticsCount.bucket == ALL_TIME)
+        .all()
+    )
+    histogram = {rating: 0 for rating in RATINGS}
+    for key, count in rows:
+        histogram[int(key)] = count
+    return histogram
+
+
+def recent_months(months: int, today: datetime.date = None) -> list:
+    """The last `months` month buckets, oldest first, ending with the current month."""
+    today = today or datetime.datetime.utcnow().date()
+    year, month = today.year, today.month
+    buckets = []
+    for _ in range(months):
+        buckets.append(f"{year:04d}-{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return list(reversed(buckets))
+
+
+def upskill_trends(db: Session, limit: int = 10, months: int = 12) -> dict:
+    """
+    The `limit` most suggested upskill areas of all time, each with its count per
+    month over the last `months` months.
+    """
+    top = (
+        db.query(models.AnalyticsCount.key, models.AnalyticsCount.label, models.AnalyticsCount.count)
+        .filter(models.AnalyticsCount.metric == "upskill", models.AnalyticsCount.bucket == ALL_TIME)
+        .order_by(models.AnalyticsCount.count.desc(), models.AnalyticsCount.key)
+        .limit(limit)
+        .all()
+    )
+    buckets = recent_months(months)
+    by_month = collections.defaultdict(dict)
+    if top:
+        rows = (
+            db.query(models.AnalyticsCount.key, models.AnalyticsCount.bucket, models.AnalyticsCount.count)
+            .filter(
+                models.AnalyticsCount.metric == "upskill",
+                models.AnalyticsCount.bucket.in_(buckets),
+                models.AnalyticsCount.key.in_([row.key for row in top]),
+            )
+            .all()
+        )
+        for key, bucket, count in rows:
+            by_month[key][bucket] = count
+    return {
+        "months": buckets,
+        "suggestions": [
+            {"suggestion": row.label, "total": row.count, "by_month": [by_month[row.key].get(bucket, 0) for bucket in buckets]}
+            for row in top
+        ],
+    }
+
+
+def needs_backfill(db: Session) -> bool:
+    """True for a database with resumes from before the analytics tables existed (see `rebuild`)."""
+    return (
+        db.query(models.AnalyticsCount.metric).first() is None
+        and db.query(models.Resume.id).first() is not None
+    )
+
+
+# --- Rebuild & Consistency Check ---
+
+def compute_counts(db: Session, batch_size: int = 1000) -> tuple:
+    """
+    Recounts everything from the 'resumes' table, streaming it `batch_size` rows
+    at a time. Returns ({(metric, bucket, key): count}, {(metric, bucket, key): label}).
+    """
+    counts = collections.Counter()
+    labels = {}
+    rows = (
+        db.query(models.Resume.uploaded_at, models.Resume.extracted_data, models.Resume.llm_analysis)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for row in rows:
+        for counter_key, label in resume_counts(row.uploaded_at, row.extracted_data, row.llm_analysis).items():
+            counts[counter_key] += 1
+            labels.setdefault(counter_key, label)
+    return counts, labels
+
+
+def rebuild(db: Session, batch_size: int = 1000) -> int:
+    """
+    Throws away 'analytics_counts' and recounts it from scratch (the backfill for
+    existing databases, or the repair when `check` finds a difference).
+    Returns the number of counters written.
+
+    Uploads and deletes wait while this runs, so the counts can't drift mid-rebuild:
+    on SQLite the initial DELETE takes the database's write lock, and on Postgres
+    the 'resumes' table is locked against writes.
+    """
+    table = models.AnalyticsCount.__table__
+    db.execute(delete(table))
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE resumes IN SHARE MODE"))
+    counts, labels = compute_counts(db, batch_size=batch_size)
+    rows = [
+        {"metric": metric, "bucket": bucket, "key": key, "label": labels[(metric, bucket, key)], "count": count}
+        for (metric, bucket, key), count in counts.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.execute(table.insert(), rows[start:start + batch_size])
+    db.commit()
+    return len(rows)
+
+
+def check(db: Session, batch_size: int = 1000) -> list:
+    """
+    Compares 'analytics_counts' against a fresh recount and returns every counter
+    that differs, as dicts with the expected and stored counts. An empty list means
+    the tables are consistent. Uploads finishing during the check can show up as
+    differences, so re-run it before rebuilding.
+    """
+    stored = {
+        (row.metric, row.bucket, row.key): row.count
+        for row in db.query(models.AnalyticsCount.metric, models.AnalyticsCount.bucket, models.AnalyticsCount.key, models.AnalyticsCount.count)
+    }
+    expected, _ = compute_counts(db, batch_size=batch_size)
+    differences = []
+    for counter_key in sorted(set(stored) | set(expected)):
+        if stored.get(counter_key, 0) != expected.get(counter_key, 0):
+            metric, bucket, key = counter_key
+            differences.append({
+                "metric": metric,
+                "bucket": bucket or "all time",
+                "key": key,
+                "expected": expected.get(counter_key, 0),
+                "stored": stored.get(counter_key, 0),
+            })
+    return differences
@@ -1,5 +1,8 @@
+import datetime
+
+from sqlalchemy import func, or_, select, tuple_
 from sqlalchemy.orm import Session
-from . import models
+from . import analytics, models, search
 from ..schemas import resume as resume_schema
 
 def get_resume(db: Session, resume_id: int):
@@ -8,13 +11,116 @@ def get_resume(db: Session, resume_id: int):
     """
     return db.query(models.Resume).filter(models.Resume.id == resume_id).first()
 
-def get_resumes(db: Session, skip: int = 0, limit: int = 100):
+def get_resumes(db: Session, skip: int = 0, limit: int = 100, cursor: tuple = None):
+    """
+    Fetches a page of resume summaries from the database, newest first.
+
+    Only the columns the History list needs are selected, so the big JSON blobs
+    are never loaded. Pass `cursor` as the (uploaded_at, id) of the last row of
+    the previous page for keyset pagination; it walks the
+    ix_resumes_uploaded_at_id index, so page 1,000 is as fast as page 1.
+    `skip` still works for old clients, but it gets slower the deeper it goes.
+    """
+    query = db.query(
+        models.Resume.id,
+        models.Resume.filename,
+        models.Resume.name,
+        models.Resume.email,
+        models.Resume.uploaded_at,
+    )
+    if cursor is not None:
+        # Row-value comparison: everything strictly "older" than the cursor row.
+        query = query.filter(tuple_(models.Resume.uploaded_at, models.Resume.id) < tuple_(*cursor))
+    query = query.order_by(models.Resume.uploaded_at.desc(), models.Resume.id.desc())
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def get_resume_summaries_by_ids(db: Session, resume_ids: list):
+    """
+    Fetches the summary columns (no JSON blobs) for a specific set of resumes, in no particular order.
+    """
+    if not resume_ids:
+        return []
+    return (
+        db.query(models.Resume.id, models.Resume.filename, models.Resume.name, models.Resume.email, models.Resume.uploaded_at)
+        .filter(models.Resume.id.in_(resume_ids))
+        .all()
+    )
+
+def iter_resumes_for_export(db: Session, since=None, until=None, batch_size: int = 1000):
+    """
+    Returns a query that iterates over every resume (oldest first), as rows with
+    the same attributes as a Resume, optionally limited to `since <= uploaded_at < until`.
+
+    Rows come off a server-side cursor `batch_size` at a time, and plain column
+    rows are selected instead of ORM objects, so nothing piles up in the session:
+    memory stays flat however big the table is.
+    """
+    query = db.query(
+        models.Resume.id,
+        models.Resume.filename,
+        models.Resume.name,
+        models.Resume.email,
+        models.Resume.phone,
+        models.Resume.uploaded_at,
+        models.Resume.extracted_data,
+        models.Resume.llm_analysis,
+    )
+    if since is not None:
+        query = query.filter(models.Resume.uploaded_at >= since)
+    if until is not None:
+        query = query.filter(models.Resume.uploaded_at < until)
+    query = query.order_by(models.Resume.uploaded_at, models.Resume.id)
+    return query.execution_options(stream_results=True, yield_per=batch_size)
+
+def _insert_row_count(db: Session):
+    """INSERT ... ON CONFLICT into 'row_counts' for the current database (SQLite and Postgres spell it the same way)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(models.RowCount.__table__)
+
+def seed_resume_count(db: Session) -> bool:
+    """
+    Creates the resume counter from one COUNT(*) if it doesn't exist yet, inside
+    the caller's transaction. It's a single INSERT ... ON CONFLICT DO NOTHING, so
+    two processes seeding at once can't both insert (or fail on the primary key):
+    the second one simply leaves the first one's row alone.
+    Returns True if this call created the counter.
+    """
+    total = select(func.count(models.Resume.id)).scalar_subquery()
+    statement = _insert_row_count(db).values(table_name="resumes", count=total).on_conflict_do_nothing(
+        index_elements=["table_name"]
+    )
+    return db.execute(statement).rowcount == 1
+
+def get_resume_count(db: Session) -> int:
+    """
+    Returns the total number of resumes from the running counter in 'row_counts'.
+    init_db seeds the counter; on a database it hasn't run against yet, the first
+    call seeds it here with one COUNT(*).
+    """
+    counter = db.query(models.RowCount.count).filter(models.RowCount.table_name == "resumes").scalar()
+    if counter is None:
+        seed_resume_count(db)
+        db.commit()
+        counter = db.query(models.RowCount.count).filter(models.RowCount.table_name == "resumes").scalar()
+    return counter
+
+def _adjust_resume_count(db: Session, delta: int):
     """
-    Fetches a list of resumes from the database.
-    Supports pagination with `skip` and `limit` parameters.
+    Bumps the resume counter inside the caller's transaction. Call it after the
+    insert or delete has been flushed: if the counter didn't exist yet it is seeded
+    from a COUNT(*) that already includes the change, so nothing is added twice
+    and no change is ever missed.
     """
-    # This query gets all resumes, then applies offset and limit for pagination.
-    return db.query(models.Resume).order_by(models.Resume.id.desc()).offset(skip).limit(limit).all()
+    if seed_resume_count(db):
+        return
+    db.query(models.RowCount).filter(models.RowCount.table_name == "resumes").update(
+        {"count": models.RowCount.count + delta}, synchronize_session=False
+    )
 
 def create_resume(db: Session, resume_data: dict):
     """
@@ -26,6 +132,13 @@ def create_resume(db: Session, resume_data: dict):
     
     # Add the new resume object to the session (staging it for saving).
     db.add(db_resume)
+
+    # Flush to get the new ID, then update the resume counter, the full-text index
+    # and the analytics counters in the same transaction.
+    db.flush()
+    _adjust_resume_count(db, +1)
+    search.index_resume(db, db_resume)
+    analytics.add_resume(db, db_resume)
     
     # Commit the transaction to actually save it to the database.
     db.commit()
@@ -45,10 +158,189 @@ def delete_resume(db: Session, resume_id: int):
     # Only proceed if we actually found a resume with that ID.
     if db_resume:
         db.delete(db_resume)
+        db.flush()
+        _adjust_resume_count(db, -1)
+        search.remove_resume(db, resume_id)
+        analytics.remove_resume(db, db_resume)
         db.commit()
         # It's good practice to return the object that was deleted,
         # in case the caller wants to do something with it (like logging its filename).
         return db_resume
         
     # If no resume was found, we just return None.
-    return None
\ No newline at end of file
+    return None
+
+def get_cached_result(db: Session, cache_key: str):
+    """
+    Fetches a cached analysis result by its cache key, or None if we've never seen it.
+    """
+    return db.query(models.ResultCache).filter(models.ResultCache.cache_key == cache_key).first()
+
+def save_cached_results(db: Session, cache_keys: list, pipeline_version: str, extracted_data: dict, llm_analysis: dict, resume_text: str = None):
+    """
+    Stores the same analysis result under one or more cache keys in a single transaction.
+    `merge` makes this an upsert, so two concurrent uploads of the same file don't collide.
+    """
+    for cache_key in cache_keys:
+        db.merge(models.ResultCache(
+            cache_key=cache_key,
+            pipeline_version=pipeline_version,
+            extracted_data=extracted_data,
+            llm_analysis=llm_analysis,
+            resume_text=resume_text,
+        ))
+    db.commit()
+
+def create_job(db: Session, job_id: str, filename: str, file_path: str):
+    """
+    Creates a new queued job record for an async upload.
+    """
+    db_job = models.Job(id=job_id, status="queued", filename=filename, file_path=file_path)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_job(db: Session, job_id: str):
+    """
+    Fetches a single job by its ID.
+    """
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+def claim_job(db: Session, job_id: str, worker_pid: int) -> bool:
+    """
+    Atomically moves a job from "queued" to "running" for the given worker.
+    Returns False if another worker got there first, so each job runs only once.
+    """
+    claimed = (
+        db.query(models.Job)
+        .filter(models.Job.id == job_id, models.Job.status == "queued")
+        .update({"status": "running", "worker_pid": worker_pid}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+def update_job(db: Session, job_id: str, **fields):
+    """
+    Updates the given fields (status, stage, resume_id, error, ...) on a job.
+    """
+    db.query(models.Job).filter(models.Job.id == job_id).update(fields, synchronize_session=False)
+    db.commit()
+
+def get_unfinished_jobs(db: Session):
+    """
+    Fetches every job that hasn't reached a final state, oldest first.
+    Used on startup to recover work left behind by a restart.
+    """
+    return (
+        db.query(models.Job)
+        .filter(models.Job.status.in_(["queued", "running"]))
+        .order_by(models.Job.created_at)
+        .all()
+    )
+
+def _stale_resumes_query(db: Session, target_version: str, after_id: int):
+    return db.query(models.Resume.id).filter(
+        or_(models.Resume.analysis_version.is_(None), models.Resume.analysis_version != target_version),
+        models.Resume.id > after_id,
+    )
+
+def get_stale_resumes(db: Session, target_version: str, after_id: int = 0, limit: int = 50):
+    """
+    Fetches the next `limit` resumes whose analysis wasn't produced by `target_version`,
+    as (id, extracted_data) rows in id order, starting after `after_id`.
+    Keyset pagination on the primary key, so every batch costs the same however far in we are.
+    """
+    return (
+        _stale_resumes_query(db, target_version, after_id)
+        .with_entities(models.Resume.id, models.Resume.extracted_data)
+        .order_by(models.Resume.id)
+        .limit(limit)
+        .all()
+    )
+
+def count_stale_resumes(db: Session, target_version: str, after_id: int = 0) -> int:
+    """
+    Counts the resumes `get_stale_resumes` still has to go through.
+    """
+    return _stale_resumes_query(db, target_version, after_id).count()
+
+def create_reanalysis_run(db: Session, run_id: str, target_version: str, total: int, worker_pid: int):
+    """
+    Records a new re-analysis run, owned by the given process.
+    """
+    db_run = models.ReanalysisRun(id=run_id, target_version=target_version, status="running", total=total, worker_pid=worker_pid)
+    db.add(db_run)
+    db.commit()
+    db.refresh(db_run)
+    return db_run
+
+def get_reanalysis_run(db: Session, run_id: str):
+    """
+    Fetches a single re-analysis run by its ID.
+    """
+    return db.query(models.ReanalysisRun).filter(models.ReanalysisRun.id == run_id).first()
+
+def get_latest_reanalysis_run(db: Session, target_version: str = None):
+    """
+    Fetches the most recently started re-analysis run (for a given target version), or None.
+    """
+    query = db.query(models.ReanalysisRun)
+    if target_version is not None:
+        query = query.filter(models.ReanalysisRun.target_version == target_version)
+    return query.order_by(models.ReanalysisRun.created_at.desc()).first()
+
+def claim_reanalysis_run(db: Session, run_id: str, from_status: str, from_pid: int, worker_pid: int) -> bool:
+    """
+    Atomically marks a run as "running" in the given process, if it is still in
+    `from_status` and owned by `from_pid` (None for a paused run, or a dead process
+    for a crashed one). Returns False if another process got there first, so a
+    run is never worked on twice at once.
+    """
+    owner = models.ReanalysisRun.worker_pid.is_(None) if from_pid is None else models.ReanalysisRun.worker_pid == from_pid
+    claimed = (
+        db.query(models.ReanalysisRun)
+        .filter(models.ReanalysisRun.id == run_id, models.ReanalysisRun.status == from_status, owner)
+        .update({"status": "running", "worker_pid": worker_pid}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+def update_reanalysis_run(db: Session, run_id: str, **fields):
+    """
+    Updates the given fields (status, error, ...) on a re-analysis run.
+    """
+    db.query(models.ReanalysisRun).filter(models.ReanalysisRun.id == run_id).update(fields, synchronize_session=False)
+    db.commit()
+
+def save_reanalysis_batch(db: Session, run_id: str, analyses: dict, target_version: str, last_resume_id: int, failed: int, elapsed_seconds: float, error: str = None):
+    """
+    Writes one batch of re-analysis results and the run's checkpoint in a single transaction.
+
+    `analyses` maps resume ids to their new `llm_analysis`. The analytics counters
+    are moved from the old analysis to the new one, the same way a delete and a
+    re-insert would. Resumes deleted since the batch was read are skipped. The
+    run's cursor moves to `last_resume_id` and its counters go up by this batch,
+    so after a crash the run resumes right after the last committed batch.
+    """
+    saved = 0
+    analyzed_at = datetime.datetime.utcnow()
+    if analyses:
+        for db_resume in db.query(models.Resume).filter(models.Resume.id.in_(list(analyses))):
+            analytics.remove_resume(db, db_resume)
+            db_resume.llm_analysis = analyses[db_resume.id]
+            db_resume.analysis_version = target_version
+            db_resume.analyzed_at = analyzed_at
+            analytics.add_resume(db, db_resume)
+            saved += 1
+    fields = {
+        "last_resume_id": last_resume_id,
+        "processed": models.ReanalysisRun.processed + saved,
+        "failed": models.ReanalysisRun.failed + failed,
+        "elapsed_seconds": models.ReanalysisRun.elapsed_seconds + elapsed_seconds,
+    }
+    if error is not None:
+        fields["error"] = error
+    db.query(models.ReanalysisRun).filter(models.ReanalysisRun.id == run_id).update(fields, synchronize_session=False)
+    db.commit()
+    return saved
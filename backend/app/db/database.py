@@ -1,18 +1,91 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# We're using SQLite for simplicity. The database will be a single file
+from ..core.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    SQLITE_BUSY_TIMEOUT_MS,
+)
+
+# The database comes from DATABASE_URL. By default that's SQLite: a single file
 # named 'resume_analyzer.db' in the root of the backend directory.
-DATABASE_URL = "sqlite:///./resume_analyzer.db"
+# Postgres works too (see the config), with the JSON columns stored as JSONB.
+
+# Async drivers for the async session path, by dialect.
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record, wal: bool = True):
+    """
+    Runs on every new SQLite connection:
+    - WAL journaling, so readers never wait for a writer (and vice versa);
+      only writers queue up behind each other.
+    - busy_timeout, so a writer that finds the lock taken waits for it instead
+      of failing straight away with "database is locked".
+    - synchronous=NORMAL, which is safe with WAL and saves an fsync per commit.
+    - foreign_keys, so the ON DELETE rules in the models are actually applied.
+    - a bigger page cache and in-memory temp tables for sorting.
+    """
+    cursor = dbapi_connection.cursor()
+    if wal:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA cache_size=-20000")  # in KiB, so about 20MB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _engine_options(url) -> dict:
+    """Connection pool settings that suit the given database."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        options = {
+            # SQLite connections may be used from several threads (FastAPI runs sync
+            # endpoints and our run_in_threadpool calls in a thread pool).
+            "connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        }
+        if url.database and url.database != ":memory:":
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT_SECONDS)
+        return options
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        # Drop connections the server (or a proxy) may have closed while idle.
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+    }
+
+
+def create_db_engine(url: str = DATABASE_URL, sqlite_wal: bool = True):
+    """
+    Builds a sync engine with the pool settings and (for SQLite) the connection
+    pragmas above. `sqlite_wal=False` keeps SQLite's default rollback journal,
+    for database files on network shares, where WAL isn't supported.
+    """
+    engine = create_engine(url, **_engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", lambda conn, record: _set_sqlite_pragmas(conn, record, wal=sqlite_wal))
+    return engine
+
+
+def async_url_for(url: str) -> str:
+    """The async-driver version of a sync database URL (e.g. sqlite -> sqlite+aiosqlite)."""
+    url = make_url(url)
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
 
 # The 'engine' is the core interface to the database. It's how SQLAlchemy
 # communicates with our DB using the DATABASE_URL.
-# The 'connect_args' is a specific requirement for SQLite to allow it to be
-# used by multiple threads, which is how FastAPI handles requests.
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine(DATABASE_URL)
 
 # A SessionLocal is a factory for creating new database sessions.
 # Think of a session as a temporary "workspace" for all the database
@@ -37,4 +110,53 @@ def get_db():
     finally:
         # This 'finally' block guarantees that the session is closed,
         # which is crucial for releasing database connections.
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# --- Async Sessions ---
+# Read-heavy endpoints use an AsyncSession, so waiting on the database doesn't
+# take up a thread pool slot. The async engine is created on first use, which
+# keeps the async driver (aiosqlite / asyncpg) optional for scripts and the CLI.
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = ASYNC_DATABASE_URL or async_url_for(DATABASE_URL)
+        _async_engine = create_async_engine(url, **_engine_options(url))
+        if _async_engine.dialect.name == "sqlite":
+            event.listen(_async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        # Same statement timings as the sync engine (see main.py).
+        from ..core import metrics
+        metrics.instrument_engine(_async_engine.sync_engine)
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    """Creates a new AsyncSession on the async engine."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _AsyncSessionLocal = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal()
+
+
+async def get_async_db():
+    """
+    The async version of `get_db`. Sync helpers from `crud` can still be used on
+    it through `await db.run_sync(crud.some_function, ...)`, which runs them on
+    the async connection without a worker thread.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Closes the async engine's pooled connections (on shutdown)."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
@@ -1,6 +1,12 @@
 import datetime
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, Float, String, DateTime, JSON, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from .database import Base
+from .types import CompressedJSON, CompressedText
+
+# Plain JSON (text) on SQLite, binary JSONB on Postgres. JSONB is parsed once on
+# write, can be indexed (see the GIN indexes below) and supports containment queries.
+JSONType = JSON().with_variant(JSONB(), "postgresql")
 
 class Resume(Base):
     """
@@ -8,6 +14,20 @@ class Resume(Base):
     It stores all the information related to a single resume analysis.
     """
     __tablename__ = "resumes"
+    __table_args__ = (
+        # Backs the History list: newest first, paged by (uploaded_at, id) keyset cursors.
+        Index("ix_resumes_uploaded_at_id", "uploaded_at", "id"),
+        # Postgres only: GIN indexes for JSONB containment queries, e.g.
+        # extracted_data @> '{"core_skills": ["Python"]}'. Skipped on SQLite.
+        Index(
+            "ix_resumes_extracted_data_gin", "extracted_data",
+            postgresql_using="gin", postgresql_ops={"extracted_data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_resumes_llm_analysis_gin", "llm_analysis",
+            postgresql_using="gin", postgresql_ops={"llm_analysis": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     # The unique ID for each resume entry. This is the primary key.
     id = Column(Integer, primary_key=True, index=True)
@@ -26,10 +46,170 @@ class Resume(Base):
     phone = Column(String)
 
     # --- JSON Data Blobs ---
+    # Both are stored compressed on SQLite and as JSONB on Postgres (see db/types.py).
     # A JSON column to store all the structured data extracted by the LLM,
     # like skills, experience, education, etc.
-    extracted_data = Column(JSON)
+    extracted_data = Column(CompressedJSON)
     
     # A JSON column to store the qualitative analysis from the LLM,
     # like the rating, improvement areas, and upskill suggestions.
-    llm_analysis = Column(JSON)   
\ No newline at end of file
+    llm_analysis = Column(CompressedJSON)
+
+    # --- Re-analysis ---
+    # The cleaned-up resume text (see services/preprocessing.py), in full: before any
+    # section was dropped or the text cut to fit the prompt token budget. It lets the
+    # resume be analyzed again without the original PDF, under a bigger budget too.
+    # Empty for resumes saved before this column existed.
+    resume_text = Column(CompressedText, nullable=True)
+
+    # The ANALYSIS_VERSION (model and analysis prompts) that produced `llm_analysis`.
+    # Rows with an older version (or none) are picked up by `python -m app.cli reanalyze`.
+    analysis_version = Column(String, nullable=True, index=True)
+
+    # When `llm_analysis` was last written: at upload, and again by every re-analysis.
+    # It's the Last-Modified of GET /api/resumes/{id}. Empty for resumes saved
+    # before this column existed, which fall back to `uploaded_at`.
+    analyzed_at = Column(DateTime, nullable=True, default=datetime.datetime.utcnow)
+
+
+class ResultCache(Base):
+    """
+    This class represents the 'result_cache' table.
+    It remembers the LLM output for resumes we've already analyzed, so uploading
+    the same resume again doesn't cost another parse and two Gemini calls.
+    """
+    __tablename__ = "result_cache"
+
+    # e.g. "file:<pipeline version>:<sha256>" or "text:<pipeline version>:<sha256>".
+    # The version is part of the key, so changing the prompts naturally misses the old entries.
+    cache_key = Column(String, primary_key=True)
+
+    # The prompt/model fingerprint the result was produced with.
+    pipeline_version = Column(String, index=True)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # The same two JSON blobs we store on a Resume.
+    extracted_data = Column(JSONType)
+    llm_analysis = Column(JSONType)
+
+    # The full preprocessed resume text, so a cache hit can still store it on the new Resume.
+    resume_text = Column(CompressedText, nullable=True)
+
+
+class Job(Base):
+    """
+    This class represents the 'jobs' table.
+    Each row is one resume upload submitted in async mode. Keeping the job state
+    in the database (instead of only in memory) lets unfinished jobs be picked
+    up again after a worker restarts.
+    """
+    __tablename__ = "jobs"
+
+    # A random UUID string, so job IDs can't be guessed by counting.
+    id = Column(String, primary_key=True)
+
+    # One of "queued", "running", "succeeded" or "failed".
+    status = Column(String, index=True, default="queued")
+
+    # The last pipeline stage that finished ("parsed", "extracted", "analyzed", "saved").
+    stage = Column(String, nullable=True)
+
+    filename = Column(String)
+
+    # Where the uploaded PDF is stored on disk until the job is done with it.
+    file_path = Column(String)
+
+    # The process ID of the worker that claimed the job. Used to detect jobs
+    # orphaned by a worker that died mid-run.
+    worker_pid = Column(Integer, nullable=True)
+
+    # Filled in once the job succeeds or fails.
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="SET NULL"), nullable=True)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
+class RowCount(Base):
+    """
+    This class represents the 'row_counts' table.
+    It keeps a running row count per table, updated in the same transaction as
+    every insert and delete, so "how many resumes are there?" never needs a
+    full COUNT(*) scan.
+    """
+    __tablename__ = "row_counts"
+
+    table_name = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class AnalyticsCount(Base):
+    """
+    This class represents the 'analytics_counts' table.
+    It holds pre-aggregated counts for the analytics dashboards (skill frequencies,
+    the rating histogram and upskill suggestion trends). The counts are updated in
+    the same transaction as every resume insert and delete (see db/analytics.py),
+    so the dashboards never have to open the JSON blobs.
+    """
+    __tablename__ = "analytics_counts"
+    __table_args__ = (
+        # "Top N" queries read this index from the highest count down.
+        Index("ix_analytics_counts_top", "metric", "bucket", "count"),
+    )
+
+    # What is being counted: "skill", "rating" or "upskill".
+    metric = Column(String, primary_key=True)
+
+    # "" for all time, or a month ("2024-05") for trends.
+    bucket = Column(String, primary_key=True)
+
+    # The normalized value (e.g. "machine learning" or "7") and how it was first written.
+    key = Column(String, primary_key=True)
+    label = Column(String)
+
+    # How many resumes have it.
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ReanalysisRun(Base):
+    """
+    This class represents the 'reanalysis_runs' table.
+    Each row is one bulk re-analysis (see services/reanalysis.py) and doubles as
+    its checkpoint: the cursor and the counters are committed together with each
+    batch of results, so an interrupted run carries on from its last batch.
+    """
+    __tablename__ = "reanalysis_runs"
+
+    # A random UUID string.
+    id = Column(String, primary_key=True)
+
+    # The ANALYSIS_VERSION the run brings resumes up to.
+    target_version = Column(String, index=True)
+
+    # One of "running", "paused" (interrupted or stopped early, can be resumed),
+    # "succeeded" or "cancelled" (replaced by a restarted run).
+    status = Column(String, index=True, default="running")
+
+    # The process working on the run. A "running" run whose process is gone was
+    # interrupted by a crash and can be resumed like a paused one.
+    worker_pid = Column(Integer, nullable=True)
+
+    # The id of the last resume handled. Resumes are processed in id order, so this
+    # is the keyset cursor the run resumes from.
+    last_resume_id = Column(Integer, nullable=False, default=0)
+
+    # How many stale resumes there were when the run started, and how far it got.
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+    # Time spent actually working, summed over every (resumed) session, for the throughput.
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
+
+    # The last error, for failed resumes or a failed run.
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
@@ -0,0 +1,76 @@
+from sqlalchemy import inspect, text
+
+from . import crud, models, search
+from .analytics import needs_backfill
+from .database import engine as default_engine, SessionalLocal
+
+
+def add_missing_columns(engine) -> list:
+    """
+    Adds columns that were added to a model after its table was created
+    (create_all never alters existing tables). Only nullable columns without a
+    server default can be added this way, which is how new columns are declared.
+    Returns the "table.column" names it added.
+    """
+    existing_tables = set(inspect(engine).get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspect(conn).get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def init_db(engine=None, check_analytics: bool = True):
+    """
+    Brings the database schema up to date. Safe to run any number of times.
+
+    This used to happen as a side effect of importing `app.main`. Now it runs
+    once per worker at startup (see the lifespan in main.py), or only once in
+    total under gunicorn, where the master process runs it before forking the
+    workers (see gunicorn.conf.py). The maintenance commands in app/cli.py run
+    it too, with `check_analytics=False` to skip the backfill hint.
+    """
+    engine = engine or default_engine
+
+    # This command tells SQLAlchemy to look at all the models that inherit from our
+    # 'Base' class and create the corresponding tables in the database if they don't already exist.
+    models.Base.metadata.create_all(bind=engine)
+
+    # Columns added to existing tables later on (e.g. resumes.resume_text).
+    for column in add_missing_columns(engine):
+        print(f"Added the missing column {column}.")
+
+    # create_all skips tables that already exist, so indexes added to a model later
+    # (like the History list's uploaded_at/id index) are created here if missing.
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    # The full-text search table is an FTS5 virtual table, which create_all doesn't know about.
+    search.create_search_index(engine)
+
+    # Seed the running resume count before any request reads or bumps it.
+    db = SessionalLocal(bind=engine)
+    try:
+        crud.seed_resume_count(db)
+        db.commit()
+    finally:
+        db.close()
+
+    # Databases created before the analytics tables existed need a one-off backfill.
+    if not check_analytics:
+        return
+    db = SessionalLocal(bind=engine)
+    try:
+        if needs_backfill(db):
+            print("The analytics tables are empty but resumes exist. Run `python -m app.cli analytics rebuild` to backfill them.")
+    finally:
+        db.close()
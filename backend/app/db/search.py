@@ -0,0 +1,154 @@
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import models
+
+# The FTS5 virtual table that mirrors the searchable parts of each resume.
+# Its rowid is the resume's id, so results join straight back to 'resumes'.
+FTS_TABLE = "resumes_fts"
+FTS_COLUMNS = ("name", "email", "summary", "skills", "experience")
+
+# Relative bm25 weights per column (same order as FTS_COLUMNS), used as the table's rank function. A hit in the
+# name or the skills list says more about a candidate than a hit in a job description.
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 4.0, 1.0)
+
+
+def is_search_available(db_or_engine) -> bool:
+    """Full-text search is only implemented for SQLite (with the FTS5 extension)."""
+    bind = db_or_engine.get_bind() if isinstance(db_or_engine, Session) else db_or_engine
+    return bind.dialect.name == "sqlite"
+
+
+def create_search_index(engine):
+    """Creates the FTS5 table if it doesn't exist yet. Does nothing on other databases."""
+    if not is_search_available(engine):
+        return
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{', '.join(FTS_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        # Make the table's built-in `rank` column use our weighted bm25, so queries
+        # can simply ORDER BY rank. This is stored in the table and is idempotent.
+        conn.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', :rank)"), {"rank": f"bm25({weights})"})
+
+
+def _document(resume_id: int, name: str, email: str, extracted_data) -> dict:
+    """Flattens a resume's extracted JSON into the text columns of the FTS table."""
+    extracted_data = extracted_data if isinstance(extracted_data, dict) else {}
+    skills = (extracted_data.get("core_skills") or []) + (extracted_data.get("soft_skills") or [])
+    experience = [
+        " ".join(str(job.get(key) or "") for key in ("title", "company", "description"))
+        for job in (extracted_data.get("experience") or [])
+        if isinstance(job, dict)
+    ]
+    return {
+        "rowid": resume_id,
+        "name": name or "",
+        "email": email or "",
+        "summary": extracted_data.get("summary") or "",
+        "skills": ", ".join(str(skill) for skill in skills),
+        "experience": "\n".join(experience),
+    }
+
+
+_INSERT_SQL = text(
+    f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+    f"VALUES (:rowid, {', '.join(':' + column for column in FTS_COLUMNS)})"
+)
+
+
+def index_resume(db: Session, db_resume: models.Resume):
+    """
+    Adds a resume to the search index inside the caller's transaction.
+    The resume must already have its id (i.e. be flushed).
+    """
+    if not is_search_available(db):
+        return
+    db.execute(_INSERT_SQL, _document(db_resume.id, db_resume.name, db_resume.email, db_resume.extracted_data))
+
+
+def remove_resume(db: Session, resume_id: int):
+    """Removes a resume from the search index inside the caller's transaction."""
+    if not is_search_available(db):
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {"rowid": resume_id})
+
+
+def build_match_query(user_query: str) -> str:
+    """
+    Turns free text from the user into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted term (so characters like '-', ':' or '*' in the
+    input can't be read as FTS5 syntax) and all terms must match. The last term
+    also matches as a prefix, so "pyth" finds "python" while the user is typing.
+    """
+    terms = re.findall(r"\w+", user_query)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_resumes(db: Session, user_query: str, skip: int = 0, limit: int = 20):
+    """
+    Runs a ranked full-text search and returns rows with the resume summary
+    fields, the bm25 `score` (lower is better), a highlighted `name_highlight`
+    and a highlighted `snippet` from the best-matching column.
+    """
+    match_query = build_match_query(user_query)
+    if not match_query:
+        return []
+    # Rank first and only then build highlights/snippets and join 'resumes',
+    # so that expensive part runs for one page of hits instead of every match.
+    sql = text(f"""
+        WITH top AS (
+            SELECT rowid, rank FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH :match_query
+            ORDER BY rank
+            LIMIT :limit OFFSET :skip
+        )
+        SELECT r.id, r.filename, r.name, r.email, r.uploaded_at,
+               top.rank AS score,
+               highlight({FTS_TABLE}, 0, '<mark>', '</mark>') AS name_highlight,
+               snippet({FTS_TABLE}, -1, '<mark>', '</mark>', '…', 16) AS snippet
+        FROM top
+        JOIN {FTS_TABLE} ON {FTS_TABLE}.rowid = top.rowid
+        JOIN resumes AS r ON r.id = top.rowid
+        WHERE {FTS_TABLE} MATCH :match_query
+        ORDER BY top.rank
+    """).columns(uploaded_at=models.Resume.uploaded_at.type)
+    return db.execute(sql, {"match_query": match_query, "limit": limit, "skip": skip}).all()
+
+
+def rebuild_search_index(db: Session, batch_size: int = 1000) -> int:
+    """
+    Empties the search index and fills it again from every row in 'resumes'.
+    Used to backfill databases created before search existed, or to repair drift.
+    Returns the number of resumes indexed.
+    """
+    if not is_search_available(db):
+        return 0
+    db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    indexed = 0
+    last_id = 0
+    while True:
+        # Walk the table by primary key in batches, so memory stays flat on big tables.
+        rows = (
+            db.query(models.Resume.id, models.Resume.name, models.Resume.email, models.Resume.extracted_data)
+            .filter(models.Resume.id > last_id)
+            .order_by(models.Resume.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        db.execute(_INSERT_SQL, [_document(row.id, row.name, row.email, row.extracted_data) for row in rows])
+        indexed += len(rows)
+        last_id = rows[-1].id
+    db.commit()
+    return indexed
@@ -0,0 +1,97 @@
+import zlib
+
+import orjson
+from sqlalchemy import LargeBinary, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
+
+from ..core.config import RESUME_BLOB_COMPRESSION
+
+# Every zstd frame starts with these four bytes.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# A zlib stream (with the default window size) always starts with 0x78 ("x").
+# No JSON document can start with "x", so plain JSON and zlib data can't be mixed up.
+ZLIB_MAGIC = b"\x78"
+
+
+def _zstd():
+    # zstandard is optional; only needed when RESUME_BLOB_COMPRESSION is "zstd"
+    # (or to read rows written that way).
+    import zstandard
+    return zstandard
+
+
+def compress_json(value, codec: str = RESUME_BLOB_COMPRESSION) -> bytes:
+    """Serializes a JSON value and compresses it with `codec` ("zlib", "zstd" or "none")."""
+    raw = orjson.dumps(value)
+    if codec == "zlib":
+        packed = zlib.compress(raw, 6)
+    elif codec == "zstd":
+        packed = _zstd().ZstdCompressor(level=3).compress(raw)
+    elif codec == "none":
+        return raw
+    else:
+        raise ValueError(f"Unknown RESUME_BLOB_COMPRESSION '{codec}'. Use 'zlib', 'zstd' or 'none'.")
+    # Tiny documents can come out bigger once compressed; those are stored as they are.
+    return packed if len(packed) < len(raw) else raw
+
+
+def decompress_json(data):
+    """
+    Reverses `compress_json`. The format is recognized from the data itself, so
+    rows written before compression was turned on (plain JSON text) still load.
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if isinstance(data, bytes):
+        if data.startswith(ZSTD_MAGIC):
+            data = _zstd().ZstdDecompressor().decompress(data)
+        elif data.startswith(ZLIB_MAGIC):
+            data = zlib.decompress(data)
+    return orjson.loads(data)
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    A JSON column stored compressed.
+
+    On SQLite the document is serialized with orjson and compressed (zlib by
+    default, see RESUME_BLOB_COMPRESSION), which makes the big resume blobs about
+    a third of their JSON size. On Postgres it is plain JSONB instead: Postgres
+    already compresses large values itself, and JSONB keeps the GIN indexes and
+    containment queries working.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return compress_json(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return decompress_json(value)
+
+
+class CompressedText(CompressedJSON):
+    """
+    A long text column stored compressed, like CompressedJSON.
+
+    On SQLite the text is stored as a JSON string, so the format detection in
+    `decompress_json` works unchanged (a JSON string always starts with '"',
+    never with a compression magic). On Postgres it is a plain TEXT column,
+    which Postgres compresses itself once it's big enough.
+    """
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(Text())
+        return dialect.type_descriptor(LargeBinary())
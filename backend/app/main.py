@@ -1,25 +1,88 @@
+import asyncio
+import contextlib
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import models
-from .db.database import engine
-from .api.endpoints import resumes
+from .core import metrics
+from .core.config import DB_INIT_ON_STARTUP, MAX_FILE_SIZE_BYTES, PROFILER_TOKEN
+from .core.middleware import MaxBodySizeMiddleware, ProfilerMiddleware, ServerTimingMiddleware
+from .db.database import engine, SessionalLocal, dispose_async_engine
+from .db.schema import init_db
+from .api.endpoints import resumes, jobs, matching, llm, analytics, admin
+from .api.endpoints import metrics as metrics_endpoint
+from .services import pdf_extraction, reanalysis, upload_storage
+from .services.job_queue import job_queue
+from .services.matching import match_index
+
+# Importing this module has no side effects beyond building the app: no database
+# files or tables are created and no LLM or PDF library is loaded. All of that
+# happens in `lifespan` below (or lazily on first use), once per worker process.
+
+# Time every database statement for /metrics and the Server-Timing header.
+metrics.instrument_engine(engine)
+
+
+# Loading the match index reads every resume, so do it in the background at
+# startup instead of making the first /api/match request wait for it.
+def _warm_match_index():
+    db = SessionalLocal()
+    try:
+        match_index.sync(db)
+    finally:
+        db.close()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup and shutdown for one worker process.
+
+    - Schema setup (tables, indexes, search index), unless the gunicorn master
+      already did it once for every worker (DB_INIT_ON_STARTUP=false).
+    - The async upload job queue, which also picks up jobs left unfinished by a
+      previous run.
+    - Warming the match index in the background.
+
+    The Gemini client and pdfplumber are not touched here: they load on the first
+    upload that needs them, so read-only endpoints never pay for them.
+    """
+    if DB_INIT_ON_STARTUP:
+        await run_in_threadpool(init_db)
+    await job_queue.start()
+    asyncio.get_running_loop().run_in_executor(None, _warm_match_index)
+    yield
+    await job_queue.stop()
+    # Background re-analysis runs are paused, and resume on the next start of the command or endpoint.
+    await reanalysis.stop_all()
+    # The PDF extraction process pool is started lazily on the first upload.
+    pdf_extraction.shutdown_pool()
+    await dispose_async_engine()
 
-# This command tells SQLAlchemy to look at all the models that inherit from our
-# 'Base' class (in this case, just the Resume model) and create the corresponding
-# tables in the database if they don't already exist.
-models.Base.metadata.create_all(bind=engine)
 
 # Create the main FastAPI application instance.
 # The title, description, and version will show up in the auto-generated API docs (e.g., at /docs).
 app = FastAPI(
     title="Smart Resume Analyzer API",
     description="An API to upload resumes and get AI-powered analysis.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- Middleware Setup ---
 
+# Upload size limit, enforced while the request body is still arriving.
+# The extra 64KB leaves room for the multipart boundaries and headers around the file.
+# Added before CORS, so CORS wraps it: the browser can only read the 413 (and show
+# the same message as the endpoint's own size check) if it has the CORS headers.
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_body_bytes=MAX_FILE_SIZE_BYTES + 64 * 1024,
+    paths=("/api/upload", "/api/upload/stream"),
+    detail=upload_storage.UPLOAD_TOO_LARGE_DETAIL,
+)
+
 # CORS (Cross-Origin Resource Sharing) Middleware
 # This is crucial to allow your React frontend (running on a different port/domain)
 # to communicate with this backend API. Without it, the browser would block the requests.
@@ -29,14 +92,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], # Allows all standard HTTP methods.
     allow_headers=["*"], # Allows all headers.
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing"], # Lets the browser read our pagination and timing headers.
 )
 
+# Per-request timings (the Server-Timing header and the HTTP latency histogram).
+# Added after the other middleware so it wraps them, and its total covers the whole request.
+app.add_middleware(ServerTimingMiddleware)
+
+# Opt-in sampling profiler for single requests (send "X-Profile: <PROFILER_TOKEN>").
+app.add_middleware(ProfilerMiddleware, token=PROFILER_TOKEN)
+
 # --- API Routers ---
 
 # Include the API router from our resumes endpoint file.
 # This keeps our code organized by grouping related endpoints together.
 # All routes in 'resumes.router' will now be prefixed with '/api'.
 app.include_router(resumes.router, prefix="/api", tags=["Resumes"])
+app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
+app.include_router(matching.router, prefix="/api", tags=["Matching"])
+app.include_router(llm.router, prefix="/api", tags=["LLM"])
+app.include_router(analytics.router, prefix="/api", tags=["Analytics"])
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
+# Prometheus scrapes /metrics at the root, so this one has no /api prefix.
+app.include_router(metrics_endpoint.router, tags=["Metrics"])
 
 # --- Root Endpoint ---
 
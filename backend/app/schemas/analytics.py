@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import List
+
+# Responses for the /api/analytics dashboards. Every number is a count of resumes.
+
+class SkillCount(BaseModel):
+    skill: str
+    count: int
+
+class TopSkills(BaseModel):
+    total_resumes: int
+    skills: List[SkillCount]
+
+class RatingCount(BaseModel):
+    rating: int
+    count: int
+
+class RatingHistogram(BaseModel):
+    total_resumes: int
+    # Resumes without a usable rating aren't in any bucket.
+    ratings: List[RatingCount]
+
+# One upskill area: how often it was suggested overall, and per month
+# (`by_month` lines up with `UpskillTrends.months`).
+class UpskillTrend(BaseModel):
+    suggestion: str
+    total: int
+    by_month: List[int]
+
+class UpskillTrends(BaseModel):
+    months: List[str]
+    suggestions: List[UpskillTrend]
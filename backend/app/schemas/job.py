@@ -0,0 +1,18 @@
+import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+# The status of an async upload job, returned by the 202 response and by the polling endpoint.
+class Job(BaseModel):
+    id: str
+    status: str
+    stage: Optional[str] = None
+    filename: str
+    # Set once the job has succeeded; use it with GET /api/resumes/{resume_id}.
+    resume_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime.datetime
+    updated_at: Optional[datetime.datetime] = None
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,19 @@
+import datetime
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+# The request body for ranking stored resumes against a job description.
+class MatchRequest(BaseModel):
+    job_description: str = Field(..., min_length=1, max_length=20000)
+    top_k: int = Field(10, ge=1, le=100)
+
+# One ranked candidate. `score` is between 0 and 1 (higher is a better fit), and
+# `matched_skills` lists the skills from the job description the resume also has.
+class MatchResult(BaseModel):
+    id: int
+    filename: str
+    name: Optional[str] = None
+    email: Optional[str] = None
+    uploaded_at: datetime.datetime
+    score: float
+    matched_skills: List[str] = []
@@ -0,0 +1,23 @@
+import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+# The state of a bulk re-analysis run, returned by the /api/admin/reanalyze endpoints.
+class ReanalysisRun(BaseModel):
+    id: str
+    # The ANALYSIS_VERSION the run brings resumes up to.
+    target_version: str
+    # "running", "paused", "succeeded" or "cancelled". A paused run resumes on the next start.
+    status: str
+    # Stale resumes when the run started, and how many were re-analyzed, failed or are left.
+    total: int
+    processed: int
+    failed: int
+    remaining: int
+    # Time spent working (over every resumed session), resumes per second, and the estimated time left.
+    elapsed_seconds: float
+    throughput_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime.datetime
+    updated_at: Optional[datetime.datetime] = None
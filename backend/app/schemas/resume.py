@@ -39,9 +39,22 @@ class ResumeSummary(BaseModel):
 # It inherits from ResumeSummary and just adds the remaining fields.
 class Resume(ResumeSummary):
     phone: Optional[str] = None
+    # The LLM's extraction, with email, phone and "links" (every URL in the resume)
+    # taken straight from the resume text instead (see services/preprocessing.py).
     extracted_data: Optional[Any] = None
     llm_analysis: Optional[Any] = None
 
     # It also needs orm_mode to work with SQLAlchemy objects.
     class Config:
         orm_mode = True
+
+# One hit from the full-text search endpoint: the usual summary fields plus
+# how well it matched (bm25 score, lower is better) and highlighted snippets.
+# Matched terms are wrapped in <mark>...</mark>.
+class ResumeSearchResult(ResumeSummary):
+    score: float
+    name_highlight: Optional[str] = None
+    snippet: Optional[str] = None
+
+    class Config:
+        orm_mode = True
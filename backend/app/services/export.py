@@ -0,0 +1,192 @@
+import csv
+import io
+
+import orjson
+
+from ..db import crud
+from ..db.analytics import parse_rating, suggestion_name
+from ..db.database import SessionalLocal
+from .resume_details import resume_to_dict
+
+# --- Bulk Export ---
+# Streams every stored analysis out in one response, for reporting. Rows are read
+# off a server-side cursor and written out one batch at a time, so memory use
+# doesn't grow with the size of the table.
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Fields of the full resume record (one JSON object per line in NDJSON).
+RECORD_FIELDS = ("id", "filename", "name", "email", "phone", "uploaded_at", "extracted_data", "llm_analysis")
+
+# The flattened, one-value-per-column view used for CSV and Parquet.
+FLAT_FIELDS = (
+    "id", "filename", "name", "email", "phone", "uploaded_at",
+    "resume_rating", "core_skills", "soft_skills",
+    "top_experience_title", "top_experience_company", "top_experience_dates",
+    "upskill_suggestions",
+)
+# Lists: joined with "; " in CSV, real list columns in Parquet.
+LIST_FIELDS = ("core_skills", "soft_skills", "upskill_suggestions")
+
+BATCH_SIZE = 1000
+
+
+def fields_for(export_format: str) -> tuple:
+    """The fields a format can output (and that `fields=` may pick from)."""
+    return RECORD_FIELDS if export_format == "ndjson" else FLAT_FIELDS
+
+
+def flatten(row) -> dict:
+    """One resume as a flat dict of FLAT_FIELDS."""
+    extracted_data = row.extracted_data if isinstance(row.extracted_data, dict) else {}
+    llm_analysis = row.llm_analysis if isinstance(row.llm_analysis, dict) else {}
+    experience = extracted_data.get("experience") or []
+    top_experience = experience[0] if experience and isinstance(experience[0], dict) else {}
+    return {
+        "id": row.id,
+        "filename": row.filename,
+        "name": row.name,
+        "email": row.email,
+        "phone": row.phone,
+        "uploaded_at": row.uploaded_at,
+        "resume_rating": parse_rating(llm_analysis.get("resume_rating")),
+        "core_skills": [str(skill) for skill in extracted_data.get("core_skills") or []],
+        "soft_skills": [str(skill) for skill in extracted_data.get("soft_skills") or []],
+        "top_experience_title": top_experience.get("title"),
+        "top_experience_company": top_experience.get("company"),
+        "top_experience_dates": top_experience.get("dates"),
+        "upskill_suggestions": [suggestion_name(item) for item in llm_analysis.get("upskill_suggestions") or []],
+    }
+
+
+def _matches(row, min_rating, skill) -> bool:
+    """The filters that need the (compressed) JSON blobs, applied as rows stream past."""
+    if min_rating is not None:
+        llm_analysis = row.llm_analysis if isinstance(row.llm_analysis, dict) else {}
+        rating = parse_rating(llm_analysis.get("resume_rating"))
+        if rating is None or rating < min_rating:
+            return False
+    if skill is not None:
+        extracted_data = row.extracted_data if isinstance(row.extracted_data, dict) else {}
+        skills = (extracted_data.get("core_skills") or []) + (extracted_data.get("soft_skills") or [])
+        if skill.casefold() not in {str(s).casefold() for s in skills}:
+            return False
+    return True
+
+
+def _batches(since, until, min_rating, skill, batch_size):
+    """Lists of matching rows, `batch_size` rows read at a time, on a session of our own."""
+    # The streaming response outlives the request, so the export can't borrow its session.
+    db = SessionalLocal()
+    try:
+        batch = []
+        for row in crud.iter_resumes_for_export(db, since=since, until=until, batch_size=batch_size):
+            if _matches(row, min_rating, skill):
+                batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        db.close()
+
+
+def _ndjson(batches, fields):
+    for batch in batches:
+        lines = []
+        for row in batch:
+            record = resume_to_dict(row)
+            lines.append(orjson.dumps({field: record[field] for field in fields}))
+        yield b"\n".join(lines) + b"\n"
+
+
+def _csv(batches, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for batch in batches:
+        for row in batch:
+            flat = flatten(row)
+            writer.writerow(["; ".join(flat[field]) if field in LIST_FIELDS else flat[field] for field in fields])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only file that hands back whatever was written since the last `drain`."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_schema(fields):
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "uploaded_at": pa.timestamp("us"),
+        "resume_rating": pa.int64(),
+        **{field: pa.list_(pa.string()) for field in LIST_FIELDS},
+    }
+    return pa.schema([(field, types.get(field, pa.string())) for field in fields])
+
+
+def _parquet(batches, fields):
+    # pyarrow is optional and only loaded for Parquet exports.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        # Each batch becomes one row group, written out as soon as it's complete.
+        for batch in batches:
+            flat_rows = [flatten(row) for row in batch]
+            columns = {field: [flat[field] for flat in flat_rows] for field in fields}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(export_format: str, fields=None, since=None, until=None, min_rating=None, skill=None, batch_size: int = BATCH_SIZE):
+    """
+    A generator of response body chunks with every matching resume in `export_format`.
+    `fields` picks and orders the output fields (default: all of `fields_for(export_format)`).
+    """
+    fields = tuple(fields or fields_for(export_format))
+    batches = _batches(since, until, min_rating, skill, batch_size)
+    if export_format == "ndjson":
+        return _ndjson(batches, fields)
+    if export_format == "csv":
+        return _csv(batches, fields)
+    if export_format == "parquet":
+        return _parquet(batches, fields)
+    raise ValueError(f"Unknown export format '{export_format}'.")
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import uuid
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.config import UPLOAD_DIR, JOB_WORKER_CONCURRENCY
+from ..core.processes import pid_is_alive
+from ..db import crud
+from ..db.database import SessionalLocal
+from . import pipeline
+from .upload_storage import StoredUpload, hash_file
+
+FINAL_STATUSES = ("succeeded", "failed")
+
+
+def job_to_dict(db_job) -> dict:
+    """The public view of a job row, matching `schemas.job.Job`."""
+    return {
+        "id": db_job.id,
+        "status": db_job.status,
+        "stage": db_job.stage,
+        "filename": db_job.filename,
+        "resume_id": db_job.resume_id,
+        "error": db_job.error,
+        "created_at": db_job.created_at,
+        "updated_at": db_job.updated_at,
+    }
+
+
+class JobQueue:
+    """
+    A small in-process job queue for async uploads.
+
+    Job state lives in the 'jobs' table, the PDF lives in UPLOAD_DIR, and this class
+    only keeps the IDs waiting to run plus a bounded pool of asyncio worker tasks.
+    Listeners can subscribe to a job to receive its stage events as they happen.
+    """
+
+    def __init__(self, concurrency: int = JOB_WORKER_CONCURRENCY, upload_dir: str = UPLOAD_DIR):
+        self.concurrency = concurrency
+        self.upload_dir = Path(upload_dir)
+        self._queue = None
+        self._workers = []
+        # job_id -> list of asyncio.Queue, one per connected SSE client.
+        self._subscribers = {}
+
+    async def start(self):
+        """Starts the worker tasks and re-queues anything left over from a previous run."""
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        await run_in_threadpool(self._recover_unfinished_jobs)
+
+    async def stop(self):
+        """Cancels the worker tasks. Jobs they were running stay in the DB and are recovered on the next start."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, upload: StoredUpload, filename: str):
+        """
+        Takes ownership of a stored upload, records a queued job and hands it to
+        the workers. Returns the job row.
+        """
+        job_id = str(uuid.uuid4())
+        file_path = self.upload_dir / f"{job_id}.pdf"
+        # The upload is already in UPLOAD_DIR, so this is just a rename.
+        await run_in_threadpool(os.replace, upload.path, file_path)
+
+        db = SessionalLocal()
+        try:
+            db_job = await run_in_threadpool(crud.create_job, db, job_id, filename, str(file_path))
+        finally:
+            db.close()
+
+        self._queue.put_nowait(job_id)
+        return db_job
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Returns a queue that will receive every event published for this job from now on."""
+        events = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(events)
+        return events
+
+    def unsubscribe(self, job_id: str, events: asyncio.Queue):
+        listeners = self._subscribers.get(job_id, [])
+        if events in listeners:
+            listeners.remove(events)
+        if not listeners:
+            self._subscribers.pop(job_id, None)
+
+    def _publish(self, job_id: str, event: dict):
+        for events in self._subscribers.get(job_id, []):
+            events.put_nowait(event)
+
+    def _recover_unfinished_jobs(self):
+        """
+        Re-queues jobs that never finished: ones still waiting, and ones whose
+        worker process is gone (e.g. it crashed or was restarted mid-run).
+        """
+        db = SessionalLocal()
+        try:
+            for db_job in crud.get_unfinished_jobs(db):
+                if db_job.status == "running":
+                    if pid_is_alive(db_job.worker_pid) and db_job.worker_pid != os.getpid():
+                        # Another live worker is still on it.
+                        continue
+                    crud.update_job(db, db_job.id, status="queued", stage=None, worker_pid=None)
+                self._queue.put_nowait(db_job.id)
+        finally:
+            db.close()
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                # A broken job must never take the worker down with it.
+                print(f"Job {job_id} crashed the worker loop: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str):
+        db = SessionalLocal()
+        try:
+            # Another worker process may have recovered the same job, so claim it first.
+            claimed = await run_in_threadpool(crud.claim_job, db, job_id, os.getpid())
+            if not claimed:
+                return
+            db_job = await run_in_threadpool(crud.get_job, db, job_id)
+            self._publish(job_id, {"event": "running", "status": "running"})
+
+            async def on_stage(stage: str, **details):
+                await run_in_threadpool(crud.update_job, db, job_id, stage=stage)
+                self._publish(job_id, {"event": stage, "status": "running", "stage": stage, **details})
+
+            try:
+                file_sha256 = await run_in_threadpool(hash_file, db_job.file_path)
+                db_resume = await pipeline.analyze_resume(db_job.file_path, file_sha256, db_job.filename, db, on_stage=on_stage)
+            except Exception as e:
+                await run_in_threadpool(crud.update_job, db, job_id, status="failed", error=str(e))
+                self._publish(job_id, {"event": "failed", "status": "failed", "error": str(e)})
+            else:
+                await run_in_threadpool(crud.update_job, db, job_id, status="succeeded", resume_id=db_resume.id)
+                self._publish(job_id, {"event": "succeeded", "status": "succeeded", "resume_id": db_resume.id})
+
+            # The job reached a final state either way, so we no longer need the PDF.
+            Path(db_job.file_path).unlink(missing_ok=True)
+        finally:
+            db.close()
+
+
+# The single job queue shared by the whole app. It is started and stopped in main.py.
+job_queue = JobQueue()
@@ -0,0 +1,257 @@
+import asyncio
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.config import (
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_GOVERNOR_DB_PATH,
+    LLM_MAX_RATE_WAIT_SECONDS,
+    LLM_MAX_CONCURRENCY,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_COOLDOWN_SECONDS,
+)
+
+
+class LLMUnavailableError(Exception):
+    """
+    Raised when an LLM call can't be made or keeps failing.
+    The original error (if there was one) is kept as `__cause__`.
+    """
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        # Seconds the caller should wait before trying again, when we know it.
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the LLM while the circuit breaker is open."""
+    pass
+
+
+class RateLimitedError(LLMUnavailableError):
+    """Raised when our own quota wouldn't allow the call for longer than LLM_MAX_RATE_WAIT_SECONDS."""
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    """A cheap token estimate (about 4 characters per token) for quota accounting."""
+    return max(1, len(text) // 4)
+
+
+class LLMGovernor:
+    """
+    Keeps all worker processes inside the LLM quota and stops them from
+    hammering it while it's down.
+
+    - Two token buckets (requests/minute and tokens/minute) live in a small
+      SQLite file, so every process on the machine draws from the same quota.
+      Each check is one short `BEGIN IMMEDIATE` transaction.
+    - A circuit breaker in the same file opens after a run of transient
+      failures. While it's open every call fails fast; after the cooldown one
+      probe call is let through, and its result closes or re-opens it.
+    - A per-process semaphore caps how many calls are in flight at once.
+    """
+
+    def __init__(
+        self,
+        db_path: str = LLM_GOVERNOR_DB_PATH,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        failure_threshold: int = LLM_BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds: float = LLM_BREAKER_COOLDOWN_SECONDS,
+        max_rate_wait: float = LLM_MAX_RATE_WAIT_SECONDS,
+    ):
+        self.db_path = db_path
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_rate_wait = max_rate_wait
+        self._semaphore = None
+        self._in_flight = 0
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    # --- Shared state ---
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """An exclusive (write-locked) transaction on the shared state file."""
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        try:
+            self._ensure_schema(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def _ensure_schema(self, conn):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS breaker ("
+                "name TEXT PRIMARY KEY, state TEXT NOT NULL, failures INTEGER NOT NULL, "
+                "opened_until REAL NOT NULL, probe_until REAL NOT NULL)"
+            )
+            self._schema_ready = True
+
+    @staticmethod
+    def _refill(conn, name: str, capacity: float, now: float) -> float:
+        """Returns the bucket's current level after topping it up for the time that passed."""
+        row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return float(capacity)
+        tokens, updated_at = row
+        return min(float(capacity), tokens + (now - updated_at) * capacity / 60.0)
+
+    def _try_acquire(self, tokens_needed: int) -> float:
+        """
+        Takes one request and `tokens_needed` tokens from the shared buckets if both
+        have enough. Returns 0 on success, or how many seconds to wait before retrying.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            requests = self._refill(conn, "requests", self.requests_per_minute, now)
+            tokens = self._refill(conn, "tokens", self.tokens_per_minute, now)
+            # A single huge prompt can never need more than a full bucket.
+            tokens_needed = min(tokens_needed, self.tokens_per_minute)
+
+            wait = max(
+                (1 - requests) * 60.0 / self.requests_per_minute if requests < 1 else 0.0,
+                (tokens_needed - tokens) * 60.0 / self.tokens_per_minute if tokens < tokens_needed else 0.0,
+            )
+            if wait == 0:
+                requests -= 1
+                tokens -= tokens_needed
+            conn.executemany(
+                "INSERT INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                [("requests", requests, now), ("tokens", tokens, now)],
+            )
+            return wait
+
+    def _breaker_row(self, conn):
+        row = conn.execute("SELECT state, failures, opened_until, probe_until FROM breaker WHERE name = 'llm'").fetchone()
+        return row or ("closed", 0, 0.0, 0.0)
+
+    def _save_breaker(self, conn, state: str, failures: int, opened_until: float, probe_until: float):
+        conn.execute(
+            "INSERT INTO breaker (name, state, failures, opened_until, probe_until) VALUES ('llm', ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET state = excluded.state, failures = excluded.failures, "
+            "opened_until = excluded.opened_until, probe_until = excluded.probe_until",
+            (state, failures, opened_until, probe_until),
+        )
+
+    def _check_breaker(self):
+        """Raises CircuitOpenError if calls aren't allowed right now. Hands out the half-open probe."""
+        now = time.time()
+        with self._transaction() as conn:
+            state, failures, opened_until, probe_until = self._breaker_row(conn)
+            if state == "closed":
+                return
+            if state == "open" and now < opened_until:
+                raise CircuitOpenError("The LLM service is unavailable (circuit open).", retry_after=opened_until - now)
+            if state == "half_open" and now < probe_until:
+                raise CircuitOpenError("The LLM service is recovering (probe in progress).", retry_after=probe_until - now)
+            # Cooldown is over (or the last probe never reported back): this caller is the probe.
+            self._save_breaker(conn, "half_open", failures, opened_until, now + self.cooldown_seconds)
+
+    def record_success(self):
+        with self._transaction() as conn:
+            # Only touches the row when there is something to reset, so the
+            # common all-healthy case doesn't write anything.
+            conn.execute(
+                "UPDATE breaker SET state = 'closed', failures = 0, opened_until = 0, probe_until = 0 "
+                "WHERE name = 'llm' AND (state != 'closed' OR failures != 0)"
+            )
+
+    def record_failure(self):
+        """Counts a transient failure, opening the breaker once the threshold is reached."""
+        now = time.time()
+        with self._transaction() as conn:
+            state, failures, opened_until, probe_until = self._breaker_row(conn)
+            failures += 1
+            if state == "half_open" or failures >= self.failure_threshold:
+                self._save_breaker(conn, "open", failures, now + self.cooldown_seconds, 0.0)
+            else:
+                self._save_breaker(conn, state, failures, opened_until, probe_until)
+
+    def get_state(self) -> dict:
+        """A snapshot of the limiter and breaker, for the status endpoint."""
+        now = time.time()
+        with self._transaction() as conn:
+            requests = self._refill(conn, "requests", self.requests_per_minute, now)
+            tokens = self._refill(conn, "tokens", self.tokens_per_minute, now)
+            state, failures, opened_until, _ = self._breaker_row(conn)
+        return {
+            "circuit": {
+                "state": "half_open" if state == "open" and now >= opened_until else state,
+                "consecutive_failures": failures,
+                "retry_after_seconds": round(max(opened_until - now, 0.0), 1) if state == "open" else 0.0,
+                "failure_threshold": self.failure_threshold,
+                "cooldown_seconds": self.cooldown_seconds,
+            },
+            "rate_limit": {
+                "requests_per_minute": self.requests_per_minute,
+                "requests_available": round(requests, 2),
+                "tokens_per_minute": self.tokens_per_minute,
+                "tokens_available": int(tokens),
+            },
+            "concurrency": {
+                "max_in_flight_per_process": self.max_concurrency,
+                "in_flight_this_process": self._in_flight,
+                "pid": os.getpid(),
+            },
+        }
+
+    # --- The public entry point ---
+
+    @contextlib.asynccontextmanager
+    async def slot(self, prompt: str):
+        """
+        Waits until an LLM call is allowed, then lets the caller make it:
+        breaker check -> concurrency slot -> shared rate-limit tokens.
+        Use `record_success` / `record_failure` to report how the call went.
+        """
+        await run_in_threadpool(self._check_breaker)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            waited = 0.0
+            while True:
+                wait = await run_in_threadpool(self._try_acquire, estimate_tokens(prompt))
+                if wait == 0:
+                    break
+                if waited + wait > self.max_rate_wait:
+                    raise RateLimitedError("LLM quota exhausted; try again shortly.", retry_after=wait)
+                await asyncio.sleep(wait)
+                waited += wait
+
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+
+
+# The governor shared by everything in this process (and, via its state file,
+# with the other worker processes).
+llm_governor = LLMGovernor()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import random
+
+from ..core.config import (
+    GEMINI_API_KEY,
+    LLM_PROVIDER,
+    LLM_STUB_LATENCY_SECONDS,
+    LLM_STUB_LATENCY_JITTER,
+    LLM_STUB_ERROR_RATE,
+    LLM_STUB_RESPONSES_PATH,
+)
+
+# The kinds of call the parser makes. Real providers only need the prompt; the
+# stub uses the task to pick which canned reply to send back.
+TASKS = ("extraction", "analysis", "single_pass")
+
+
+class TransientLLMError(Exception):
+    """
+    A provider error that is worth retrying (rate limit, overload, timeout).
+    Providers translate their own SDK errors into this, so the retry decorator
+    and circuit breaker don't have to know which backend is in use.
+    The original error (if there was one) is kept as `__cause__`.
+    """
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        # The wait the server asked for, in seconds, when it told us.
+        self.retry_after = retry_after
+
+
+class LLMProvider:
+    """
+    The interface `resume_parser` talks to. A provider turns a prompt into the
+    model's raw text reply, and raises TransientLLMError for anything that
+    should be retried. Everything else (prompts, retries, rate limiting, JSON
+    parsing) stays in the parser, so it's shared by every backend.
+    """
+
+    name = "base"
+    model_name = "none"
+
+    async def generate(self, prompt: str, task: str, json_output: bool = False) -> str:
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini through the `google-generativeai` SDK. The SDK is imported and
+    configured on the first call, so picking another provider (or just importing
+    the app) never loads it.
+    """
+
+    name = "gemini"
+
+    def __init__(self, model_name: str = "gemini-1.5-flash", api_key: str = GEMINI_API_KEY):
+        # We're using the 'flash' model because it's fast and great for this kind of task.
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+        self._transient_errors = ()
+
+    def _get_model(self):
+        if self._model is None:
+            import google.generativeai as genai
+            from google.api_core import exceptions as google_api_exceptions
+
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+            # These Google API errors are usually temporary, so they are worth retrying:
+            # - ResourceExhausted: Rate limit exceeded (HTTP 429).
+            # - ServiceUnavailable: Temporary server-side issue (HTTP 503).
+            # - DeadlineExceeded: Request timed out.
+            self._transient_errors = (
+                google_api_exceptions.ResourceExhausted,
+                google_api_exceptions.ServiceUnavailable,
+                google_api_exceptions.DeadlineExceeded,
+            )
+        return self._model
+
+    async def generate(self, prompt: str, task: str, json_output: bool = False) -> str:
+        model = self._get_model()
+        # Structured output: ask Gemini to reply with JSON only.
+        generation_config = {"response_mime_type": "application/json"} if json_output else None
+        try:
+            response = await model.generate_content_async(prompt, generation_config=generation_config)
+        except self._transient_errors as e:
+            # The message is kept as-is, since Gemini's 429s carry the retry hint in it.
+            raise TransientLLMError(f"{type(e).__name__}: {e}") from e
+        return response.text
+
+
+# Canned replies for the stub, shaped like what the real prompts ask for.
+STUB_EXTRACTION = {
+    "name": "Stub Candidate",
+    "email": "stub.candidate@example.com",
+    "phone": "+1 555 010 0000",
+    "location": "Remote",
+    "summary": "Backend engineer with experience building APIs and data pipelines.",
+    "core_skills": ["Python", "FastAPI", "SQL", "Docker"],
+    "soft_skills": ["Communication", "Ownership"],
+    "experience": [
+        {"title": "Software Engineer", "company": "Example Corp", "dates": "2021 - Present", "description": "Built and ran internal APIs."}
+    ],
+    "education": [{"degree": "B.Sc. Computer Science", "institution": "Example University", "year": "2021"}],
+}
+STUB_ANALYSIS = {
+    "resume_rating": 7,
+    "improvement_areas": "Quantify the impact of each role and tailor the summary to the target job.",
+    "upskill_suggestions": [
+        {"skill": "Kubernetes", "reason": "Most backend roles now expect container orchestration."},
+        {"skill": "System design", "reason": "Needed for senior interviews."},
+        {"skill": "Observability", "reason": "Metrics and tracing are part of running services."},
+    ],
+}
+STUB_RESPONSES = {
+    "extraction": STUB_EXTRACTION,
+    "analysis": STUB_ANALYSIS,
+    "single_pass": {"extracted_data": STUB_EXTRACTION, "llm_analysis": STUB_ANALYSIS},
+}
+
+
+class StubProvider(LLMProvider):
+    """
+    An offline stand-in for load tests and local development. It answers every
+    call with canned JSON after a configurable delay, and fails a configurable
+    share of calls with a TransientLLMError, the way a rate-limited or
+    overloaded model would.
+
+    `responses` maps each task to the reply (any JSON value); a JSON file with
+    the same keys can be given through LLM_STUB_RESPONSES_PATH.
+    """
+
+    name = "stub"
+    model_name = "stub"
+
+    def __init__(
+        self,
+        latency: float = LLM_STUB_LATENCY_SECONDS,
+        jitter: float = LLM_STUB_LATENCY_JITTER,
+        error_rate: float = LLM_STUB_ERROR_RATE,
+        responses: dict = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.responses = dict(STUB_RESPONSES)
+        self.responses.update(responses or {})
+        self.calls = 0
+
+    @classmethod
+    def from_config(cls):
+        responses = None
+        if LLM_STUB_RESPONSES_PATH:
+            with open(LLM_STUB_RESPONSES_PATH, encoding="utf-8") as f:
+                responses = json.load(f)
+        return cls(responses=responses)
+
+    async def generate(self, prompt: str, task: str, json_output: bool = False) -> str:
+        self.calls += 1
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if self.error_rate and random.random() < self.error_rate:
+            if random.random() < 0.5:
+                raise TransientLLMError("Stub provider: simulated 429, quota exceeded. Please retry in 1s.", retry_after=1.0)
+            raise TransientLLMError("Stub provider: simulated 503, the model is overloaded.")
+        return json.dumps(self.responses[task])
+
+
+PROVIDERS = {"gemini": GeminiProvider, "stub": StubProvider.from_config}
+
+
+def get_provider(name: str = LLM_PROVIDER) -> LLMProvider:
+    """Builds the provider named by LLM_PROVIDER ("gemini" or "stub")."""
+    # Looked up first, so a KeyError from inside a provider's constructor isn't mistaken for an unknown name.
+    factory = PROVIDERS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown LLM provider '{name}'. Expected one of: {', '.join(PROVIDERS)}.")
+    return factory()
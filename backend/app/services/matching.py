@@ -0,0 +1,338 @@
+import functools
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from ..db import crud, models
+
+# Keeps tech tokens like "c++", "c#", "node.js" and ".net" in one piece.
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+we you your our their they our us i me my he she his her who what which when where how all any
+""".split())
+
+# Skills can be multi-word ("machine learning", "google cloud platform").
+_MAX_SKILL_WORDS = 3
+
+
+def tokenize(text: str) -> list:
+    """Lowercases text and splits it into search terms, dropping stopwords."""
+    tokens = [token.rstrip(".") for token in _TOKEN_RE.findall(text.lower())]
+    return [token for token in tokens if token and token not in _STOPWORDS]
+
+
+# The same few thousand skill names repeat across resumes, so remember their normalized form.
+@functools.lru_cache(maxsize=65536)
+def normalize_skill(skill: str) -> str:
+    return " ".join(tokenize(str(skill)))
+
+
+def _resume_terms(extracted_data) -> list:
+    """The text we match a job description against: skills plus experience titles and descriptions."""
+    if not isinstance(extracted_data, dict):
+        return []
+    parts = [str(skill) for skill in (extracted_data.get("core_skills") or []) + (extracted_data.get("soft_skills") or [])]
+    for job in extracted_data.get("experience") or []:
+        if isinstance(job, dict):
+            parts.append(str(job.get("title") or ""))
+            parts.append(str(job.get("description") or ""))
+    return tokenize(" ".join(parts))
+
+
+def _resume_skills(extracted_data) -> set:
+    if not isinstance(extracted_data, dict):
+        return set()
+    skills = (extracted_data.get("core_skills") or []) + (extracted_data.get("soft_skills") or [])
+    return {normalized for normalized in (normalize_skill(str(skill)) for skill in skills) if normalized}
+
+
+class MatchIndex:
+    """
+    An in-memory index for ranking stored resumes against a job description.
+
+    It keeps two structures, both updated incrementally as resumes come and go:
+    - a sparse term-frequency matrix (resumes x terms) used for BM25 text scoring.
+      New rows collect in a small "pending" buffer that is merged into the main
+      CSC matrix in batches, so an insert never rebuilds the whole matrix.
+    - an inverted skill index (normalized skill -> rows) for exact skill overlap.
+
+    Scoring touches only the matrix columns of terms in the job description and
+    is NumPy-vectorized across every candidate at once.
+    """
+
+    # Merge pending rows into the main matrix once there are at least this many,
+    # and at least MERGE_RATIO times the main matrix's rows. Growing geometrically
+    # keeps the total merge cost linear in the number of inserts.
+    MERGE_THRESHOLD = 2000
+    MERGE_RATIO = 0.25
+    # BM25 parameters.
+    K1 = 1.2
+    B = 0.75
+    # How much of the final score comes from skill overlap vs. text relevance.
+    SKILL_WEIGHT = 0.4
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._vocabulary = {}
+        self._doc_freq = np.zeros(1024, dtype=np.int64)
+
+        # Per-row data. Row numbers are never reused; deleted rows are just marked dead.
+        self._resume_ids = []
+        self._row_of = {}
+        self._doc_len = []
+        self._alive = []
+        self._row_terms = []
+        self._row_skills = []
+
+        self._skill_rows = {}
+
+        # The main matrix plus the not-yet-merged rows in COO form.
+        self._matrix = sparse.csc_matrix((0, 0), dtype=np.float32)
+        self._pending_rows, self._pending_cols, self._pending_vals = [], [], []
+        self._pending_matrix = None
+
+        # NumPy copies of the per-row lists, rebuilt lazily after a change.
+        self._arrays = None
+
+        self.loaded = False
+        self.high_water_id = 0
+
+    def __len__(self):
+        return len(self._row_of)
+
+    # --- Updates ---
+
+    def add_resume(self, resume_id: int, extracted_data):
+        terms = _resume_terms(extracted_data)
+        with self._lock:
+            if resume_id in self._row_of:
+                return
+            row = len(self._resume_ids)
+            counts = {}
+            for term, count in Counter(terms).items():
+                column = self._vocabulary.get(term)
+                if column is None:
+                    column = self._vocabulary[term] = len(self._vocabulary)
+                counts[column] = count
+
+            columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            if len(self._vocabulary) > len(self._doc_freq):
+                # Double it, or more if this one resume brought in more new terms than that.
+                grown = np.zeros(max(2 * len(self._doc_freq), len(self._vocabulary)), dtype=np.int64)
+                grown[:len(self._doc_freq)] = self._doc_freq
+                self._doc_freq = grown
+            self._doc_freq[columns] += 1
+
+            self._pending_rows.extend([row] * len(counts))
+            self._pending_cols.extend(counts.keys())
+            self._pending_vals.extend(counts.values())
+            self._pending_matrix = None
+
+            skills = _resume_skills(extracted_data)
+            for skill in skills:
+                self._skill_rows.setdefault(skill, set()).add(row)
+
+            self._resume_ids.append(resume_id)
+            self._row_of[resume_id] = row
+            self._doc_len.append(len(terms))
+            self._alive.append(True)
+            self._row_terms.append(columns)
+            self._row_skills.append(skills)
+            self._arrays = None
+            self.high_water_id = max(self.high_water_id, resume_id)
+
+            pending_rows = len(self._resume_ids) - self._matrix.shape[0]
+            if pending_rows >= max(self.MERGE_THRESHOLD, self.MERGE_RATIO * self._matrix.shape[0]):
+                self._merge_pending()
+
+    def remove_resume(self, resume_id: int):
+        with self._lock:
+            row = self._row_of.pop(resume_id, None)
+            if row is None:
+                return
+            self._alive[row] = False
+            self._doc_freq[self._row_terms[row]] -= 1
+            for skill in self._row_skills[row]:
+                rows = self._skill_rows.get(skill)
+                if rows is not None:
+                    rows.discard(row)
+                    if not rows:
+                        del self._skill_rows[skill]
+            self._row_terms[row] = np.empty(0, dtype=np.int64)
+            self._row_skills[row] = set()
+            self._arrays = None
+
+    def _merge_pending(self):
+        if not self._pending_rows:
+            return
+        shape = (len(self._resume_ids), len(self._vocabulary))
+        base = self._matrix.tocoo()
+        self._matrix = sparse.csc_matrix(
+            (
+                np.concatenate([base.data, np.asarray(self._pending_vals, dtype=np.float32)]),
+                (
+                    np.concatenate([base.row, np.asarray(self._pending_rows, dtype=np.int64)]),
+                    np.concatenate([base.col, np.asarray(self._pending_cols, dtype=np.int64)]),
+                ),
+            ),
+            shape=shape,
+        )
+        self._pending_rows, self._pending_cols, self._pending_vals = [], [], []
+        self._pending_matrix = None
+
+    # --- Keeping in sync with the database ---
+
+    def sync(self, db: Session, batch_size: int = 2000):
+        """
+        Brings the index up to date with the 'resumes' table. The first call loads
+        everything; later calls only pick up rows added since (e.g. by another
+        worker process) and, if the row count disagrees, rows deleted elsewhere.
+        """
+        with self._lock:
+            while True:
+                rows = (
+                    db.query(models.Resume.id, models.Resume.extracted_data)
+                    .filter(models.Resume.id > self.high_water_id)
+                    .order_by(models.Resume.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                for row in rows:
+                    self.add_resume(row.id, row.extracted_data)
+                if len(rows) < batch_size:
+                    break
+            # The high-water mark stays put if the table ends with deleted rows.
+            self._merge_pending()
+
+            # If the counts still disagree, some rows were deleted (or committed out
+            # of id order) by another process, so reconcile against the full id list.
+            if self.loaded and crud.get_resume_count(db) != len(self._row_of):
+                existing = {resume_id for (resume_id,) in db.query(models.Resume.id)}
+                for resume_id in list(self._row_of):
+                    if resume_id not in existing:
+                        self.remove_resume(resume_id)
+                missing = [resume_id for resume_id in existing if resume_id not in self._row_of]
+                for start in range(0, len(missing), batch_size):
+                    rows = (
+                        db.query(models.Resume.id, models.Resume.extracted_data)
+                        .filter(models.Resume.id.in_(missing[start:start + batch_size]))
+                        .all()
+                    )
+                    for row in rows:
+                        self.add_resume(row.id, row.extracted_data)
+            self.loaded = True
+
+    def resume_created(self, resume_id: int, extracted_data):
+        """
+        Hook for when this process saves a new resume. Before the first `sync`
+        it does nothing, because the initial load will pick the row up anyway.
+        """
+        if self.loaded:
+            self.add_resume(resume_id, extracted_data)
+
+    def resume_deleted(self, resume_id: int):
+        """Hook for when this process deletes a resume."""
+        self.remove_resume(resume_id)
+
+    # --- Scoring ---
+
+    def _get_arrays(self):
+        if self._arrays is None:
+            doc_len = np.asarray(self._doc_len, dtype=np.float32)
+            alive = np.asarray(self._alive, dtype=bool)
+            avg_len = float(doc_len[alive].mean()) if alive.any() else 1.0
+            self._arrays = (doc_len, alive, max(avg_len, 1.0))
+        return self._arrays
+
+    def _postings(self, column: int):
+        """(rows, term_frequencies) for one term across the main and pending matrices."""
+        rows, tfs = [], []
+        if column < self._matrix.shape[1]:
+            start, end = self._matrix.indptr[column], self._matrix.indptr[column + 1]
+            rows.append(self._matrix.indices[start:end])
+            tfs.append(self._matrix.data[start:end])
+        if self._pending_rows:
+            if self._pending_matrix is None:
+                self._pending_matrix = sparse.csc_matrix(
+                    (self._pending_vals, (self._pending_rows, self._pending_cols)),
+                    shape=(len(self._resume_ids), len(self._vocabulary)),
+                    dtype=np.float32,
+                )
+            pending = self._pending_matrix
+            start, end = pending.indptr[column], pending.indptr[column + 1]
+            rows.append(pending.indices[start:end])
+            tfs.append(pending.data[start:end])
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(rows), np.concatenate(tfs)
+
+    def _job_skills(self, jd_tokens: list) -> set:
+        """Finds known skills (1-3 word phrases) mentioned in the job description."""
+        found = set()
+        for size in range(1, _MAX_SKILL_WORDS + 1):
+            for start in range(len(jd_tokens) - size + 1):
+                phrase = " ".join(jd_tokens[start:start + size])
+                if phrase in self._skill_rows:
+                    found.add(phrase)
+        return found
+
+    def rank(self, job_description: str, top_k: int = 10) -> list:
+        """
+        Returns up to `top_k` (resume_id, score, matched_skills) tuples, best first.
+        The score mixes BM25 relevance (scaled to 0-1 by the best candidate) with
+        the share of the job description's recognized skills the resume lists.
+        """
+        jd_tokens = tokenize(job_description)
+        with self._lock:
+            total_rows = len(self._resume_ids)
+            if total_rows == 0 or not jd_tokens:
+                return []
+            doc_len, alive, avg_len = self._get_arrays()
+            n_alive = int(alive.sum())
+
+            # BM25, one job-description term at a time, vectorized over all resumes.
+            text_scores = np.zeros(total_rows, dtype=np.float32)
+            length_norm = self.K1 * (1 - self.B + self.B * doc_len / avg_len)
+            for term in set(jd_tokens):
+                column = self._vocabulary.get(term)
+                if column is None:
+                    continue
+                df = self._doc_freq[column]
+                if df <= 0:
+                    continue
+                idf = np.log1p((n_alive - df + 0.5) / (df + 0.5))
+                rows, tfs = self._postings(column)
+                text_scores[rows] += idf * tfs * (self.K1 + 1) / (tfs + length_norm[rows])
+
+            best = text_scores.max()
+            scores = text_scores / best if best > 0 else text_scores
+
+            # Skill overlap: the fraction of the JD's recognized skills each resume has.
+            job_skills = self._job_skills(jd_tokens)
+            if job_skills:
+                skill_hits = np.zeros(total_rows, dtype=np.float32)
+                for skill in job_skills:
+                    skill_hits[np.fromiter(self._skill_rows[skill], dtype=np.int64)] += 1
+                scores = (1 - self.SKILL_WEIGHT) * scores + self.SKILL_WEIGHT * (skill_hits / len(job_skills))
+
+            scores = np.where(alive, scores, 0)
+            candidates = np.flatnonzero(scores > 0)
+            if candidates.size > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k)[:top_k]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            return [
+                (self._resume_ids[row], float(scores[row]), sorted(job_skills & self._row_skills[row]))
+                for row in candidates
+            ]
+
+
+# The single index shared by the whole worker process. It loads itself from
+# the database on first use (see `sync`).
+match_index = MatchIndex()
@@ -0,0 +1,398 @@
+import asyncio
+import collections
+import hashlib
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ..core.config import (
+    PDF_EXTRACTOR_BACKEND,
+    PDF_EXTRACTION_WORKERS,
+    PDF_PAGES_PER_TASK,
+    PDF_MAX_PAGES,
+    PDF_TIME_BUDGET_SECONDS,
+)
+
+# The pool is created on first use, so importing this module stays cheap.
+_pool = None
+
+
+@dataclass
+class ExtractionResult:
+    """
+    The outcome of extracting one PDF.
+    `truncated_reason` is "max_pages" or "time_budget" when only part of the
+    document was read, and None when every page made it.
+    """
+    pages: List[str] = field(default_factory=list)
+    page_count: int = 0
+    backend: str = PDF_EXTRACTOR_BACKEND
+    truncated_reason: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        # One join at the end instead of `text +=` per page, which copies the whole string every time.
+        return "".join(f"{page_text}\n" for page_text in self.pages if page_text)
+
+    @property
+    def pages_extracted(self) -> int:
+        return len(self.pages)
+
+    @property
+    def truncated(self) -> bool:
+        return self.truncated_reason is not None
+
+
+# --- Worker-side functions ---
+# These run inside the extraction processes, so they must be plain top-level
+# functions and they import the PDF libraries themselves.
+
+# How many parsed documents each extraction process keeps open. The chunks of one
+# PDF usually land on the same few processes, and each of them parses the file
+# (cross-reference table, page tree) once instead of once per chunk.
+_DOCUMENT_CACHE_SIZE = 2
+_documents = collections.OrderedDict()
+
+
+def _open_source(source):
+    """Opens either a path on disk or raw PDF bytes as a binary file object."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return open(source, "rb")
+
+
+class _PdfminerDocument:
+    """An open PDF read with pdfminer: the page list is parsed once, pages are rendered on demand."""
+
+    def __init__(self, source):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        # boxes_flow=None skips pdfminer's expensive text-box ordering pass while still
+        # grouping characters into words and lines, which is all the LLM needs.
+        laparams = LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+
+        self._fp = _open_source(source)
+        try:
+            self._pages = list(PDFPage.create_pages(PDFDocument(PDFParser(self._fp))))
+            self._output = io.StringIO()
+            resource_manager = PDFResourceManager(caching=True)
+            self._converter = TextConverter(resource_manager, self._output, laparams=laparams)
+            self._interpreter = PDFPageInterpreter(resource_manager, self._converter)
+        except Exception:
+            self._fp.close()
+            raise
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def extract(self, start: int, end: int, deadline: float):
+        page_texts = []
+        for page in self._pages[start:end]:
+            if time.time() > deadline:
+                return page_texts, True
+            self._interpreter.process_page(page)
+            page_texts.append(self._output.getvalue().replace("\x0c", "").strip())
+            self._output.seek(0)
+            self._output.truncate(0)
+        return page_texts, False
+
+    def close(self):
+        self._converter.close()
+        self._fp.close()
+
+
+class _PdfplumberDocument:
+    """An open PDF read with pdfplumber."""
+
+    def __init__(self, source):
+        import pdfplumber
+
+        self._fp = _open_source(source)
+        try:
+            self._pdf = pdfplumber.open(self._fp)
+        except Exception:
+            self._fp.close()
+            raise
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pdf.pages)
+
+    def extract(self, start: int, end: int, deadline: float):
+        page_texts = []
+        for page in self._pdf.pages[start:end]:
+            if time.time() > deadline:
+                return page_texts, True
+            # Blank pages or pages with only images give us None.
+            page_texts.append(page.extract_text() or "")
+            # Drop the page's parsed objects; only the text is kept.
+            page.close()
+        return page_texts, False
+
+    def close(self):
+        self._pdf.close()
+        self._fp.close()
+
+
+def _document_key(source, backend: str) -> tuple:
+    """Identifies a document across chunks: by path and modification time, or by a hash of the bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return backend, "bytes", hashlib.sha1(source).hexdigest()
+    stat = os.stat(source)
+    return backend, "path", os.path.abspath(source), stat.st_mtime_ns, stat.st_size
+
+
+def _get_document(source, backend: str):
+    """The open document for `source`, from this process's small cache or freshly parsed."""
+    key = _document_key(source, backend)
+    document = _documents.get(key)
+    if document is not None:
+        _documents.move_to_end(key)
+        return key, document
+    document = _PdfminerDocument(source) if backend == "pdfminer" else _PdfplumberDocument(source)
+    _documents[key] = document
+    while len(_documents) > _DOCUMENT_CACHE_SIZE:
+        _, oldest = _documents.popitem(last=False)
+        oldest.close()
+    return key, document
+
+
+def _extract_pages(source, start: int, end: int, backend: str, deadline: float):
+    """
+    Extracts pages [start, end) of a PDF. Returns (page_texts, total_page_count, timed_out).
+    `deadline` is a wall-clock timestamp; the extraction stops between pages once it passes.
+    """
+    key, document = _get_document(source, backend)
+    try:
+        page_texts, timed_out = document.extract(start, end, deadline)
+    except Exception:
+        # Don't keep a document around that just failed halfway through a page.
+        _documents.pop(key, None)
+        document.close()
+        raise
+    return page_texts, document.page_count, timed_out
+
+
+def _worker_main(conn):
+    """The loop of one extraction process: read a request from the pipe, send back the result or the error."""
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            # The server went away (or replaced us).
+            return
+        try:
+            reply = ("ok", _extract_pages(*request))
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # The error itself couldn't be pickled.
+            conn.send(("error", RuntimeError(f"{type(reply[1]).__name__}: {reply[1]}")))
+
+
+# --- Caller-side API ---
+
+class ExtractionTimeout(Exception):
+    """Raised when a chunk of pages didn't finish within the time budget."""
+    pass
+
+
+class _ExtractionWorker:
+    """One extraction process and the pipe we talk to it through."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name="pdf-extraction", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def call(self, request: tuple, timeout: float):
+        """Sends one request and waits up to `timeout` seconds for the reply."""
+        self.conn.send(request)
+        if not self.conn.poll(timeout):
+            raise ExtractionTimeout("PDF extraction overran its time budget.")
+        status, payload = self.conn.recv()
+        return status, payload
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    The extraction processes, started on demand up to `size`.
+
+    A ProcessPoolExecutor can't stop a task once it's running, so one pathological
+    page could keep a worker busy long after the time budget, and a few such PDFs
+    would block every later upload. Here each request is driven by a thread that
+    waits on the worker's pipe until the deadline (plus a short grace period for
+    the worker to hand back the pages it finished). A worker that still hasn't
+    answered by then is killed, and a fresh one is started for the next request.
+    """
+
+    # How long past the deadline a worker may take to stop at a page boundary and reply.
+    KILL_GRACE_SECONDS = 1.0
+
+    def __init__(self, size: int = PDF_EXTRACTION_WORKERS):
+        self.size = size
+        # "spawn" gives clean workers that don't inherit the server's threads or event loop.
+        self._context = multiprocessing.get_context("spawn")
+        # One thread per worker process, so a request only starts once a worker is free.
+        self._threads = ThreadPoolExecutor(max_workers=size, thread_name_prefix="pdf-extraction")
+        self._idle = queue.LifoQueue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.killed = 0
+
+    def _checkout(self) -> _ExtractionWorker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            worker = _ExtractionWorker(self._context)
+            self._workers.add(worker)
+            return worker
+
+    def _discard(self, worker: _ExtractionWorker):
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _run(self, request: tuple, deadline: float):
+        if self._closed:
+            raise RuntimeError("The PDF extraction pool has been shut down.")
+        if time.time() >= deadline:
+            # Waited for a free worker past the deadline.
+            raise ExtractionTimeout("No PDF extraction worker was free within the time budget.")
+        worker = self._checkout()
+        try:
+            status, payload = worker.call(request, timeout=max(deadline - time.time(), 0) + self.KILL_GRACE_SECONDS)
+        except ExtractionTimeout:
+            self.killed += 1
+            print(f"Killed PDF extraction worker {worker.process.pid}: it overran the time budget.")
+            self._discard(worker)
+            raise
+        except (EOFError, OSError) as e:
+            # The worker died (e.g. the PDF library crashed it).
+            self._discard(worker)
+            raise RuntimeError(f"The PDF extraction worker died: {e}") from e
+        if self._closed:
+            self._discard(worker)
+        else:
+            self._idle.put(worker)
+        if status == "error":
+            raise payload
+        return payload
+
+    async def run(self, source, start: int, end: int, backend: str, deadline: float):
+        """Extracts pages [start, end) in a worker. Raises ExtractionTimeout if it can't finish by `deadline`."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads, self._run, (source, start, end, backend, deadline), deadline)
+
+    def shutdown(self):
+        self._closed = True
+        # Requests still waiting for a thread are dropped; running ones finish, then their worker is killed.
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def _get_pool() -> WorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool()
+    return _pool
+
+
+def shutdown_pool():
+    """Stops the extraction processes. Called when the app shuts down."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+async def _extract_with_backend(source, backend: str, max_pages: int, deadline: float) -> ExtractionResult:
+    pool = _get_pool()
+    result = ExtractionResult(backend=backend)
+
+    # The first chunk also tells us how many pages there are in total.
+    first_end = min(PDF_PAGES_PER_TASK, max_pages)
+    try:
+        page_texts, result.page_count, timed_out = await pool.run(source, 0, first_end, backend, deadline)
+    except ExtractionTimeout:
+        result.truncated_reason = "time_budget"
+        return result
+    result.pages.extend(page_texts)
+    if timed_out:
+        result.truncated_reason = "time_budget"
+        return result
+
+    # Split the rest of the document across the pool. Every chunk ends by the
+    # deadline (plus the grace period) one way or another, so no extra timeout is needed.
+    page_limit = min(result.page_count, max_pages)
+    chunks = await asyncio.gather(
+        *(
+            pool.run(source, start, min(start + PDF_PAGES_PER_TASK, page_limit), backend, deadline)
+            for start in range(first_end, page_limit, PDF_PAGES_PER_TASK)
+        ),
+        return_exceptions=True,
+    )
+
+    # Keep pages in document order, and stop at the first chunk that didn't
+    # finish so the partial text is always a clean prefix of the document.
+    for chunk in chunks:
+        if isinstance(chunk, ExtractionTimeout):
+            result.truncated_reason = "time_budget"
+            continue
+        if isinstance(chunk, BaseException):
+            raise chunk
+        if result.truncated_reason:
+            continue
+        page_texts, _, timed_out = chunk
+        result.pages.extend(page_texts)
+        if timed_out:
+            result.truncated_reason = "time_budget"
+
+    if result.truncated_reason is None and result.page_count > max_pages:
+        result.truncated_reason = "max_pages"
+    return result
+
+
+async def extract_text_async(source, max_pages: int = PDF_MAX_PAGES, time_budget: float = PDF_TIME_BUDGET_SECONDS) -> ExtractionResult:
+    """
+    Extracts the text of a PDF (given as bytes or a file path) in the extraction processes.
+
+    Long documents are split into chunks of PDF_PAGES_PER_TASK pages that run in
+    parallel. At most `max_pages` pages are read, and everything must finish within
+    `time_budget` seconds; whatever was extracted by then is returned with
+    `truncated_reason` set, and a worker still stuck on a page is killed. If the
+    fast backend finds no text at all, the document is retried with pdfplumber
+    inside the same budget.
+    """
+    deadline = time.time() + time_budget
+    result = await _extract_with_backend(source, PDF_EXTRACTOR_BACKEND, max_pages, deadline)
+    if not result.text.strip() and PDF_EXTRACTOR_BACKEND != "pdfplumber" and time.time() < deadline:
+        result = await _extract_with_backend(source, "pdfplumber", max_pages, deadline)
+    return result
@@ -0,0 +1,139 @@
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from ..core import metrics
+from ..core.config import PIPELINE_MODE, PIPELINE_MODES
+from ..db import crud
+from . import pdf_extraction, preprocessing, resume_parser, result_cache
+from .matching import match_index
+
+# The named steps of the pipeline, in the order they complete.
+# Progress callbacks (e.g. the job queue's SSE stream) receive these names.
+STAGES = ("parsed", "extracted", "analyzed", "saved")
+
+
+class UnreadablePDFError(Exception):
+    """Raised when a PDF has no extractable text (blank or image-only)."""
+    pass
+
+
+async def _noop_stage(stage: str, **details):
+    pass
+
+
+async def analyze_resume(pdf_path: str, file_sha256: str, filename: str, db: Session, on_stage=None, mode: str = None):
+    """
+    Runs the full resume pipeline and returns the saved `models.Resume` row:
+    result cache -> PDF parsing -> LLM extraction -> LLM analysis -> database.
+
+    The PDF is read straight from `pdf_path` by the extraction workers, and
+    `file_sha256` (computed while the upload was being stored) is its cache key.
+
+    `on_stage` is an optional `async` callback that is awaited with each name in
+    `STAGES` as the pipeline moves forward, plus keyword details where we have
+    them (e.g. page counts for "parsed"). On a cache hit the skipped stages are
+    reported straight away, so listeners always see the full sequence. The
+    "extracted" stage carries the `extracted_data`, so a client can show the
+    parsed fields while the analysis is still running.
+
+    `mode` picks how the LLM is used ("two_pass" or "single_pass", see
+    PIPELINE_MODE in the config); it defaults to the configured mode.
+    """
+    on_stage = on_stage or _noop_stage
+    mode = mode or PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode '{mode}'. Expected one of: {', '.join(PIPELINE_MODES)}.")
+
+    # Check the result cache first. A byte-identical upload skips parsing and the LLM entirely.
+    file_key = result_cache.file_cache_key(file_sha256)
+    with metrics.timed("cache_lookup"):
+        cached_result = await run_in_threadpool(result_cache.lookup, db, file_key)
+
+    if cached_result is None:
+        # Parse the PDF content to get plain text (in the extraction process pool).
+        with metrics.timed("pdf_parse"):
+            extraction = await pdf_extraction.extract_text_async(pdf_path)
+        metrics.PDF_PAGES.observe(extraction.page_count)
+        resume_text = extraction.text
+        if not resume_text.strip():
+            # This can happen if the PDF is just an image or is blank.
+            raise UnreadablePDFError("Could not extract text from PDF. The file might be empty or image-based.")
+        if extraction.truncated:
+            print(f"Warning: '{filename}' was only partially extracted ({extraction.pages_extracted} of {extraction.page_count} pages, {extraction.truncated_reason}).")
+        await on_stage(
+            "parsed",
+            page_count=extraction.page_count,
+            pages_extracted=extraction.pages_extracted,
+            truncated_reason=extraction.truncated_reason,
+        )
+
+        # A different file with the same text (e.g. a re-exported PDF) can still skip the LLM.
+        text_key = result_cache.text_cache_key(resume_text)
+        with metrics.timed("cache_lookup"):
+            cached_result = await run_in_threadpool(result_cache.lookup, db, text_key)
+        new_cache_keys = [file_key]
+
+        if cached_result is None:
+            # Clean the text up locally before it goes to the LLM: fewer tokens, and the
+            # contact details come straight from the text instead of the model.
+            with metrics.timed("preprocess"):
+                preprocessed = preprocessing.preprocess(extraction.pages)
+            if preprocessed.dropped_sections or preprocessed.truncated:
+                print(f"Warning: '{filename}' was over the prompt token budget. Dropped sections: {preprocessed.dropped_sections or 'none'}, truncated: {preprocessed.truncated}.")
+
+            if mode == "single_pass":
+                # One structured-output call returns both the extracted data and the analysis.
+                cached_result = await resume_parser.call_gemini_single_pass(preprocessed.text)
+                cached_result["extracted_data"] = preprocessing.apply_local_fields(cached_result["extracted_data"], preprocessed)
+                await on_stage("extracted", extracted_data=cached_result["extracted_data"])
+                await on_stage("analyzed")
+            else:
+                # Use the LLM to pull out structured data like name, email, skills, etc.
+                extracted_data = await resume_parser.call_gemini_for_extraction(preprocessed.text)
+                extracted_data = preprocessing.apply_local_fields(extracted_data, preprocessed)
+                await on_stage("extracted", extracted_data=extracted_data)
+
+                # Use the LLM again, this time for qualitative analysis and suggestions.
+                llm_analysis = await resume_parser.call_gemini_for_analysis(extracted_data)
+                await on_stage("analyzed")
+
+                cached_result = {"extracted_data": extracted_data, "llm_analysis": llm_analysis}
+            # Kept with the result, so the resume can be re-analyzed later without its PDF.
+            cached_result["resume_text"] = preprocessed.full_text
+            new_cache_keys.append(text_key)
+        else:
+            await on_stage("extracted", extracted_data=cached_result["extracted_data"])
+            await on_stage("analyzed")
+
+        await run_in_threadpool(result_cache.store, db, new_cache_keys, cached_result)
+    else:
+        await on_stage("parsed")
+        await on_stage("extracted", extracted_data=cached_result["extracted_data"])
+        await on_stage("analyzed")
+
+    extracted_data = cached_result["extracted_data"]
+
+    # Bundle up all the data we want to save in the database.
+    resume_data_to_save = {
+        "filename": filename,
+        "name": extracted_data.get("name"),
+        "email": extracted_data.get("email"),
+        "phone": extracted_data.get("phone"),
+        "extracted_data": extracted_data,
+        "llm_analysis": cached_result["llm_analysis"],
+        "resume_text": cached_result.get("resume_text"),
+        "analysis_version": resume_parser.ANALYSIS_VERSION,
+    }
+
+    # The session is synchronous, so the commit happens in a worker thread.
+    with metrics.timed("db_save"):
+        db_resume = await run_in_threadpool(crud.create_resume, db, resume_data=resume_data_to_save)
+    # Adding to the match index takes its lock, which a full load can hold for seconds,
+    # so it runs off the event loop too. The resume is already saved at this point: if
+    # the index update fails, the next `sync` picks the row up, and the upload succeeds.
+    try:
+        await run_in_threadpool(match_index.resume_created, db_resume.id, extracted_data)
+    except Exception as e:
+        print(f"Warning: couldn't add resume {db_resume.id} to the match index: {type(e).__name__}: {e}")
+    await on_stage("saved")
+    return db_resume
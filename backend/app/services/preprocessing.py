@@ -0,0 +1,257 @@
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..core.config import LLM_PROMPT_TOKEN_BUDGET
+from .llm_governor import estimate_tokens
+
+# Bump this whenever the output of `preprocess` changes, so cached LLM results
+# produced from the old prompt text are treated as stale.
+PREPROCESSING_VERSION = "3"
+
+# --- Patterns ---
+# Compiled once at import time, they run on every upload.
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+# Loose on purpose: a run of digits, spaces, dots, dashes and brackets, optionally with
+# a leading "+". Candidates are checked for a plausible digit count afterwards.
+PHONE_RE = re.compile(r"(?<![\w+])\+?\(?\d[\d \t().-]{6,}\d(?!\w)")
+YEAR_RE = re.compile(r"(?:19|20)\d\d")
+# A date range like "2019 - 2021" or "2019.01 - 2021.03", which PHONE_RE happily matches too.
+YEAR_RANGE_RE = re.compile(r"(?<!\d)(?:19|20)\d\d(?:[./](?:0?[1-9]|1[0-2]))?[ \t]*[-–—][ \t]*(?:19|20)\d\d(?!\d)")
+URL_RE = re.compile(
+    r"\b(?:https?://|www\.)[^\s<>()\"']+"
+    r"|\b(?:linkedin\.com|github\.com|gitlab\.com|behance\.net|medium\.com)/[^\s<>()\"']+",
+    re.IGNORECASE,
+)
+# "<br/>" is a line break in disguise.
+LINE_BREAK_TAG_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+# Stray markup some PDF generators leave in the text layer (e.g. "<b>Skills</b><br/>").
+MARKUP_RE = re.compile(r"</?(?:b|i|u|em|strong|span|div|p|font)\b[^>]*>|<br\s*/?>", re.IGNORECASE)
+PAGE_NUMBER_RE = re.compile(r"^(?:page[ \t]*)?\d{1,3}(?:[ \t]*(?:of|/)[ \t]*\d{1,3})?$", re.IGNORECASE)
+BULLET_RE = re.compile(r"^[•●▪■◦·∙‣○◆*]+[ \t]*")
+SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+DIGITS_RE = re.compile(r"\d+")
+
+# Section headings we recognise, mapped to one canonical name each.
+SECTION_ALIASES = {
+    "summary": "summary", "professional summary": "summary", "profile": "summary",
+    "objective": "summary", "career objective": "summary", "about me": "summary",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment history": "experience", "work history": "experience", "internships": "experience",
+    "education": "education", "academic background": "education", "qualifications": "education",
+    "skills": "skills", "technical skills": "skills", "core skills": "skills", "key skills": "skills",
+    "projects": "projects", "personal projects": "projects", "academic projects": "projects",
+    "certifications": "certifications", "certificates": "certifications", "courses": "certifications",
+    "achievements": "achievements", "awards": "achievements", "honors": "achievements",
+    "publications": "publications",
+    "volunteering": "volunteering", "volunteer experience": "volunteering",
+    "languages": "languages",
+    "interests": "interests", "hobbies": "interests", "hobbies and interests": "interests",
+    "personal details": "personal details", "personal information": "personal details",
+    "references": "references", "declaration": "declaration",
+}
+HEADING_RE = re.compile(
+    r"^(?:" + "|".join(re.escape(name) for name in sorted(SECTION_ALIASES, key=len, reverse=True)) + r")[ \t]*:?$",
+    re.IGNORECASE,
+)
+
+# Sections dropped first when a resume is over the token budget, least useful first.
+# The ones the prompts actually ask about (summary, experience, education, skills) are never dropped.
+LOW_VALUE_SECTIONS = (
+    "references", "declaration", "personal details", "interests",
+    "languages", "volunteering", "publications", "achievements", "certifications", "projects",
+)
+
+
+@dataclass
+class PreprocessedResume:
+    """
+    The cleaned-up resume text that goes into the prompts, plus the fields we
+    could pull out locally. `email`, `phone` and `links` come straight from the
+    text, so they're exact and never depend on the LLM.
+
+    `text` is trimmed to the token budget; `full_text` is the same cleaned-up
+    text before any section was dropped or the text cut off.
+    """
+    text: str
+    full_text: str = ""
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    sections: List[str] = field(default_factory=list)
+    dropped_sections: List[str] = field(default_factory=list)
+    truncated: bool = False
+    original_tokens: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def _clean_line(line: str) -> str:
+    line = MARKUP_RE.sub(" ", line)
+    line = BULLET_RE.sub("- ", line.strip())
+    return SPACES_RE.sub(" ", line).strip()
+
+
+def _normalize_page(page_text: str) -> List[str]:
+    """NFKC-normalizes a page (ligatures, odd spaces) and returns its non-blank, tidied lines."""
+    page_text = unicodedata.normalize("NFKC", page_text)
+    page_text = LINE_BREAK_TAG_RE.sub("\n", page_text)
+    lines = (_clean_line(line) for line in page_text.splitlines())
+    return [line for line in lines if line]
+
+
+def _edge_key(line: str) -> str:
+    # Page numbers and dates in running headers change from page to page, so ignore digits.
+    return DIGITS_RE.sub("#", line.lower())
+
+
+def _strip_headers_and_footers(pages: List[List[str]], edge_lines: int = 2) -> List[List[str]]:
+    """
+    Removes running headers/footers: lines near the top or bottom of a page that
+    repeat on most pages, and bare page numbers. The first copy of a repeated
+    line is kept, since running headers often carry the candidate's name.
+    """
+    counts = Counter()
+    for lines in pages:
+        edges = set(lines[:edge_lines] + lines[-edge_lines:])
+        counts.update(_edge_key(line) for line in edges)
+    min_repeats = max(2, (len(pages) + 1) // 2)
+    repeated = {key for key, count in counts.items() if count >= min_repeats}
+
+    cleaned, seen = [], set()
+    for lines in pages:
+        edge_indexes = set(range(min(edge_lines, len(lines)))) | set(range(max(0, len(lines) - edge_lines), len(lines)))
+        kept = []
+        for index, line in enumerate(lines):
+            if index in edge_indexes:
+                if PAGE_NUMBER_RE.match(line):
+                    continue
+                key = _edge_key(line)
+                if key in repeated:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            kept.append(line)
+        cleaned.append(kept)
+    return cleaned
+
+
+def _phone_candidates(text: str) -> dict:
+    """Every plausible phone number in the text, as {digits only: first spelling seen}."""
+    candidates = {}
+    for match in PHONE_RE.finditer(text):
+        candidate = match.group(0).strip(" .-")
+        digits = "".join(DIGITS_RE.findall(candidate))
+        # 10-15 digits covers national and international numbers. Date ranges like
+        # "2019.01 - 2021.03" and runs of years like "2018 - 2022 2023" are ruled out.
+        only_years = all(YEAR_RE.fullmatch(group) for group in DIGITS_RE.findall(candidate))
+        if 10 <= len(digits) <= 15 and not only_years and not YEAR_RANGE_RE.search(candidate):
+            candidates.setdefault(digits, candidate)
+    return candidates
+
+
+def _find_phone(text: str, header_text: str = "") -> Optional[str]:
+    """
+    The candidate's phone number, looked for in the header block (name and contact
+    details) first, then in the whole text. Only an unambiguous match counts: if
+    more than one different number turns up, None is returned and the LLM's
+    answer is kept instead.
+    """
+    for source in (header_text, text):
+        candidates = _phone_candidates(source)
+        if candidates:
+            return next(iter(candidates.values())) if len(candidates) == 1 else None
+    return None
+
+
+def _find_email(text: str) -> Optional[str]:
+    for match in EMAIL_RE.finditer(text):
+        local_part = match.group(0).split("@")[0]
+        if ".." not in match.group(0) and not local_part.startswith(".") and not local_part.endswith("."):
+            return match.group(0)
+    return None
+
+
+def _split_sections(lines: List[str]) -> List[tuple]:
+    """Splits lines into (section name, lines) blocks. Lines before the first heading are the "header" block."""
+    sections = [("header", [])]
+    for line in lines:
+        if len(line) <= 40 and HEADING_RE.match(line):
+            name = SECTION_ALIASES[line.rstrip(": \t").lower()]
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, block) for name, block in sections if block]
+
+
+def _join_sections(sections: List[tuple]) -> str:
+    return "\n\n".join("\n".join(block) for _, block in sections)
+
+
+def preprocess(pages: List[str], token_budget: int = None) -> PreprocessedResume:
+    """
+    Turns the per-page text from the PDF extractor into compact prompt text:
+
+    1. Normalizes unicode and whitespace, drops blank lines, stray markup and
+       duplicated lines, and strips running headers/footers and page numbers.
+    2. Pulls out the email, phone number and links with the regexes above.
+    3. If the result is over `token_budget` (LLM_PROMPT_TOKEN_BUDGET by default),
+       drops low-value sections in LOW_VALUE_SECTIONS order, and as a last
+       resort cuts the text off at the budget.
+    """
+    token_budget = token_budget or LLM_PROMPT_TOKEN_BUDGET
+    original_text = "".join(f"{page_text}\n" for page_text in pages if page_text)
+
+    page_lines = _strip_headers_and_footers([_normalize_page(page_text) for page_text in pages if page_text])
+    lines = []
+    for line in (line for page in page_lines for line in page):
+        if not lines or line != lines[-1]:
+            lines.append(line)
+
+    text = "\n".join(lines)
+    sections = _split_sections(lines)
+    header_text = "\n".join(sections[0][1]) if sections and sections[0][0] == "header" else ""
+    links = list(dict.fromkeys(match.group(0).rstrip(".,;") for match in URL_RE.finditer(text)))
+    result = PreprocessedResume(
+        text=text,
+        email=_find_email(text),
+        phone=_find_phone(text, header_text),
+        links=links,
+        original_tokens=estimate_tokens(original_text),
+    )
+
+    result.sections = list(dict.fromkeys(name for name, _ in sections))
+    result.text = result.full_text = _join_sections(sections)
+
+    for section_name in LOW_VALUE_SECTIONS:
+        if result.tokens <= token_budget:
+            break
+        if section_name in result.sections:
+            sections = [(name, block) for name, block in sections if name != section_name]
+            result.dropped_sections.append(section_name)
+            result.text = _join_sections(sections)
+
+    if result.tokens > token_budget:
+        # Keep whole lines where possible.
+        cut = result.text[: token_budget * 4]
+        result.text = cut[: cut.rfind("\n")] if "\n" in cut else cut
+        result.truncated = True
+    return result
+
+
+def apply_local_fields(extracted_data: dict, preprocessed: PreprocessedResume) -> dict:
+    """
+    Overwrites the contact fields in the LLM's extraction with the values found
+    locally, which are copied verbatim from the resume, and adds the resume's
+    links as `links`. Fields we couldn't find (or, for the phone, couldn't pin
+    down unambiguously) keep whatever the LLM returned.
+    """
+    local_fields: Dict[str, object] = {"email": preprocessed.email, "phone": preprocessed.phone, "links": preprocessed.links}
+    extracted_data = dict(extracted_data)
+    extracted_data.update({key: value for key, value in local_fields.items() if value})
+    return extracted_data
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+import uuid
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from ..core.config import REANALYSIS_BATCH_SIZE, REANALYSIS_CONCURRENCY
+from ..core.processes import pid_is_alive
+from ..db import crud
+from ..db.database import SessionalLocal
+from . import resume_details, resume_parser
+from .llm_governor import LLMUnavailableError
+
+# Bulk re-analysis: after the analysis prompt or the model changes, every stored
+# resume whose `analysis_version` isn't the current ANALYSIS_VERSION gets a fresh
+# `llm_analysis`, computed from its stored `extracted_data`. No PDF is needed.
+#
+# Resumes are read in id order, `batch_size` at a time (keyset pagination). The
+# analysis calls of a batch run concurrently, at most `concurrency` at once, and
+# the results are written back in one transaction together with the run's
+# checkpoint in 'reanalysis_runs'. Stopping at any point loses at most the batch
+# in flight, and the next run picks up right after the last committed one.
+
+# A run in one of these states can be picked up again.
+RESUMABLE_STATUSES = ("running", "paused")
+
+# Background runs started through the admin endpoint in this worker, by run id.
+_tasks = {}
+
+
+class ReanalysisInProgressError(Exception):
+    """Raised when the run to start is already being worked on by a live process."""
+    pass
+
+
+def run_to_dict(db_run) -> dict:
+    """The public view of a run, matching `schemas.reanalysis.ReanalysisRun`, with its throughput and ETA."""
+    throughput = db_run.processed / db_run.elapsed_seconds if db_run.elapsed_seconds else None
+    remaining = max(db_run.total - db_run.processed - db_run.failed, 0)
+    return {
+        "id": db_run.id,
+        "target_version": db_run.target_version,
+        "status": db_run.status,
+        "total": db_run.total,
+        "processed": db_run.processed,
+        "failed": db_run.failed,
+        "remaining": remaining,
+        "elapsed_seconds": round(db_run.elapsed_seconds, 3),
+        "throughput_per_second": round(throughput, 3) if throughput else None,
+        "eta_seconds": round(remaining / throughput, 1) if throughput and db_run.status in RESUMABLE_STATUSES else None,
+        "error": db_run.error,
+        "created_at": db_run.created_at,
+        "updated_at": db_run.updated_at,
+    }
+
+
+def _is_in_progress(db_run) -> bool:
+    """True if some process (possibly this one) is working on the run right now."""
+    if db_run.status != "running":
+        return False
+    if db_run.worker_pid == os.getpid():
+        return db_run.id in _tasks
+    return pid_is_alive(db_run.worker_pid)
+
+
+def start_run(db: Session, target_version: str = None, restart: bool = False):
+    """
+    Claims a run for this process and returns it: the unfinished run for
+    `target_version` (the current ANALYSIS_VERSION by default) if there is one,
+    so an interrupted re-analysis carries on where it stopped, or else a new run.
+
+    `restart=True` cancels the unfinished run and starts over from the first
+    resume, which also retries the resumes the old run failed on.
+    """
+    target_version = target_version or resume_parser.ANALYSIS_VERSION
+    db_run = crud.get_latest_reanalysis_run(db, target_version)
+    if db_run is not None and db_run.status in RESUMABLE_STATUSES:
+        if _is_in_progress(db_run):
+            raise ReanalysisInProgressError(f"Re-analysis run {db_run.id} is already running (pid {db_run.worker_pid}).")
+        if not restart:
+            if not crud.claim_reanalysis_run(db, db_run.id, db_run.status, db_run.worker_pid, os.getpid()):
+                raise ReanalysisInProgressError(f"Re-analysis run {db_run.id} was just picked up by another process.")
+            return crud.get_reanalysis_run(db, db_run.id)
+        crud.update_reanalysis_run(db, db_run.id, status="cancelled", worker_pid=None)
+
+    total = crud.count_stale_resumes(db, target_version)
+    return crud.create_reanalysis_run(db, str(uuid.uuid4()), target_version, total, os.getpid())
+
+
+async def run(run_id: str, batch_size: int = REANALYSIS_BATCH_SIZE, concurrency: int = REANALYSIS_CONCURRENCY, limit: int = None, on_progress=None) -> dict:
+    """
+    Works through a run claimed with `start_run` and returns its final state.
+
+    `limit` stops (pauses) the run after that many resumes, e.g. to try a new
+    prompt on a sample first. `on_progress` is called with the run's state (see
+    `run_to_dict`) after every batch.
+
+    A resume whose analysis fails with a bad reply is counted as failed and
+    skipped; a fresh run (or `restart`) tries it again. If the LLM is unavailable
+    (retries exhausted, circuit breaker open) the run pauses instead, without
+    skipping anything, so it can be resumed once the LLM is back. Cancelling the
+    task (Ctrl+C, or the app shutting down) pauses it too.
+    """
+    db = SessionalLocal()
+    try:
+        db_run = await run_in_threadpool(crud.get_reanalysis_run, db, run_id)
+        target_version, cursor = db_run.target_version, db_run.last_resume_id
+        semaphore = asyncio.Semaphore(concurrency)
+        done = 0
+
+        async def analyze(row):
+            async with semaphore:
+                try:
+                    return row.id, await resume_parser.call_gemini_for_analysis(row.extracted_data or {}), None
+                except Exception as e:
+                    return row.id, None, e
+
+        try:
+            status = "succeeded"
+            while True:
+                if limit is not None and done >= limit:
+                    status = "paused"
+                    break
+                started = time.perf_counter()
+                size = batch_size if limit is None else min(batch_size, limit - done)
+                rows = await run_in_threadpool(crud.get_stale_resumes, db, target_version, cursor, size)
+                if not rows:
+                    break
+
+                results = await asyncio.gather(*(analyze(row) for row in rows))
+                analyses = {resume_id: analysis for resume_id, analysis, e in results if e is None}
+                failures = [(resume_id, e) for resume_id, analysis, e in results if e is not None]
+                unavailable = any(isinstance(e, LLMUnavailableError) for _, e in failures)
+                error = None
+                if failures:
+                    resume_id, e = failures[-1]
+                    error = f"Resume {resume_id}: {type(e).__name__}: {e}"
+                    print(f"Re-analysis run {run_id}: {len(failures)} of {len(rows)} resumes in this batch failed. Last error: {error}")
+                if not unavailable:
+                    # Failed resumes stay stale; moving the cursor past them keeps the run from looping on them.
+                    cursor = rows[-1].id
+
+                await run_in_threadpool(
+                    crud.save_reanalysis_batch, db, run_id, analyses, target_version, cursor,
+                    0 if unavailable else len(failures), time.perf_counter() - started, error,
+                )
+                for resume_id in analyses:
+                    resume_details.invalidate(resume_id)
+                done += len(rows)
+                if on_progress is not None:
+                    on_progress(run_to_dict(await run_in_threadpool(crud.get_reanalysis_run, db, run_id)))
+                if unavailable:
+                    status = "paused"
+                    break
+        except BaseException as e:
+            # Interrupted (or a database error): the committed batches are kept and the run can be resumed.
+            message = None if isinstance(e, (asyncio.CancelledError, KeyboardInterrupt)) else f"{type(e).__name__}: {e}"
+            # A fresh session: the run's own one may still be busy in a worker thread.
+            cleanup_db = SessionalLocal()
+            try:
+                crud.update_reanalysis_run(cleanup_db, run_id, status="paused", worker_pid=None, **({"error": message} if message else {}))
+            finally:
+                cleanup_db.close()
+            raise
+
+        await run_in_threadpool(crud.update_reanalysis_run, db, run_id, status=status, worker_pid=None)
+        return run_to_dict(await run_in_threadpool(crud.get_reanalysis_run, db, run_id))
+    finally:
+        db.close()
+
+
+def start_background(run_id: str, **options):
+    """Works on a run in a background task of this worker (used by the admin endpoint)."""
+    task = asyncio.create_task(run(run_id, **options))
+    _tasks[run_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(run_id, None))
+    return task
+
+
+async def stop_all():
+    """Pauses every background run of this worker. They can be resumed later. Called on shutdown."""
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,68 @@
+import hashlib
+from sqlalchemy.orm import Session
+
+from ..core.config import RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL_SECONDS
+from ..core.lru import LRUCache
+from ..db import crud
+from .resume_parser import PIPELINE_VERSION
+
+# The fast tier: a per-worker, in-memory LRU. The 'result_cache' table is the slow,
+# persistent tier behind it that all workers (and restarts) share.
+_memory_cache = LRUCache(max_entries=RESULT_CACHE_MAX_ENTRIES, ttl_seconds=RESULT_CACHE_TTL_SECONDS)
+
+
+def normalize_text(resume_text: str) -> str:
+    """
+    Collapses all runs of whitespace so a re-exported PDF with the same words
+    (but different line breaks or spacing) produces the same text hash.
+    """
+    return " ".join(resume_text.split())
+
+
+def file_cache_key(file_sha256: str) -> str:
+    """Cache key for a byte-identical upload, given the SHA-256 hex digest of its bytes."""
+    return f"file:{PIPELINE_VERSION}:{file_sha256}"
+
+
+def text_cache_key(resume_text: str) -> str:
+    """Cache key for any PDF whose extracted text normalizes to the same content."""
+    digest = hashlib.sha256(normalize_text(resume_text).encode("utf-8")).hexdigest()
+    return f"text:{PIPELINE_VERSION}:{digest}"
+
+
+def lookup(db: Session, cache_key: str):
+    """
+    Returns the cached {"extracted_data", "llm_analysis", "resume_text"} dict for a
+    key, or None. `resume_text` is None for entries stored before it was kept.
+    Checks memory first and only falls back to the database on a miss.
+    """
+    result = _memory_cache.get(cache_key)
+    if result is not None:
+        return result
+
+    cached_row = crud.get_cached_result(db, cache_key)
+    if cached_row is None:
+        return None
+
+    result = {
+        "extracted_data": cached_row.extracted_data,
+        "llm_analysis": cached_row.llm_analysis,
+        "resume_text": cached_row.resume_text,
+    }
+    # Promote it into memory so the next hit is even cheaper.
+    _memory_cache.set(cache_key, result)
+    return result
+
+
+def store(db: Session, cache_keys: list, result: dict):
+    """Saves a result under every given key, in both tiers."""
+    crud.save_cached_results(
+        db,
+        cache_keys=cache_keys,
+        pipeline_version=PIPELINE_VERSION,
+        extracted_data=result["extracted_data"],
+        llm_analysis=result["llm_analysis"],
+        resume_text=result.get("resume_text"),
+    )
+    for cache_key in cache_keys:
+        _memory_cache.set(cache_key, result)
@@ -0,0 +1,102 @@
+import datetime
+import hashlib
+from dataclasses import dataclass
+from email.utils import format_datetime, parsedate_to_datetime
+
+import orjson
+
+from ..core.config import RESUME_DETAIL_CACHE_MAX_ENTRIES, RESUME_DETAIL_CACHE_TTL_SECONDS
+from ..core.lru import LRUCache
+
+# GET /api/resumes/{id} is called over and over for the same records (the details
+# modal refetches every time it opens), and a saved resume only changes when it is
+# re-analyzed (see services/reanalysis.py, which invalidates its entry). So the
+# rendered JSON body is kept here per worker, together with its validators, and
+# repeat requests skip the database, the decompression and the serialization.
+_detail_cache = LRUCache(max_entries=RESUME_DETAIL_CACHE_MAX_ENTRIES, ttl_seconds=RESUME_DETAIL_CACHE_TTL_SECONDS)
+
+
+def resume_to_dict(db_resume) -> dict:
+    """The full public view of a resume row, matching `schemas.resume.Resume`."""
+    return {
+        "id": db_resume.id,
+        "filename": db_resume.filename,
+        "name": db_resume.name,
+        "email": db_resume.email,
+        "phone": db_resume.phone,
+        "uploaded_at": db_resume.uploaded_at,
+        "extracted_data": db_resume.extracted_data,
+        "llm_analysis": db_resume.llm_analysis,
+    }
+
+
+@dataclass
+class RenderedResume:
+    """A ready-to-send resume details response."""
+    body: bytes
+    etag: str
+    last_modified: datetime.datetime
+
+    @property
+    def headers(self) -> dict:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified.replace(tzinfo=datetime.timezone.utc), usegmt=True),
+            # The browser may keep the response, but must check back (and gets a 304) before reusing it.
+            "Cache-Control": "private, no-cache",
+        }
+
+
+def render(db_resume) -> RenderedResume:
+    """
+    Serializes a resume row straight to JSON bytes with orjson and caches the result.
+
+    Rows from our own database are trusted, so this skips the Pydantic validation
+    a `response_model` would do. The ETag is a hash of the exact body, so it's a
+    strong validator: it changes whenever a single byte of the response would.
+    Last-Modified is when the analysis was last written, so a re-analyzed resume
+    isn't reported as unchanged since its upload.
+    """
+    body = orjson.dumps(resume_to_dict(db_resume))
+    rendered = RenderedResume(
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        last_modified=(db_resume.analyzed_at or db_resume.uploaded_at).replace(microsecond=0),
+    )
+    _detail_cache.set(db_resume.id, rendered)
+    return rendered
+
+
+def get_cached(resume_id: int):
+    """The cached response for a resume, or None."""
+    return _detail_cache.get(resume_id)
+
+
+def invalidate(resume_id: int):
+    """Forgets a resume's cached response (call it whenever the row changes or is deleted)."""
+    _detail_cache.delete(resume_id)
+
+
+def is_not_modified(request_headers, rendered: RenderedResume) -> bool:
+    """
+    True if the client's cached copy is still current, i.e. we can answer 304.
+    If-None-Match wins over If-Modified-Since when both are sent (RFC 9110).
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as the spec asks for If-None-Match: W/"x" matches "x".
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return rendered.etag in candidates
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return rendered.last_modified <= since
+    return False
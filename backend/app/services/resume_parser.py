@@ -1,84 +1,139 @@
-import pdfplumber
-import google.generativeai as genai
+import asyncio
+import inspect
 import json
+import random
+import re
 import time
 import functools
-from ..core.config import GEMINI_API_KEY
+import hashlib
+from fastapi.concurrency import run_in_threadpool
+from ..core import metrics
+from ..core.config import LLM_RETRY_ATTEMPTS, LLM_RETRY_INITIAL_DELAY, LLM_RETRY_MAX_DELAY
+from .llm_governor import llm_governor, LLMUnavailableError
+from .llm_providers import get_provider, TransientLLMError
+from .preprocessing import PREPROCESSING_VERSION
 
-# Import specific exceptions for robust retry handling
-from google.api_core import exceptions as google_api_exceptions
+
+# Errors worth retrying. Each provider translates its SDK's rate-limit, overload
+# and timeout errors into TransientLLMError, so this works for any backend.
+TRANSIENT_LLM_ERRORS = (TransientLLMError,)
+
+# Gemini's 429s say how long to back off, either as a RetryInfo detail
+# ("retry_delay { seconds: 31 }") or in the message ("Please retry in 31.2s.").
+_RETRY_HINT_PATTERNS = (
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+(?:\.\d+)?)"),
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+)
+
+
+def _retry_hint_seconds(error):
+    """The server's suggested wait before retrying, if the error carries one."""
+    hint = getattr(error, "retry_after", None)
+    if hint is not None:
+        return float(hint)
+    message = str(error)
+    for pattern in _RETRY_HINT_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def _backoff_delay(attempt, initial_delay, backoff_factor, max_delay, error):
+    """
+    "Full jitter" exponential backoff: a random wait between 0 and the exponential
+    cap. Spreading the retries out stops every worker that failed at the same
+    moment from retrying at the same moment too (the thundering herd). A retry
+    hint from the server is treated as a minimum.
+    """
+    delay = random.uniform(0, min(max_delay, initial_delay * backoff_factor ** attempt))
+    hint = _retry_hint_seconds(error)
+    if hint is not None:
+        delay = max(delay, hint)
+    return delay
 
 
 # --- Retry Decorator ---
-def retry_with_backoff(retries=3, initial_delay=2, backoff_factor=2):
+def retry_with_backoff(retries=LLM_RETRY_ATTEMPTS, initial_delay=LLM_RETRY_INITIAL_DELAY, backoff_factor=2, max_delay=LLM_RETRY_MAX_DELAY):
     """
-    A decorator for retrying a function call with exponential backoff.
+    A decorator for retrying a function call with jittered exponential backoff.
 
     This is super useful for external API calls. Sometimes the API is temporarily
     overloaded or has a hiccup. Instead of failing immediately, this will wait
     and try again a few times.
 
-    This will retry on specific Google API exceptions that are often transient:
-    - ResourceExhausted: Rate limit exceeded.
-    - ServiceUnavailable: Temporary server-side issue.
-    - DeadlineExceeded: Request timed out.
+    It works on both regular and `async def` functions, and only retries the
+    errors in TRANSIENT_LLM_ERRORS. If the server asks for a longer wait than
+    `max_delay`, or the circuit breaker is open, it gives up straight away. When
+    it gives up it raises LLMUnavailableError with the last error as its cause.
     """
+    def give_up(attempts, error, retry_after=None):
+        return LLMUnavailableError(
+            f"LLM call failed after {attempts} attempt(s): {type(error).__name__}: {error}",
+            retry_after=retry_after,
+        )
+
     def decorator(func):
+        # Coroutine functions get an async wrapper that sleeps with asyncio.sleep,
+        # so a backoff never blocks the event loop (and every other request with it).
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in range(retries):
+                    try:
+                        return await func(*args, **kwargs)
+                    except TRANSIENT_LLM_ERRORS as e:
+                        delay = _backoff_delay(attempt, initial_delay, backoff_factor, max_delay, e)
+                        if attempt + 1 == retries or delay > max_delay:
+                            raise give_up(attempt + 1, e, retry_after=delay) from e
+                        print(f"LLM call failed with {type(e).__name__}, attempt {attempt + 1} of {retries}. Retrying in {delay:.1f}s...")
+                        metrics.LLM_RETRIES.labels(function=func.__name__).inc()
+                        with metrics.timed("llm_retry_sleep"):
+                            await asyncio.sleep(delay)
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            delay = initial_delay
-            for i in range(retries):
+            for attempt in range(retries):
                 try:
                     # Try to run the function (e.g., our API call)
                     return func(*args, **kwargs)
-                except (
-                    google_api_exceptions.ResourceExhausted,
-                    google_api_exceptions.ServiceUnavailable,
-                    google_api_exceptions.DeadlineExceeded
-                ) as e:
+                except TRANSIENT_LLM_ERRORS as e:
                     # If we hit one of the specified errors, we don't give up yet.
-                    print(f"LLM call failed with {type(e).__name__}, attempt {i + 1} of {retries}. Retrying in {delay}s...")
-                    time.sleep(delay)
-                    # Increase the delay for the next potential retry.
-                    delay *= backoff_factor
-            # If all retries fail, we finally give up and raise an exception.
-            raise Exception(f"LLM call failed after {retries} retries.")
+                    delay = _backoff_delay(attempt, initial_delay, backoff_factor, max_delay, e)
+                    if attempt + 1 == retries or delay > max_delay:
+                        raise give_up(attempt + 1, e, retry_after=delay) from e
+                    print(f"LLM call failed with {type(e).__name__}, attempt {attempt + 1} of {retries}. Retrying in {delay:.1f}s...")
+                    metrics.LLM_RETRIES.labels(function=func.__name__).inc()
+                    with metrics.timed("llm_retry_sleep"):
+                        time.sleep(delay)
         return wrapper
     return decorator
 
 
-# Configure the Gemini API with our key.
-genai.configure(api_key=GEMINI_API_KEY)
-# We're using the 'flash' model because it's fast and great for this kind of task.
-model = genai.GenerativeModel('gemini-1.5-flash')
+# The LLM backend, picked by LLM_PROVIDER (Gemini by default, or the offline stub).
+# Nothing is loaded or configured until the first call.
+provider = get_provider()
+MODEL_NAME = f"{provider.name}:{provider.model_name}"
 
-def parse_pdf_to_text(file_content: bytes) -> str:
-    """Extracts text from a PDF file's content using pdfplumber."""
-    import io
-    text = ""
-    # We use io.BytesIO to treat our in-memory file content like a real file.
-    with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-        for page in pdf.pages:
-            # Added a check for None to handle blank pages or pages with only images.
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
 
-# Apply our new retry decorator to both LLM calls.
-@retry_with_backoff(retries=3, initial_delay=2)
-def call_gemini_for_extraction(resume_text: str) -> dict:
+# --- Prompts ---
+# This is our prompt engineering. We're telling the AI exactly what to do
+# and what format to use for the response. This is key to getting reliable JSON back.
+# They live at module level (as `str.format` templates) so we can fingerprint them
+# for the result cache below.
+
+def _compact_prompt(template: str) -> str:
     """
-    Sends resume text to Gemini for structured data extraction.
-    Now includes a retry mechanism for transient API errors and rate limits.
+    Drops the source-code indentation from a prompt template. The model doesn't
+    need it, and it's a few hundred characters of input on every call.
     """
-    # This is our prompt engineering. We're telling the AI exactly what to do
-    # and what format to use for the response. This is key to getting reliable JSON back.
-    prompt = f"""
-    Act as an expert HR recruiter and technical parser. Your task is to extract structured information from the following resume text and return it as a clean, valid JSON object. Do not include any explanatory text or markdown formatting around the JSON.
+    return "\n".join(line.strip() for line in template.strip().splitlines())
 
-    The JSON object must have the following schema:
-    {{
+
+# The shape we ask the model to extract resumes into, shared by the extraction
+# and single-pass prompts. Braces are doubled because it is part of `str.format` templates.
+RESUME_JSON_SCHEMA = """{{
       "name": "string",
       "email": "string",
       "phone": "string",
@@ -101,56 +156,183 @@ def call_gemini_for_extraction(resume_text: str) -> dict:
           "year": "string"
         }}
       ]
-    }}
+    }}"""
+
+EXTRACTION_PROMPT_TEMPLATE = _compact_prompt("""
+    Act as an expert HR recruiter and technical parser. Your task is to extract structured information from the following resume text and return it as a clean, valid JSON object. Do not include any explanatory text or markdown formatting around the JSON.
+
+    The JSON object must have the following schema:
+    """ + RESUME_JSON_SCHEMA + """
+
+    Resume Text:
+    ---
+    {resume_text}
+    ---
+    """)
+
+ANALYSIS_PROMPT_TEMPLATE = _compact_prompt("""
+    Act as an expert career coach. Based on the provided resume data in JSON format, provide a critical analysis. 
+    
+    Return a JSON object with three keys: 
+    1.  'resume_rating': A score from 1 to 10, where 10 is excellent.
+    2.  'improvement_areas': A paragraph with actionable advice and specific examples on how to improve the resume.
+    3.  'upskill_suggestions': A list of 3-5 relevant skills to learn, with a brief, compelling explanation for why each is valuable for the candidate's profile.
+
+    JSON Resume Data:
+    ---
+    {extracted_json}
+    ---
+    """)
+
+# Used in "single_pass" mode: extraction and analysis in one structured-output call.
+SINGLE_PASS_PROMPT_TEMPLATE = _compact_prompt("""
+    Act as an expert HR recruiter, technical parser and career coach. Read the resume text below and return one clean, valid JSON object with exactly two keys. Do not include any explanatory text or markdown formatting around the JSON.
+
+    1.  'extracted_data': the structured information from the resume, following this schema:
+    """ + RESUME_JSON_SCHEMA + """
+
+    2.  'llm_analysis': a critical analysis of the resume, as an object with three keys:
+        'resume_rating': A score from 1 to 10, where 10 is excellent.
+        'improvement_areas': A paragraph with actionable advice and specific examples on how to improve the resume.
+        'upskill_suggestions': A list of 3-5 relevant skills to learn, with a brief, compelling explanation for why each is valuable for the candidate's profile.
 
     Resume Text:
     ---
     {resume_text}
     ---
+    """)
+
+# A short fingerprint of the model, prompts and text preprocessing. Anything cached or
+# stored under an older version is treated as stale once any of them change. Both modes
+# produce the same shape of result, so they share one cache.
+PIPELINE_VERSION = hashlib.sha256(
+    (MODEL_NAME + PREPROCESSING_VERSION + EXTRACTION_PROMPT_TEMPLATE + ANALYSIS_PROMPT_TEMPLATE + SINGLE_PASS_PROMPT_TEMPLATE).encode("utf-8")
+).hexdigest()[:12]
+
+# The same kind of fingerprint, but only of what goes into `llm_analysis`: the model
+# and the prompts that write it. It is stored on every Resume, and rows with an older
+# one can be brought up to date with `python -m app.cli reanalyze`, which re-runs
+# the analysis on the stored extraction without needing the PDF again.
+ANALYSIS_VERSION = hashlib.sha256(
+    (MODEL_NAME + ANALYSIS_PROMPT_TEMPLATE + SINGLE_PASS_PROMPT_TEMPLATE).encode("utf-8")
+).hexdigest()[:12]
+
+async def _generate_json(prompt: str, task: str, json_output: bool = False) -> dict:
+    """
+    Sends a prompt to the configured LLM provider and parses the JSON reply.
+    Providers are async (Gemini uses the SDK's async client), so the event loop
+    is free to serve other requests while we wait on the network.
+
+    `task` says which prompt this is ("extraction", "analysis" or "single_pass"),
+    and `json_output` asks the provider for structured (JSON-only) output.
+
+    Every call goes through the shared LLM governor (rate limits, concurrency
+    cap, circuit breaker) and reports back whether it hit a transient error.
+    The wait for the governor and the call itself are timed as separate stages
+    ("llm_wait" and "llm_<task>"), along with the prompt and reply sizes.
+    """
+    metrics.LLM_PROMPT_CHARS.labels(task=task).observe(len(prompt))
+    waiting_since = time.perf_counter()
+    async with llm_governor.slot(prompt):
+        metrics.record_stage("llm_wait", time.perf_counter() - waiting_since)
+        try:
+            with metrics.timed(f"llm_{task}"):
+                response_text = await provider.generate(prompt, task=task, json_output=json_output)
+        except TRANSIENT_LLM_ERRORS:
+            metrics.LLM_CALLS.labels(task=task, outcome="transient_error").inc()
+            await run_in_threadpool(llm_governor.record_failure)
+            raise
+    metrics.LLM_CALLS.labels(task=task, outcome="ok").inc()
+    metrics.LLM_RESPONSE_CHARS.labels(task=task).observe(len(response_text))
+    await run_in_threadpool(llm_governor.record_success)
+    # Sometimes the model wraps the JSON in markdown, so we clean that up.
+    json_text = response_text.strip().replace("```json", "").replace("```", "")
+    return json.loads(json_text)
+
+def parse_pdf_to_text(file_content: bytes) -> str:
+    """
+    Extracts text from a PDF file's content using pdfplumber, in this process.
+    The upload pipeline uses the process-pool engine in `pdf_extraction` instead;
+    this stays as a simple, dependency-light helper for scripts.
+    """
+    import io
+    # Imported here, so loading the app (or any read-only endpoint) doesn't pay for pdfplumber.
+    import pdfplumber
+
+    page_texts = []
+    # We use io.BytesIO to treat our in-memory file content like a real file.
+    with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+        for page in pdf.pages:
+            # Added a check for None to handle blank pages or pages with only images.
+            page_text = page.extract_text()
+            if page_text:
+                page_texts.append(page_text + "\n")
+    return "".join(page_texts)
+
+# Apply our new retry decorator to both LLM calls.
+@retry_with_backoff()
+async def call_gemini_for_extraction(resume_text: str) -> dict:
     """
+    Sends resume text to Gemini for structured data extraction.
+    Now includes a retry mechanism for transient API errors and rate limits.
+    """
+    prompt = EXTRACTION_PROMPT_TEMPLATE.format(resume_text=resume_text)
     try:
-        response = model.generate_content(prompt)
-        # Sometimes the model wraps the JSON in markdown, so we clean that up.
-        json_text = response.text.strip().replace("```json", "").replace("```", "")
-        return json.loads(json_text)
+        return await _generate_json(prompt, task="extraction")
     except json.JSONDecodeError:
         # If the model gives us something that isn't valid JSON, we can't proceed.
         print("Error: LLM returned malformed JSON during extraction.")
         raise ValueError("Failed to get structured data from LLM due to malformed JSON.")
+    except LLMUnavailableError:
+        # The governor failing fast (circuit open, out of quota). That is expected during
+        # an outage, so don't log it once per request; the caller reports it.
+        raise
     except Exception as e:
         # Catch any other unexpected errors during the call.
         print(f"An unexpected error occurred during Gemini extraction call: {e}")
         # Re-raise the exception to be handled by the retry decorator or the API endpoint.
         raise e
 
-@retry_with_backoff(retries=3, initial_delay=2)
-def call_gemini_for_analysis(extracted_data: dict) -> dict:
+@retry_with_backoff()
+async def call_gemini_for_analysis(extracted_data: dict) -> dict:
     """
     Sends the extracted JSON data to Gemini for analysis and suggestions.
     This second call lets the AI focus on one task at a time, improving quality.
     """
-    prompt = f"""
-    Act as an expert career coach. Based on the provided resume data in JSON format, provide a critical analysis. 
-    
-    Return a JSON object with three keys: 
-    1.  'resume_rating': A score from 1 to 10, where 10 is excellent.
-    2.  'improvement_areas': A paragraph with actionable advice and specific examples on how to improve the resume.
-    3.  'upskill_suggestions': A list of 3-5 relevant skills to learn, with a brief, compelling explanation for why each is valuable for the candidate's profile.
-
-    JSON Resume Data:
-    ---
-    {json.dumps(extracted_data, indent=2)}
-    ---
-    """
+    # Compact JSON: indentation would only cost us tokens, the model doesn't need it.
+    prompt = ANALYSIS_PROMPT_TEMPLATE.format(
+        extracted_json=json.dumps(extracted_data, separators=(",", ":"), ensure_ascii=False)
+    )
     try:
-        response = model.generate_content(prompt)
-        # Same cleanup as before.
-        json_text = response.text.strip().replace("```json", "").replace("```", "")
-        return json.loads(json_text)
+        return await _generate_json(prompt, task="analysis")
     except json.JSONDecodeError:
         print("Error: LLM returned malformed JSON during analysis.")
         raise ValueError("Failed to get analysis from LLM due to malformed JSON.")
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         print(f"An unexpected error occurred during Gemini analysis call: {e}")
         # Re-raise the exception to be handled by the retry decorator or the API endpoint
-        raise e
\ No newline at end of file
+        raise e
+
+@retry_with_backoff()
+async def call_gemini_single_pass(resume_text: str) -> dict:
+    """
+    Extraction and analysis in a single structured-output call ("single_pass" mode).
+    Returns {"extracted_data": {...}, "llm_analysis": {...}}, the same two blobs the
+    two-call pipeline produces, for roughly half the round-trip latency.
+    """
+    prompt = SINGLE_PASS_PROMPT_TEMPLATE.format(resume_text=resume_text)
+    try:
+        result = await _generate_json(prompt, task="single_pass", json_output=True)
+    except json.JSONDecodeError:
+        print("Error: LLM returned malformed JSON during single-pass analysis.")
+        raise ValueError("Failed to get structured data from LLM due to malformed JSON.")
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        print(f"An unexpected error occurred during Gemini single-pass call: {e}")
+        raise e
+    if not isinstance(result, dict) or not isinstance(result.get("extracted_data"), dict) or not isinstance(result.get("llm_analysis"), dict):
+        raise ValueError("LLM single-pass response is missing 'extracted_data' or 'llm_analysis'.")
+    return {"extracted_data": result["extracted_data"], "llm_analysis": result["llm_analysis"]}
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.config import UPLOAD_DIR, UPLOAD_CHUNK_SIZE, MAX_FILE_SIZE_BYTES, MAX_FILE_SIZE_MB
+
+# Every PDF starts with this signature. The spec allows a little junk before it,
+# so we look for it anywhere in the first kilobyte.
+PDF_MAGIC = b"%PDF"
+PDF_MAGIC_SEARCH_BYTES = 1024
+
+# The 413 detail for an oversized upload, also sent by MaxBodySizeMiddleware (see main.py).
+UPLOAD_TOO_LARGE_DETAIL = f"File size exceeds the limit of {MAX_FILE_SIZE_MB} MB."
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload grows past MAX_FILE_SIZE_BYTES while it is being read."""
+    pass
+
+
+class NotAPDFError(Exception):
+    """Raised when the first bytes of an upload don't look like a PDF."""
+    pass
+
+
+@dataclass
+class StoredUpload:
+    """An upload that has been copied to a file on disk, with its size and SHA-256."""
+    path: str
+    size: int
+    sha256: str
+
+    def cleanup(self):
+        """Deletes the file. Safe to call more than once."""
+        Path(self.path).unlink(missing_ok=True)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file on disk, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(UPLOAD_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def store_upload(file: UploadFile, max_bytes: int = MAX_FILE_SIZE_BYTES) -> StoredUpload:
+    """
+    Copies an upload to a file in UPLOAD_DIR one chunk at a time.
+
+    The size limit is enforced as the chunks arrive, the PDF signature is checked
+    on the first chunk, and the SHA-256 is computed along the way, so the file is
+    never held in memory whole and never read twice. The parser then opens the
+    stored file by path. The caller owns the returned file and must `cleanup()` it.
+    """
+    Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_DIR)
+    hasher = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0 and PDF_MAGIC not in chunk[:PDF_MAGIC_SEARCH_BYTES]:
+                    raise NotAPDFError("Invalid file content. The file does not look like a PDF.")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(UPLOAD_TOO_LARGE_DETAIL)
+                hasher.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        # Don't leave half-written files behind, whatever went wrong.
+        Path(path).unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(path=path, size=size, sha256=hasher.hexdigest())
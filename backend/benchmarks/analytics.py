@@ -0,0 +1,111 @@
+"""
+Analytics queries at different table sizes: pre-aggregated counters vs scanning the blobs.
+
+For each size, seeds a throwaway SQLite database with N resumes (random skills,
+ratings and upskill suggestions from fixed pools), backfills the counters with
+`analytics.rebuild`, then times the top-skills, rating histogram and upskill
+trend queries against the same answers computed by decoding every JSON blob.
+It also reports how long saving one resume takes (row, search index and counters).
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.analytics --sizes 1000,10000,100000
+"""
+import argparse
+import collections
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SKILLS = [f"Skill {i}" for i in range(500)]
+SUGGESTIONS = [f"Area {i}: worth learning because it is in demand." for i in range(50)]
+
+
+def random_resume(rng: random.Random, index: int, started: datetime.datetime) -> dict:
+    return {
+        "filename": f"resume-{index}.pdf",
+        "name": f"Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "uploaded_at": started + datetime.timedelta(minutes=index),
+        "extracted_data": {"summary": "Engineer. " * 30, "core_skills": rng.sample(SKILLS, 12), "soft_skills": rng.sample(SKILLS, 3)},
+        "llm_analysis": {"resume_rating": rng.randint(1, 10), "upskill_suggestions": rng.sample(SUGGESTIONS, 4)},
+    }
+
+
+def _time_ms(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(rows: int):
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import analytics, crud, models, search
+    from app.db.database import create_db_engine
+
+    engine = create_db_engine(f"sqlite:///{tempfile.mkdtemp(prefix='resume-bench-')}/bench.db")
+    models.Base.metadata.create_all(bind=engine)
+    search.create_search_index(engine)
+    rng = random.Random(rows)
+    started = datetime.datetime(2024, 1, 1)
+    for offset in range(0, rows, 5000):
+        with engine.begin() as conn:
+            conn.execute(models.Resume.__table__.insert(), [random_resume(rng, i, started) for i in range(offset, min(offset + 5000, rows))])
+
+    db = sessionmaker(bind=engine)()
+    try:
+        rebuild_started = time.perf_counter()
+        analytics.rebuild(db)
+        rebuild_seconds = time.perf_counter() - rebuild_started
+
+        def scan():
+            skills, ratings, suggestions = collections.Counter(), collections.Counter(), collections.Counter()
+            for row in db.query(models.Resume.extracted_data, models.Resume.llm_analysis).yield_per(1000):
+                skills.update({analytics.normalize(s) for s in row.extracted_data["core_skills"] + row.extracted_data["soft_skills"]})
+                ratings[analytics.parse_rating(row.llm_analysis["resume_rating"])] += 1
+                suggestions.update({analytics.normalize(analytics.suggestion_name(s)) for s in row.llm_analysis["upskill_suggestions"]})
+            return skills.most_common(20), ratings, suggestions.most_common(10)
+
+        def counters():
+            analytics.top_skills(db, limit=20)
+            analytics.rating_histogram(db)
+            analytics.upskill_trends(db, limit=10, months=12)
+
+        index = rows
+
+        def save_with_counters():
+            nonlocal index
+            crud.create_resume(db, random_resume(rng, index, started))
+            index += 1
+
+        scan_ms, counters_ms = _time_ms(scan, repeats=3), _time_ms(counters)
+        save_ms = _time_ms(save_with_counters, repeats=50)
+        print(f"  {rows:>8} rows: blob scan {scan_ms:9.1f}ms, counters {counters_ms:6.2f}ms, "
+              f"save a resume {save_ms:5.2f}ms, rebuild {rebuild_seconds:6.1f}s")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    # Keep the benchmark's database away from the real one.
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    print("all three dashboard queries, median of repeated runs:")
+    for size in args.sizes.split(","):
+        run(int(size))
@@ -0,0 +1,163 @@
+"""
+Read/write concurrency benchmark for the SQLite setup.
+
+Seeds a throwaway database, then for a fixed time runs writer threads that save
+resumes through `crud.create_resume` (the same transaction an upload commits:
+insert, row counter, search index) alongside reader threads that fetch a History
+page and a resume's details. It does this twice:
+
+- "rollback journal": the engine as it used to be built (default journaling,
+  no pragmas, default pool);
+- "WAL": `database.create_db_engine`, with WAL, busy_timeout and the other pragmas.
+
+For each it reports write and read throughput, read latency percentiles, and
+how many operations failed with "database is locked".
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.db_concurrency --writers 4 --readers 16 --seconds 10
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+EXTRACTED_DATA = {
+    "name": "Bench Candidate",
+    "email": "bench@example.com",
+    "summary": "Backend engineer. " * 40,
+    "core_skills": ["Python", "FastAPI", "SQL", "Docker", "AWS"] * 4,
+    "experience": [{"title": "Engineer", "company": "Acme", "dates": "2020-2024", "description": "Built things. " * 30}] * 3,
+}
+LLM_ANALYSIS = {"resume_rating": 7, "improvement_areas": "Be more specific. " * 30, "upskill_suggestions": ["Go", "Kubernetes"]}
+
+
+def build_engine(label: str, path: str):
+    from sqlalchemy import create_engine
+    from app.db.database import create_db_engine
+
+    url = f"sqlite:///{path}"
+    if label == "rollback journal":
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_db_engine(url)
+
+
+def seed(engine, rows: int):
+    from app.db import models, search
+
+    models.Base.metadata.create_all(bind=engine)
+    search.create_search_index(engine)
+    started = datetime.datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(models.Resume.__table__.insert(), [
+            {
+                "filename": f"resume-{i}.pdf",
+                "name": f"Candidate {i}",
+                "email": f"candidate{i}@example.com",
+                "uploaded_at": started + datetime.timedelta(minutes=i),
+                "extracted_data": EXTRACTED_DATA,
+                "llm_analysis": LLM_ANALYSIS,
+            }
+            for i in range(rows)
+        ])
+
+
+def run(label: str, path: str, rows: int, writers: int, readers: int, seconds: float) -> dict:
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+    from app.db import crud
+
+    engine = build_engine(label, path)
+    seed(engine, rows)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    deadline = time.monotonic() + seconds
+    lock = threading.Lock()
+    stats = {"writes": 0, "reads": 0, "locked": 0, "read_ms": [], "write_ms": []}
+
+    def record(key, elapsed_ms=None, timings=None):
+        with lock:
+            stats[key] += 1
+            if timings is not None:
+                stats[timings].append(elapsed_ms)
+
+    def writer(number):
+        count = 0
+        while time.monotonic() < deadline:
+            db = Session()
+            started = time.perf_counter()
+            try:
+                crud.create_resume(db, resume_data={
+                    "filename": f"w{number}-{count}.pdf",
+                    "name": f"Writer {number}",
+                    "email": "writer@example.com",
+                    "extracted_data": EXTRACTED_DATA,
+                    "llm_analysis": LLM_ANALYSIS,
+                })
+                record("writes", (time.perf_counter() - started) * 1000, "write_ms")
+            except OperationalError:
+                db.rollback()
+                record("locked")
+            finally:
+                db.close()
+            count += 1
+
+    def reader():
+        while time.monotonic() < deadline:
+            db = Session()
+            started = time.perf_counter()
+            try:
+                crud.get_resumes(db, limit=20)
+                crud.get_resume(db, resume_id=random.randint(1, rows))
+                record("reads", (time.perf_counter() - started) * 1000, "read_ms")
+            except OperationalError:
+                db.rollback()
+                record("locked")
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return stats
+
+
+def percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else float("nan")
+
+
+def main(rows: int, writers: int, readers: int, seconds: float):
+    print(f"{rows} seeded rows, {writers} writer and {readers} reader threads, {seconds}s per run")
+    for label in ("rollback journal", "WAL"):
+        path = os.path.join(tempfile.mkdtemp(prefix="resume-bench-"), "bench.db")
+        stats = run(label, path, rows, writers, readers, seconds)
+        print(
+            f"  {label:<17} writes {stats['writes'] / seconds:7.1f}/s (p99 {percentile(stats['write_ms'], 99):7.1f}ms)  "
+            f"reads {stats['reads'] / seconds:7.1f}/s (p50 {statistics.median(stats['read_ms']) if stats['read_ms'] else float('nan'):6.1f}ms, "
+            f"p99 {percentile(stats['read_ms'], 99):7.1f}ms)  locked errors {stats['locked']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    main(args.rows, args.writers, args.readers, args.seconds)
@@ -0,0 +1,128 @@
+"""
+Memory and throughput of the bulk export (GET /api/resumes/export) at a large table size.
+
+Seeds a throwaway SQLite database with N resumes (in batches, so seeding itself
+stays small), then runs the export generator for each format while a background
+thread samples the process's resident memory. It reports rows/s, output size
+and how far memory rose above where it started. With `--ceiling-mb` it exits
+with status 1 if any format goes over that many MB.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.export_memory --rows 500000 --ceiling-mb 64
+"""
+import argparse
+import datetime
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+EXTRACTED_DATA = {
+    "name": "Bench Candidate",
+    "email": "bench@example.com",
+    "summary": "Backend engineer. " * 40,
+    "core_skills": ["Python", "FastAPI", "SQL", "Docker", "AWS"] * 4,
+    "soft_skills": ["Communication", "Ownership"],
+    "experience": [{"title": "Engineer", "company": "Acme", "dates": "2020-2024", "description": "Built things. " * 30}] * 3,
+}
+LLM_ANALYSIS = {"resume_rating": 7, "improvement_areas": "Be more specific. " * 30, "upskill_suggestions": ["Go", "Kubernetes"]}
+
+PAGE_SIZE = resource.getpagesize()
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / 1024 / 1024
+
+
+class PeakSampler:
+    """Samples resident memory every few milliseconds and keeps the highest value."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+
+
+def seed(rows: int, batch: int = 5000):
+    from app.db import models
+    from app.db.database import engine
+
+    models.Base.metadata.create_all(bind=engine)
+    started = datetime.datetime(2020, 1, 1)
+    for offset in range(0, rows, batch):
+        with engine.begin() as conn:
+            conn.execute(models.Resume.__table__.insert(), [
+                {
+                    "filename": f"resume-{i}.pdf",
+                    "name": f"Candidate {i}",
+                    "email": f"candidate{i}@example.com",
+                    "uploaded_at": started + datetime.timedelta(minutes=i),
+                    "extracted_data": EXTRACTED_DATA,
+                    "llm_analysis": LLM_ANALYSIS,
+                }
+                for i in range(offset, min(offset + batch, rows))
+            ])
+
+
+def main(rows: int, formats: list, ceiling_mb: float):
+    from app.services import export
+
+    started = time.perf_counter()
+    seed(rows)
+    print(f"seeded {rows} rows in {time.perf_counter() - started:.0f}s")
+
+    if "parquet" in formats:
+        # Load pyarrow up front, so the library's own footprint isn't counted as export memory.
+        import pyarrow.parquet  # noqa: F401
+
+    over_ceiling = False
+    for export_format in formats:
+        baseline = rss_mb()
+        output_bytes = 0
+        started = time.perf_counter()
+        with PeakSampler() as sampler:
+            for chunk in export.stream_export(export_format):
+                output_bytes += len(chunk)
+        elapsed = time.perf_counter() - started
+        growth = sampler.peak - baseline
+        over_ceiling = over_ceiling or (ceiling_mb is not None and growth > ceiling_mb)
+        print(f"  {export_format:<8} {rows / elapsed:9.0f} rows/s, {output_bytes / 1024 / 1024:8.1f} MB out, "
+              f"memory +{growth:6.1f} MB (peak {sampler.peak:6.1f} MB)")
+
+    if over_ceiling:
+        print(f"FAIL: memory grew by more than {ceiling_mb} MB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--formats", default="ndjson,csv,parquet")
+    parser.add_argument("--ceiling-mb", type=float, default=None)
+    args = parser.parse_args()
+
+    # Keep the benchmark's database away from the real one.
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    main(args.rows, args.formats.split(","), args.ceiling_mb)
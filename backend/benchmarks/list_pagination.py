@@ -0,0 +1,102 @@
+"""
+Benchmark for the History list query at a large table size.
+
+Seeds a throwaway SQLite database with N resumes (with realistic JSON blobs),
+then compares a page deep in the history fetched the old way (full rows +
+OFFSET) against the new way (summary columns + keyset cursor), and COUNT(*)
+against the running counter.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.list_pagination --rows 100000 --depth 95000
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+EXTRACTED_DATA = {
+    "name": "Bench Candidate",
+    "email": "bench@example.com",
+    "summary": "Backend engineer. " * 40,
+    "core_skills": ["Python", "FastAPI", "SQL", "Docker", "AWS"] * 4,
+    "experience": [{"title": "Engineer", "company": "Acme", "dates": "2020-2024", "description": "Built things. " * 30}] * 3,
+}
+LLM_ANALYSIS = {"resume_rating": 7, "improvement_areas": "Be more specific. " * 30, "upskill_suggestions": ["Go", "Kubernetes"]}
+
+
+def _time_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(rows: int, depth: int, page_size: int, repeats: int):
+    from app.db import crud, models
+    from app.db.database import engine, SessionalLocal
+
+    models.Base.metadata.create_all(bind=engine)
+    started = datetime.datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(models.Resume.__table__.insert(), [
+            {
+                "filename": f"resume-{i}.pdf",
+                "name": f"Candidate {i}",
+                "email": f"candidate{i}@example.com",
+                "uploaded_at": started + datetime.timedelta(minutes=i),
+                "extracted_data": EXTRACTED_DATA,
+                "llm_analysis": LLM_ANALYSIS,
+            }
+            for i in range(rows)
+        ])
+    print(f"seeded {rows} rows")
+
+    db = SessionalLocal()
+    try:
+        def old_page():
+            db.query(models.Resume).order_by(models.Resume.id.desc()).offset(depth).limit(page_size).all()
+            db.expunge_all()
+
+        # The cursor a client would hold after paging down to `depth`.
+        boundary = crud.get_resumes(db, skip=depth - 1, limit=1)[0]
+        cursor = (boundary.uploaded_at, boundary.id)
+
+        def new_page():
+            crud.get_resumes(db, limit=page_size, cursor=cursor)
+
+        def old_count():
+            db.query(models.Resume).count()
+
+        crud.get_resume_count(db)  # seed the counter once, like the first request would
+
+        def new_count():
+            crud.get_resume_count(db)
+
+        print(f"page of {page_size} at row {depth}: old (full rows + OFFSET) {_time_ms(old_page, repeats):.1f}ms, "
+              f"new (summary columns + keyset) {_time_ms(new_page, repeats):.2f}ms")
+        print(f"total count: COUNT(*) {_time_ms(old_count, repeats):.1f}ms, counter {_time_ms(new_count, repeats):.2f}ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--depth", type=int, default=95_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep the benchmark's database away from the real one.
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    main(args.rows, args.depth, args.page_size, args.repeats)
@@ -0,0 +1,122 @@
+"""
+Fault-injection harness for the LLM rate limiter, retries and circuit breaker.
+
+Replaces the LLM provider with a fake that, during a "storm" window, fails a
+configurable share of calls with 429 ResourceExhausted (carrying a retry hint)
+or 503 ServiceUnavailable, and then recovers. It fires a steady stream of
+extraction calls through the real retry/governor path and reports outcomes,
+how many calls actually reached the fake upstream, latency, and how the
+circuit breaker moved.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.llm_storm --calls 200 --storm-seconds 3 --error-rate 0.9
+"""
+import argparse
+import asyncio
+import collections
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class StormyProvider:
+    """An LLM provider whose failures follow a storm schedule."""
+
+    name = model_name = "storm"
+
+    def __init__(self, storm_seconds: float, error_rate: float, latency: float):
+        self.started = time.monotonic()
+        self.storm_seconds = storm_seconds
+        self.error_rate = error_rate
+        self.latency = latency
+        self.calls = collections.Counter()
+
+    async def generate(self, prompt, task, json_output=False):
+        from app.services.llm_providers import TransientLLMError
+
+        await asyncio.sleep(self.latency)
+        in_storm = time.monotonic() - self.started < self.storm_seconds
+        if in_storm and random.random() < self.error_rate:
+            if random.random() < 0.5:
+                self.calls["429"] += 1
+                raise TransientLLMError("ResourceExhausted: Quota exceeded. Please retry in 0.2s.")
+            self.calls["503"] += 1
+            raise TransientLLMError("ServiceUnavailable: The model is overloaded.")
+        self.calls["ok"] += 1
+        return '{"name": "Storm Candidate", "core_skills": []}'
+
+
+async def main(calls: int, spacing: float, storm_seconds: float, error_rate: float, latency: float):
+    from app.services import resume_parser
+    from app.services.llm_governor import llm_governor, CircuitOpenError, RateLimitedError, LLMUnavailableError
+
+    provider = StormyProvider(storm_seconds, error_rate, latency)
+    resume_parser.provider = provider
+    outcomes = collections.Counter()
+    latencies = collections.defaultdict(list)
+    breaker_timeline = []
+
+    async def one_call():
+        started = time.perf_counter()
+        try:
+            await resume_parser.call_gemini_for_extraction("resume text")
+            outcome = "success"
+        except CircuitOpenError:
+            outcome = "failed fast (circuit open)"
+        except RateLimitedError:
+            outcome = "failed fast (rate limited)"
+        except LLMUnavailableError:
+            outcome = "gave up after retries"
+        outcomes[outcome] += 1
+        latencies[outcome].append((time.perf_counter() - started) * 1000)
+
+    async def watch_breaker():
+        last_state = None
+        while True:
+            state = llm_governor.get_state()["circuit"]["state"]
+            if state != last_state:
+                breaker_timeline.append((time.monotonic() - provider.started, state))
+                last_state = state
+            await asyncio.sleep(0.05)
+
+    watcher = asyncio.create_task(watch_breaker())
+    tasks = []
+    for _ in range(calls):
+        tasks.append(asyncio.create_task(one_call()))
+        await asyncio.sleep(spacing)
+    await asyncio.gather(*tasks)
+    watcher.cancel()
+
+    print(f"{calls} calls, storm for {storm_seconds}s at {error_rate:.0%} errors")
+    print(f"upstream attempts: {sum(provider.calls.values())} ({dict(provider.calls)})")
+    for outcome, count in outcomes.most_common():
+        timings = latencies[outcome]
+        print(f"  {outcome:<28} {count:>5}  p50={statistics.median(timings):7.1f}ms  max={max(timings):7.1f}ms")
+    print("breaker: " + " -> ".join(f"{state}@{at:.1f}s" for at, state in breaker_timeline))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--spacing", type=float, default=0.03, help="seconds between new calls")
+    parser.add_argument("--storm-seconds", type=float, default=3.0)
+    parser.add_argument("--error-rate", type=float, default=0.9)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency in seconds")
+    args = parser.parse_args()
+
+    # Fast retries and a short cooldown so the run takes seconds, and a private state file.
+    os.environ.setdefault("LLM_GOVERNOR_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="resume-bench-"), "governor.db"))
+    os.environ.setdefault("LLM_RETRY_INITIAL_DELAY", "0.1")
+    os.environ.setdefault("LLM_RETRY_MAX_DELAY", "1")
+    os.environ.setdefault("LLM_BREAKER_COOLDOWN_SECONDS", "1")
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "6000")
+    os.environ.setdefault("GEMINI_API_KEY", "storm-test")
+    sys.path.insert(0, str(BACKEND_DIR))
+    asyncio.run(main(args.calls, args.spacing, args.storm_seconds, args.error_rate, args.latency))
@@ -0,0 +1,160 @@
+"""
+Offline load test for the main API endpoints.
+
+Drives three scenarios one after another, each at a fixed concurrency:
+
+- upload: POST /api/upload with a freshly generated one-page PDF per request
+  (unique text, so every upload misses the result cache and reaches the LLM);
+- list:   GET /api/resumes;
+- detail: GET /api/resumes/{id}, cycling over the resumes uploaded above.
+
+For each it reports throughput (requests/second), p50/p95/p99 latency and the
+non-2xx responses. The LLM is the in-process stub provider (LLM_PROVIDER=stub),
+so no API key or quota is needed and runs are comparable over time.
+
+By default the app runs in this process through httpx's ASGI transport, which is
+quick but shares one event loop between client and server. For numbers that
+include the real server stack, start the API separately with LLM_PROVIDER=stub
+and point the test at it with --base-url.
+
+Run it from the `backend` folder (needs `httpx`):
+
+    python -m benchmarks.load_test --concurrency 16 --uploads 100 --reads 2000
+    LLM_PROVIDER=stub uvicorn app.main:app --workers 4 &
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SKILLS = ["Python", "FastAPI", "SQL", "Docker", "Kubernetes", "React", "AWS", "Go", "Java", "Terraform"]
+
+
+def make_resume_pdf(index: int) -> bytes:
+    """Builds a small, valid one-page PDF with unique resume text (no PDF library needed)."""
+    lines = [
+        f"Load Test Candidate {index}",
+        f"candidate{index}@example.com | +1 555 {index % 1000:03d} {index % 10000:04d}",
+        "SUMMARY",
+        f"Engineer number {index} with experience in {SKILLS[index % len(SKILLS)]} and {SKILLS[(index * 7) % len(SKILLS)]}.",
+        "SKILLS",
+        ", ".join(SKILLS[(index + i) % len(SKILLS)] for i in range(4)),
+        "EXPERIENCE",
+        f"Software Engineer at Example {index % 50}, 2019 - Present",
+    ]
+    content = "BT /F1 11 Tf 50 780 Td 14 TL " + " ".join(
+        "({}) '".format(line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")) for line in lines
+    ) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+    ]
+    body, offsets = "%PDF-1.4\n", []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n"
+    xref_at = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n"
+    return body.encode("latin-1")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(name: str, total: int, concurrency: int, make_request) -> list:
+    """Runs `total` requests with `concurrency` in flight, prints a summary line and returns the responses."""
+    counter = itertools.count()
+    latencies, responses, failures = [], [], {}
+
+    async def worker():
+        while True:
+            index = next(counter)
+            if index >= total:
+                return
+            started = time.perf_counter()
+            try:
+                response = await make_request(index)
+                status = response.status_code
+                responses.append(response)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not (isinstance(status, int) and status < 300):
+                failures[status] = failures.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"  {name:<7} {total:>6} req  {total / elapsed:8.1f} req/s  "
+        f"p50={statistics.median(latencies):8.1f}ms  p95={percentile(latencies, 95):8.1f}ms  "
+        f"p99={percentile(latencies, 99):8.1f}ms  errors={failures or 0}"
+    )
+    return responses
+
+
+async def main(base_url: str, concurrency: int, uploads: int, reads: int):
+    import httpx
+
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=None)
+        lifespan = contextlib.nullcontext()
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None)
+        # ASGITransport doesn't send lifespan events, so run startup (schema, job queue) ourselves.
+        lifespan = app.router.lifespan_context(app)
+
+    pdfs = [make_resume_pdf(index) for index in range(uploads)]
+    print(f"concurrency {concurrency}, {'server ' + base_url if base_url else 'in-process app'}")
+    async with lifespan, client:
+        upload_responses = await run_scenario(
+            "upload", uploads, concurrency,
+            lambda i: client.post("/api/upload", files={"file": (f"load-{i}.pdf", pdfs[i], "application/pdf")}),
+        )
+        resume_ids = [r.json()["id"] for r in upload_responses if r.status_code == 200]
+        await run_scenario("list", reads, concurrency, lambda i: client.get("/api/resumes", params={"limit": 20}))
+        if resume_ids:
+            await run_scenario("detail", reads, concurrency, lambda i: client.get(f"/api/resumes/{resume_ids[i % len(resume_ids)]}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="test a running server instead of an in-process app")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--uploads", type=int, default=100)
+    parser.add_argument("--reads", type=int, default=2000, help="requests for each of the list and detail scenarios")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub LLM delay per call, in seconds (in-process only)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="share of stub LLM calls that fail (in-process only)")
+    args = parser.parse_args()
+
+    if not args.base_url:
+        # An in-process app on the stub LLM, with its own database and limiter state.
+        os.environ["LLM_PROVIDER"] = "stub"
+        os.environ.setdefault("LLM_STUB_LATENCY_SECONDS", str(args.llm_latency))
+        os.environ.setdefault("LLM_STUB_ERROR_RATE", str(args.llm_error_rate))
+        os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "100000")
+        os.environ.setdefault("LLM_MAX_CONCURRENCY", str(max(4, args.concurrency * 2)))
+        os.environ.setdefault("LLM_RETRY_INITIAL_DELAY", "0.1")
+        sys.path.insert(0, str(BACKEND_DIR))
+        os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+        os.environ.setdefault("LLM_GOVERNOR_DB_PATH", os.path.abspath("governor.db"))
+    asyncio.run(main(args.base_url, args.concurrency, args.uploads, args.reads))
@@ -0,0 +1,106 @@
+"""
+Benchmark for job-description matching at a large corpus size.
+
+Builds the in-memory match index from N synthetic resumes (no database needed)
+and times ranking a job description against all of them, plus a single
+incremental insert followed by a query.
+
+It also checks that one resume bringing in more new terms than the index has
+room for (e.g. a very long experience description) is indexed instead of failing.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.match_ranking --resumes 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SKILLS = [
+    "Python", "Java", "Go", "Rust", "C++", "C#", "JavaScript", "TypeScript", "React", "Vue", "Angular", "Node.js",
+    "Django", "FastAPI", "Flask", "Spring Boot", "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka",
+    "Docker", "Kubernetes", "Terraform", "AWS", "GCP", "Azure", "Machine Learning", "Deep Learning", "PyTorch",
+    "TensorFlow", "Pandas", "Spark", "Airflow", "Git", "CI/CD", "GraphQL", "REST APIs", "Linux",
+] + [f"Skill{i}" for i in range(400)]
+SOFT_SKILLS = ["Communication", "Leadership", "Teamwork", "Problem Solving", "Mentoring", "Ownership"]
+WORDS = [f"word{i}" for i in range(5000)] + ["built", "designed", "scaled", "migrated", "led", "services", "pipelines", "platform"]
+
+JOB_DESCRIPTION = """
+We are hiring a Senior Backend Engineer to design and scale data pipelines and platform services.
+You have strong Python and SQL, experience with Kafka, Docker and Kubernetes on AWS, and have built
+REST APIs with FastAPI or Django. Machine Learning exposure and mentoring experience are a plus.
+"""
+
+
+def synthetic_resume(rng: random.Random) -> dict:
+    # Skew skill popularity so a few skills are very common, like in real data.
+    skills = {rng.choice(SKILLS[: rng.choice((20, 40, len(SKILLS)))]) for _ in range(rng.randint(5, 15))}
+    return {
+        "core_skills": sorted(skills),
+        "soft_skills": rng.sample(SOFT_SKILLS, 2),
+        "experience": [
+            {"title": rng.choice(["Software Engineer", "Data Engineer", "Backend Developer", "ML Engineer"]),
+             "description": " ".join(rng.choices(WORDS, k=60))}
+            for _ in range(rng.randint(1, 4))
+        ],
+    }
+
+
+def main(resumes: int, repeats: int, top_k: int):
+    from app.services.matching import MatchIndex
+
+    rng = random.Random(42)
+    documents = [synthetic_resume(rng) for _ in range(resumes)]
+    index = MatchIndex()
+    started = time.perf_counter()
+    for resume_id, extracted_data in enumerate(documents, start=1):
+        index.add_resume(resume_id, extracted_data)
+    index._merge_pending()
+    print(f"indexed {resumes} resumes in {time.perf_counter() - started:.1f}s ({len(index._vocabulary)} terms)")
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        results = index.rank(JOB_DESCRIPTION, top_k=top_k)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"rank top {top_k} of {resumes}: p50={statistics.median(timings):.1f}ms max={max(timings):.1f}ms")
+    print(f"best match: resume {results[0][0]} score={results[0][1]:.3f} skills={results[0][2]}")
+
+    started = time.perf_counter()
+    index.add_resume(resumes + 1, synthetic_resume(rng))
+    index.rank(JOB_DESCRIPTION, top_k=top_k)
+    print(f"one insert + rank: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+def check_vocabulary_growth() -> bool:
+    """One resume with 1000 skills, then one with 1100 new ones: more than the term table's doubled size."""
+    from app.services.matching import MatchIndex
+
+    index = MatchIndex()
+    try:
+        index.add_resume(1, {"core_skills": [f"first{i}" for i in range(1000)]})
+        index.add_resume(2, {"core_skills": [f"second{i}" for i in range(1100)]})
+        results = index.rank("second1099", top_k=1)
+    except Exception as e:
+        print(f"vocabulary growth: {type(e).__name__}: {e} -> FAILED")
+        return False
+    ok = bool(results) and results[0][0] == 2
+    print(f"vocabulary growth: {len(index._vocabulary)} terms from 2 resumes -> {'OK' if ok else 'FAILED'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    main(args.resumes, args.repeats, args.top_k)
+    sys.exit(0 if check_vocabulary_growth() else 1)
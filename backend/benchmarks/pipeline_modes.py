@@ -0,0 +1,137 @@
+"""
+Latency benchmark for the two LLM pipeline modes.
+
+Runs the real pipeline (PDF extraction, prompts, retries, database) against a
+fake LLM provider whose latency follows the usual shape of an LLM call: a fixed
+round-trip cost plus time per input token and per output token. It compares:
+
+- two_pass: extraction call, then analysis call (the original behaviour);
+- single_pass: one structured-output call returning both.
+
+For each mode it reports the end-to-end time and the time until the extracted
+data is available (what the streaming endpoint shows first). The result cache is
+bypassed so every run reaches the LLM.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.pipeline_modes --runs 5 --round-trip 0.8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = BACKEND_DIR.parent / "sample_data" / "Ramakrishna Resume.pdf"
+
+FAKE_EXTRACTION = {
+    "name": "Bench Candidate",
+    "email": "bench@example.com",
+    "phone": "000",
+    "summary": "Backend developer with a few years of Python and cloud experience. " * 3,
+    "core_skills": ["Python", "FastAPI", "SQL", "Docker", "AWS"],
+    "soft_skills": ["Communication", "Teamwork"],
+    "experience": [{"role": "Developer", "company": "Example", "duration": "2021-2024", "description": "Built APIs. " * 10}],
+    "education": [{"degree": "B.Tech", "institution": "Example University", "graduation_year": "2021"}],
+}
+FAKE_ANALYSIS = {
+    "resume_rating": 7,
+    "improvement_areas": "Quantify the impact of each role and tighten the summary. " * 4,
+    "upskill_suggestions": [{"skill": "Kubernetes", "reason": "Most backend roles now expect it."}],
+}
+
+
+class TimedProvider:
+    """An LLM provider with a round-trip + per-token latency model."""
+
+    name = model_name = "timed"
+
+    def __init__(self, round_trip: float, per_1k_input: float, per_1k_output: float):
+        self.round_trip = round_trip
+        self.per_1k_input = per_1k_input
+        self.per_1k_output = per_1k_output
+        self.calls = 0
+
+    async def generate(self, prompt, task, json_output=False):
+        if task == "single_pass":
+            output = {"extracted_data": FAKE_EXTRACTION, "llm_analysis": FAKE_ANALYSIS}
+        elif task == "analysis":
+            output = FAKE_ANALYSIS
+        else:
+            output = FAKE_EXTRACTION
+        text = json.dumps(output)
+        # Roughly 4 characters per token, as in the rate limiter's estimate.
+        delay = self.round_trip + len(prompt) / 4000 * self.per_1k_input + len(text) / 4000 * self.per_1k_output
+        await asyncio.sleep(delay)
+        self.calls += 1
+        return text
+
+
+async def run_mode(mode: str, runs: int, db) -> dict:
+    from app.services import pipeline, upload_storage
+
+    sha256 = upload_storage.hash_file(str(SAMPLE_PDF))
+    totals, first_data = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        extracted_at = None
+
+        async def on_stage(stage, **details):
+            nonlocal extracted_at
+            if stage == "extracted":
+                extracted_at = time.perf_counter()
+
+        await pipeline.analyze_resume(str(SAMPLE_PDF), sha256, "bench.pdf", db, on_stage=on_stage, mode=mode)
+        totals.append(time.perf_counter() - started)
+        first_data.append(extracted_at - started)
+    return {"total": statistics.median(totals), "extracted": statistics.median(first_data)}
+
+
+async def main(runs: int, round_trip: float, per_1k_input: float, per_1k_output: float):
+    from app.db.database import SessionalLocal
+    from app.db.schema import init_db
+    from app.services import pdf_extraction, resume_parser, result_cache
+
+    init_db(check_analytics=False)
+    provider = TimedProvider(round_trip, per_1k_input, per_1k_output)
+    resume_parser.provider = provider
+    # Every run should reach the LLM, so pretend the cache is always cold.
+    result_cache.lookup = lambda db, key: None
+
+    db = SessionalLocal()
+    try:
+        results = {}
+        for mode in ("two_pass", "single_pass"):
+            calls_before = provider.calls
+            results[mode] = await run_mode(mode, runs, db)
+            results[mode]["calls"] = (provider.calls - calls_before) / runs
+    finally:
+        db.close()
+        pdf_extraction.shutdown_pool()
+
+    print(f"{runs} runs per mode, round trip {round_trip}s, {per_1k_input}s/1k input tokens, {per_1k_output}s/1k output tokens")
+    for mode, stats in results.items():
+        print(f"  {mode:<12} calls={stats['calls']:.0f}  extracted data after {stats['extracted'] * 1000:7.0f}ms  total {stats['total'] * 1000:7.0f}ms")
+    saved = 1 - results["single_pass"]["total"] / results["two_pass"]["total"]
+    print(f"single_pass end-to-end is {saved:.0%} faster than two_pass")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--round-trip", type=float, default=0.8, help="fixed seconds per LLM call")
+    parser.add_argument("--per-1k-input", type=float, default=0.05, help="seconds per 1k prompt tokens")
+    parser.add_argument("--per-1k-output", type=float, default=1.0, help="seconds per 1k response tokens")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LLM_GOVERNOR_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="resume-bench-"), "governor.db"))
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "6000")
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    asyncio.run(main(args.runs, args.round_trip, args.per_1k_input, args.per_1k_output))
@@ -0,0 +1,146 @@
+"""
+Prompt-size and latency benchmark for the local text preprocessing step.
+
+For every PDF in the corpus (the repo's sample_data folder by default) plus a
+synthetic multi-page resume with running headers, page numbers, padded
+whitespace and a long references section, it reports:
+
+- resume text tokens before and after preprocessing (4 characters per token);
+- the email / phone found locally, and whether each appears verbatim in the
+  raw text (they are copied, never generated, so this should always be "yes");
+- which sections were recognised and which were dropped for the token budget.
+
+It then runs the real pipeline on each readable PDF against a fake LLM provider whose
+latency grows with prompt size (see benchmarks/pipeline_modes.py), once with
+preprocessing and once with the raw text passed straight through, and reports
+end-to-end latency for both.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.prompt_preprocessing --runs 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_DIR = BACKEND_DIR.parent / "sample_data"
+
+
+def synthetic_pages(base_text: str, page_count: int = 3) -> list:
+    """Spreads a resume over several pages the way word processors export them."""
+    lines = [line for line in base_text.splitlines() if line.strip()]
+    lines += ["", "HOBBIES", "Reading, travelling and chess."]
+    lines += ["", "REFERENCES"] + [f"Referee {i}:   Jane Smith,   Manager,   Example Corp,   jane{i}@example.com" for i in range(40)]
+    per_page = len(lines) // page_count + 1
+    pages = []
+    for number in range(page_count):
+        body = lines[number * per_page:(number + 1) * per_page]
+        padded = [f"   {line}   " for line in body]
+        pages.append("\n\n".join(["Curriculum Vitae  -  Confidential", *padded, f"Page {number + 1} of {page_count}"]))
+    return pages
+
+
+def read_pages(pdf_path: Path) -> list:
+    from app.services import pdf_extraction
+
+    pages, _, _ = pdf_extraction._extract_pages(str(pdf_path), 0, 50, "pdfminer", time.time() + 30)
+    return pages
+
+
+def report_sizes(corpus: dict, token_budget: int):
+    from app.services import preprocessing
+    from app.services.llm_governor import estimate_tokens
+
+    print(f"{'document':<28} {'raw':>6} {'clean':>6} {'saved':>6}  email / phone (verbatim in raw?)  sections (dropped)")
+    total_raw = total_clean = 0
+    for name, pages in corpus.items():
+        raw_text = "".join(f"{page_text}\n" for page_text in pages if page_text)
+        result = preprocessing.preprocess(pages, token_budget=token_budget)
+        raw_tokens, clean_tokens = estimate_tokens(raw_text), result.tokens
+        total_raw += raw_tokens
+        total_clean += clean_tokens
+        verbatim = lambda value: "-" if value is None else ("yes" if value in raw_text else "NO")
+        print(
+            f"{name[:28]:<28} {raw_tokens:>6} {clean_tokens:>6} {1 - clean_tokens / raw_tokens:>6.0%}  "
+            f"{result.email} ({verbatim(result.email)}) / {result.phone} ({verbatim(result.phone)})  "
+            f"{','.join(result.sections)} ({','.join(result.dropped_sections) or '-'}{', truncated' if result.truncated else ''})"
+        )
+    print(f"{'total':<28} {total_raw:>6} {total_clean:>6} {1 - total_clean / total_raw:>6.0%}")
+
+
+async def report_latency(pdf_paths: list, runs: int):
+    from app.db.database import SessionalLocal
+    from app.db.schema import init_db
+    from app.services import pdf_extraction, pipeline, preprocessing, resume_parser, result_cache, upload_storage
+    from benchmarks.pipeline_modes import TimedProvider
+
+    init_db(check_analytics=False)
+    resume_parser.provider = TimedProvider(round_trip=0.3, per_1k_input=0.4, per_1k_output=1.0)
+    # Every run should reach the LLM, so pretend the cache is always cold.
+    result_cache.lookup = lambda db, key: None
+    real_preprocess = preprocessing.preprocess
+
+    def passthrough(pages, token_budget=None):
+        text = "".join(f"{page_text}\n" for page_text in pages if page_text)
+        return preprocessing.PreprocessedResume(text=text, full_text=text)
+
+    db = SessionalLocal()
+    try:
+        print(f"\nend-to-end pipeline latency (median of {runs}, two_pass, fake LLM)")
+        for pdf_path in pdf_paths:
+            sha256 = upload_storage.hash_file(str(pdf_path))
+            timings = {}
+            for label, preprocess in (("raw", passthrough), ("preprocessed", real_preprocess)):
+                preprocessing.preprocess = preprocess
+                samples = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    await pipeline.analyze_resume(str(pdf_path), sha256, pdf_path.name, db, mode="two_pass")
+                    samples.append(time.perf_counter() - started)
+                timings[label] = statistics.median(samples)
+            print(f"  {pdf_path.name[:28]:<28} raw {timings['raw'] * 1000:6.0f}ms  preprocessed {timings['preprocessed'] * 1000:6.0f}ms")
+    finally:
+        preprocessing.preprocess = real_preprocess
+        db.close()
+        pdf_extraction.shutdown_pool()
+
+
+def main(corpus_dir: Path, runs: int, token_budget: int):
+    corpus, readable = {}, []
+    for pdf_path in sorted(corpus_dir.glob("*.pdf")):
+        try:
+            pages = read_pages(pdf_path)
+        except Exception as e:
+            print(f"skipping {pdf_path.name}: {e}")
+            continue
+        if any(page_text.strip() for page_text in pages):
+            corpus[pdf_path.name] = pages
+            readable.append(pdf_path)
+    if corpus:
+        longest = max(corpus.values(), key=lambda pages: sum(map(len, pages)))
+        corpus["synthetic (3 pages)"] = synthetic_pages("".join(longest))
+
+    report_sizes(corpus, token_budget)
+    asyncio.run(report_latency(readable, runs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=SAMPLE_DIR, help="folder of PDF resumes")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--token-budget", type=int, default=None, help="override LLM_PROMPT_TOKEN_BUDGET for the size report")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LLM_GOVERNOR_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="resume-bench-"), "governor.db"))
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "6000")
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    sys.path.insert(0, str(BACKEND_DIR))
+    corpus_dir = args.corpus.resolve()
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    main(corpus_dir, args.runs, args.token_budget)
@@ -0,0 +1,157 @@
+"""
+Bulk re-analysis throughput and resumability, against the stub LLM.
+
+Seeds a throwaway SQLite database with N resumes whose analysis is from an old
+version, then for each concurrency level marks them all stale again and times a
+full `reanalysis` run (resumes per second, batches committed as they finish).
+
+Then it checks the checkpointing: a run is cancelled halfway through, resumed
+with `start_run`, and must finish the same run without redoing the committed
+batches, leaving the analytics counters consistent (`analytics.check`).
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.reanalysis --resumes 500 --llm-latency 0.2 --concurrency 1,4,16
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+EXTRACTED_DATA = {
+    "name": "Candidate", "summary": "Engineer. " * 30,
+    "core_skills": ["Python", "SQL", "Docker"], "soft_skills": ["Communication"],
+    "experience": [{"title": "Engineer", "company": "Example", "dates": "2020 - Present", "description": "Built things. " * 20}],
+}
+OLD_ANALYSIS = {"resume_rating": 5, "improvement_areas": "Old advice. " * 30, "upskill_suggestions": ["Cobol: still around"]}
+
+
+def seed(rows: int):
+    from app.db import analytics, models
+    from app.db.database import SessionalLocal, engine
+    from app.db.schema import init_db
+
+    init_db(check_analytics=False)
+    started = datetime.datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(models.Resume.__table__.insert(), [
+            {
+                "filename": f"resume-{i}.pdf", "name": f"Candidate {i}", "uploaded_at": started + datetime.timedelta(minutes=i),
+                "extracted_data": EXTRACTED_DATA, "llm_analysis": OLD_ANALYSIS, "analysis_version": "old",
+            }
+            for i in range(rows)
+        ])
+    db = SessionalLocal()
+    try:
+        analytics.rebuild(db)
+    finally:
+        db.close()
+
+
+def mark_all_stale():
+    from sqlalchemy import update
+
+    from app.db import models
+    from app.db.database import engine
+
+    with engine.begin() as conn:
+        conn.execute(update(models.Resume.__table__).values(analysis_version="old"))
+
+
+def start(restart: bool):
+    from app.db.database import SessionalLocal
+    from app.services import reanalysis
+
+    db = SessionalLocal()
+    try:
+        return reanalysis.start_run(db, restart=restart)
+    finally:
+        db.close()
+
+
+def time_full_run(concurrency: int, batch_size: int) -> dict:
+    from app.services import reanalysis
+
+    mark_all_stale()
+    db_run = start(restart=True)
+    started = time.perf_counter()
+    result = asyncio.run(reanalysis.run(db_run.id, batch_size=batch_size, concurrency=concurrency))
+    result["wall_seconds"] = time.perf_counter() - started
+    return result
+
+
+def check_resume(rows: int, concurrency: int, batch_size: int):
+    from app.db import analytics, crud, models
+    from app.db.database import SessionalLocal
+    from app.services import reanalysis, resume_parser
+
+    mark_all_stale()
+    first = start(restart=True)
+
+    async def interrupted():
+        task = asyncio.current_task()
+
+        def on_progress(run):
+            if run["processed"] >= rows // 2:
+                task.cancel()
+
+        try:
+            await reanalysis.run(first.id, batch_size=batch_size, concurrency=concurrency, on_progress=on_progress)
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(interrupted())
+    db = SessionalLocal()
+    try:
+        paused = crud.get_reanalysis_run(db, first.id)
+        print(f"  cancelled: run {paused.status} at resume {paused.last_resume_id}, {paused.processed}/{paused.total} done")
+    finally:
+        db.close()
+
+    resumed = start(restart=False)
+    result = asyncio.run(reanalysis.run(resumed.id, batch_size=batch_size, concurrency=concurrency))
+    db = SessionalLocal()
+    try:
+        stale = crud.count_stale_resumes(db, resume_parser.ANALYSIS_VERSION)
+        current = db.query(models.Resume).filter(models.Resume.analysis_version == resume_parser.ANALYSIS_VERSION).count()
+        differences = analytics.check(db)
+    finally:
+        db.close()
+    ok = resumed.id == first.id and result["status"] == "succeeded" and stale == 0 and current == rows and not differences
+    print(f"  resumed: same run {resumed.id == first.id}, {result['status']}, {result['processed']} processed in total, "
+          f"{stale} stale left, analytics differences {len(differences)} -> {'OK' if ok else 'FAILED'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per stub analysis call")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    # Keep the benchmark's database away from the real one, and take the governor's quotas out of the way.
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["LLM_STUB_LATENCY_SECONDS"] = str(args.llm_latency)
+    os.environ["LLM_STUB_LATENCY_JITTER"] = "0"
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "64")
+
+    seed(args.resumes)
+    print(f"{args.resumes} stale resumes, stub analysis call {args.llm_latency * 1000:.0f}ms, batches of {args.batch_size}:")
+    levels = [int(level) for level in args.concurrency.split(",")]
+    for concurrency in levels:
+        result = time_full_run(concurrency, args.batch_size)
+        print(f"  concurrency {concurrency:>3}: {result['processed']} re-analyzed in {result['wall_seconds']:6.1f}s "
+              f"-> {result['processed'] / result['wall_seconds']:6.1f} resumes/s ({result['failed']} failed)")
+    print("interrupt and resume:")
+    sys.exit(0 if check_resume(args.resumes, max(levels), args.batch_size) else 1)
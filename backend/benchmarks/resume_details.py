@@ -0,0 +1,200 @@
+"""
+Storage size and GET /api/resumes/{id} latency, before and after compression,
+fast serialization and the details cache.
+
+Seeds two throwaway SQLite databases with the same N resumes: one with the JSON
+blobs stored as plain JSON text (the old layout) and one through the current
+models (compressed). It reports the database file sizes and the average blob
+size per row, then times the details endpoint:
+
+- "old": the previous handler (ORM row, Pydantic response_model, stdlib JSON);
+- "cold": the current endpoint with the details cache cleared before every call;
+- "hot": the current endpoint answering from the details cache;
+- "304": a conditional request with the ETag from an earlier response.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.resume_details --rows 2000 --requests 500
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Roughly the size and shape of a real two-page resume analysis.
+EXTRACTED_DATA = {
+    "name": "Bench Candidate",
+    "email": "bench@example.com",
+    "phone": "+1 555 0100",
+    "summary": "Backend engineer with eight years of experience building APIs and data pipelines. " * 4,
+    "core_skills": ["Python", "FastAPI", "SQL", "PostgreSQL", "Docker", "Kubernetes", "AWS", "Terraform", "Redis", "Kafka"],
+    "soft_skills": ["Communication", "Mentoring", "Ownership"],
+    "experience": [
+        {
+            "title": f"Senior Engineer {i}",
+            "company": f"Company {i}",
+            "dates": "2018 - 2024",
+            "description": "Designed and shipped services handling millions of requests per day; led migrations and on-call. " * 3,
+        }
+        for i in range(4)
+    ],
+    "education": [{"degree": "B.Tech Computer Science", "institution": "Example University", "dates": "2012 - 2016"}],
+    "projects": [{"name": f"Project {i}", "description": "An open-source tool for parsing and indexing documents. " * 2} for i in range(3)],
+}
+LLM_ANALYSIS = {
+    "resume_rating": 7,
+    "improvement_areas": "Quantify the impact of each role and trim the summary to three lines. " * 4,
+    "upskill_suggestions": [f"Suggestion {i}: learn a complementary technology and build a project with it." for i in range(5)],
+}
+
+
+def seed_legacy(path: str, rows: int):
+    """The old layout: same table, but the blobs in plain JSON columns."""
+    from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, create_engine
+
+    engine = create_engine(f"sqlite:///{path}")
+    table = Table(
+        "resumes", MetaData(),
+        Column("id", Integer, primary_key=True), Column("filename", String), Column("uploaded_at", DateTime),
+        Column("name", String), Column("email", String), Column("phone", String),
+        Column("extracted_data", JSON), Column("llm_analysis", JSON),
+    )
+    table.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(table.insert(), rows_for(rows))
+    return engine
+
+
+def rows_for(rows: int) -> list:
+    started = datetime.datetime(2020, 1, 1)
+    return [
+        {
+            "filename": f"resume-{i}.pdf",
+            "name": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "uploaded_at": started + datetime.timedelta(minutes=i),
+            "extracted_data": dict(EXTRACTED_DATA, name=f"Candidate {i}"),
+            "llm_analysis": LLM_ANALYSIS,
+        }
+        for i in range(rows)
+    ]
+
+
+def storage_report(label: str, engine, path: str):
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("VACUUM")
+        blob_bytes = conn.execute(text("SELECT AVG(LENGTH(extracted_data) + LENGTH(llm_analysis)) FROM resumes")).scalar()
+    # The app's database runs in WAL mode, where recent writes (the VACUUM included) sit
+    # in the -wal file until a checkpoint. Move them into the main file before measuring it.
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = sum(os.path.getsize(name) for name in (path, path + "-wal") if os.path.exists(name))
+    print(f"  {label:<10} file {size / 1024 / 1024:7.2f} MB, blobs {blob_bytes:7.0f} bytes/row")
+
+
+def _latency(client, rows: int, requests: int, before=None, headers=None) -> tuple:
+    timings = []
+    for _ in range(requests):
+        resume_id = random.randint(1, rows)
+        if before is not None:
+            before(resume_id)
+        started = time.perf_counter()
+        response = client.get(f"/api/resumes/{resume_id}", headers=headers(resume_id) if headers else None)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code in (200, 304), response.status_code
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main(rows: int, requests: int):
+    from fastapi import Depends, FastAPI, HTTPException
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import models
+    from app.db.database import engine
+    from app.main import app
+    from app.schemas import resume as resume_schema
+    from app.services import resume_details
+
+    legacy_path = os.path.abspath("legacy.db")
+    legacy_engine = seed_legacy(legacy_path, rows)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(models.Resume.__table__.insert(), rows_for(rows))
+
+    print(f"storage ({rows} rows):")
+    storage_report("old", legacy_engine, legacy_path)
+    storage_report("new", engine, os.path.abspath("resume_analyzer.db"))
+
+    # The handler as it was: ORM row in, Pydantic validation and stdlib JSON out.
+    LegacySession = sessionmaker(bind=legacy_engine)
+    old_app = FastAPI()
+
+    def get_legacy_db():
+        db = LegacySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    from sqlalchemy import JSON, Column, DateTime, Integer, String
+    from sqlalchemy.orm import declarative_base
+
+    LegacyBase = declarative_base()
+
+    class LegacyResume(LegacyBase):
+        __tablename__ = "resumes"
+        id = Column(Integer, primary_key=True)
+        filename = Column(String)
+        uploaded_at = Column(DateTime)
+        name = Column(String)
+        email = Column(String)
+        phone = Column(String)
+        extracted_data = Column(JSON)
+        llm_analysis = Column(JSON)
+
+    @old_app.get("/api/resumes/{resume_id}", response_model=resume_schema.Resume)
+    def old_details(resume_id: int, db=Depends(get_legacy_db)):
+        db_resume = db.query(LegacyResume).filter(LegacyResume.id == resume_id).first()
+        if db_resume is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        return db_resume
+
+    etags = {}
+
+    def etag_for(resume_id):
+        return {"If-None-Match": etags[resume_id]}
+
+    print(f"GET /api/resumes/{{id}} over {requests} requests (p50 / p99):")
+    with TestClient(old_app) as client:
+        print("  old   %6.2f / %6.2f ms" % _latency(client, rows, requests))
+    with TestClient(app) as client:
+        print("  cold  %6.2f / %6.2f ms" % _latency(client, rows, requests, before=resume_details.invalidate))
+        # Warm the cache (and note every ETag) for the hot and 304 runs.
+        for resume_id in range(1, rows + 1):
+            etags[resume_id] = client.get(f"/api/resumes/{resume_id}").headers["etag"]
+        print("  hot   %6.2f / %6.2f ms" % _latency(client, rows, requests))
+        print("  304   %6.2f / %6.2f ms" % _latency(client, rows, requests, headers=etag_for))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    # Keep the benchmark's database away from the real one.
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    os.environ.setdefault("RESUME_DETAIL_CACHE_MAX_ENTRIES", str(args.rows))
+    main(args.rows, args.requests)
@@ -0,0 +1,123 @@
+"""
+Startup cost of the API: import time and time to first request per worker.
+
+Each measurement runs in a fresh Python process in an empty temp folder:
+
+- "import": how long `import app.main` takes, which heavy libraries it loaded
+  (pdfplumber, the Gemini SDK, pyarrow should all stay unloaded) and whether
+  it left any files behind (it shouldn't create the database by itself).
+- "first request": from launching `uvicorn app.main:app` to the first
+  successful GET /api/resumes, which includes the lifespan startup.
+
+Exits with status 1 if importing has side effects or a median goes over its
+budget, so it can run in CI as a regression check.
+
+Run it from the `backend` folder:
+
+    python -m benchmarks.startup --runs 5 --import-budget-ms 2500 --ready-budget-ms 5000
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Only loaded when something actually needs them (an upload, a Parquet export).
+LAZY_MODULES = ("pdfplumber", "google.generativeai", "pyarrow")
+
+IMPORT_PROBE = f"""
+import json, os, sys, time
+started = time.perf_counter()
+import app.main
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{
+    "import_ms": elapsed_ms,
+    "loaded": [name for name in {LAZY_MODULES!r} if name in sys.modules],
+    "files": sorted(os.listdir(".")),
+}}))
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR), LLM_PROVIDER=os.getenv("LLM_PROVIDER", "stub"))
+    env.setdefault("PYTHONWARNINGS", "ignore")
+    return env
+
+
+def measure_import() -> dict:
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=workdir, env=_env(), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(timeout: float = 60) -> float:
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/resumes", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("the server didn't answer in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(runs: int, import_budget_ms: float, ready_budget_ms: float) -> int:
+    imports = [measure_import() for _ in range(runs)]
+    import_ms = statistics.median(run["import_ms"] for run in imports)
+    ready_ms = statistics.median(measure_first_request() for _ in range(runs))
+
+    loaded = sorted({name for run in imports for name in run["loaded"]})
+    files = sorted({name for run in imports for name in run["files"]})
+    print(f"import app.main:     {import_ms:7.0f}ms (median of {runs})")
+    print(f"first request ready: {ready_ms:7.0f}ms (median of {runs}, uvicorn, 1 worker)")
+    print(f"lazy modules loaded at import: {', '.join(loaded) or 'none'}")
+    print(f"files created by import:       {', '.join(files) or 'none'}")
+
+    failures = []
+    if loaded:
+        failures.append("importing the app loaded libraries that should stay lazy")
+    if files:
+        failures.append("importing the app created files")
+    if import_budget_ms is not None and import_ms > import_budget_ms:
+        failures.append(f"import took longer than {import_budget_ms:.0f}ms")
+    if ready_budget_ms is not None and ready_ms > ready_budget_ms:
+        failures.append(f"the first request took longer than {ready_budget_ms:.0f}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=None)
+    parser.add_argument("--ready-budget-ms", type=float, default=None)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.import_budget_ms, args.ready_budget_ms))
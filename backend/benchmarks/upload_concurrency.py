@@ -0,0 +1,98 @@
+"""
+Concurrency benchmark for the upload pipeline.
+
+It fires N uploads at the app (with a fake, slow LLM so no API key is needed)
+and, while they are in flight, keeps measuring how long `GET /api/resumes` takes.
+If the upload path blocks the event loop, the list latency jumps to roughly the
+upload duration; if it doesn't, it stays flat at the idle baseline.
+
+It exits non-zero (like benchmarks/startup.py) if any upload failed, if the busy
+p50 is more than `--max-p50-ratio` times the idle p50 (and more than
+`--p50-slack-ms` above it), or if any busy request took longer than `--max-busy-ms`
+(half of one LLM call by default, far below what a blocked loop would cost).
+
+Run it from the `backend` folder (needs `httpx`):
+
+    python -m benchmarks.upload_concurrency --uploads 20 --llm-delay 1.0
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = BACKEND_DIR.parent / "sample_data" / "Ramakrishna Resume.pdf"
+
+
+async def _measure_list_latency(client, samples: int) -> list:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        response = await client.get("/api/resumes")
+        response.raise_for_status()
+        timings.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.05)
+    return timings
+
+
+async def main(uploads: int, llm_delay: float, samples: int, max_p50_ratio: float, p50_slack_ms: float, max_busy_ms: float) -> int:
+    import httpx
+    from app.main import app
+    from app.services import resume_parser
+    from app.services.llm_providers import StubProvider
+
+    # Swap the real Gemini calls for the slow offline stub so the test is repeatable.
+    resume_parser.provider = StubProvider(latency=llm_delay, jitter=0)
+    pdf_bytes = SAMPLE_PDF.read_bytes()
+
+    # ASGITransport doesn't send lifespan events, so run startup (schema, job queue) ourselves.
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        idle = await _measure_list_latency(client, samples)
+
+        upload_tasks = [
+            asyncio.create_task(client.post("/api/upload", files={"file": ("bench.pdf", pdf_bytes, "application/pdf")}))
+            for _ in range(uploads)
+        ]
+        await asyncio.sleep(0.1)
+        busy = await _measure_list_latency(client, samples)
+        responses = await asyncio.gather(*upload_tasks)
+
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    print(f"uploads in flight: {uploads} (LLM delay {llm_delay}s per call), failed: {len(failed)}")
+    print(f"GET /api/resumes idle  p50={statistics.median(idle):.1f}ms max={max(idle):.1f}ms")
+    print(f"GET /api/resumes busy  p50={statistics.median(busy):.1f}ms max={max(busy):.1f}ms")
+
+    idle_p50, busy_p50 = statistics.median(idle), statistics.median(busy)
+    p50_budget = max(idle_p50 * max_p50_ratio, idle_p50 + p50_slack_ms)
+    max_busy_ms = max_busy_ms if max_busy_ms is not None else llm_delay * 1000 / 2
+    failures = []
+    if failed:
+        failures.append(f"{len(failed)} upload(s) failed with status {sorted(set(failed))}")
+    if busy_p50 > p50_budget:
+        failures.append(f"busy p50 {busy_p50:.1f}ms is over {p50_budget:.1f}ms (idle p50 {idle_p50:.1f}ms)")
+    if max(busy) > max_busy_ms:
+        failures.append(f"a list request took {max(busy):.1f}ms while uploads ran, over {max_busy_ms:.0f}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--llm-delay", type=float, default=1.0)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--max-p50-ratio", type=float, default=3.0)
+    parser.add_argument("--p50-slack-ms", type=float, default=50.0)
+    parser.add_argument("--max-busy-ms", type=float, default=None, help="default: half of --llm-delay")
+    args = parser.parse_args()
+
+    # Keep the benchmark's database away from the real one.
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="resume-bench-"))
+    sys.exit(asyncio.run(main(args.uploads, args.llm_delay, args.samples, args.max_p50_ratio, args.p50_slack_ms, args.max_busy_ms)))
@@ -0,0 +1,102 @@
+"""
+Peak-memory load test for upload ingestion.
+
+Starts the API in a child process (with a fake LLM, so no API key is needed),
+fires N concurrent uploads of a padded ~4 MB PDF at it, and reports the server's
+peak resident memory (VmHWM from /proc, so Linux only) plus the per-upload share
+above the idle baseline. Every upload gets different padding, so none of them
+are served from the result cache.
+
+Run it from the `backend` folder (needs `httpx`):
+
+    python -m benchmarks.upload_memory --uploads 50
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = BACKEND_DIR.parent / "sample_data" / "Ramakrishna Resume.pdf"
+
+
+def serve(port: int):
+    """Runs the app with the LLM calls replaced by a fast fake."""
+    import uvicorn
+    from app.main import app
+    from app.services import resume_parser
+    from app.services.llm_providers import StubProvider
+
+    resume_parser.provider = StubProvider(latency=0.5, jitter=0)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _read_kb(pid: int, field: str) -> int:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    return 0
+
+
+async def run_load(port: int, uploads: int, pad_mb: float):
+    import httpx
+
+    base_pdf = SAMPLE_PDF.read_bytes()
+    padding = b"\n%" + b"x" * int(pad_mb * 1024 * 1024)
+    bodies = [base_pdf + padding + f"\n%{i}\n".encode() for i in range(uploads)]
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/api/upload", files={"file": (f"bench-{i}.pdf", body, "application/pdf")})
+            for i, body in enumerate(bodies)
+        ])
+        elapsed = time.perf_counter() - started
+    return [r.status_code for r in responses], elapsed
+
+
+def main(uploads: int, pad_mb: float, port: int):
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.upload_memory", "--serve", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR), "UPLOAD_DIR": os.path.join(workdir, "uploads")},
+    )
+    try:
+        import httpx
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.2)
+        idle_kb = _read_kb(server.pid, "VmRSS")
+        statuses, elapsed = asyncio.run(run_load(port, uploads, pad_mb))
+        peak_kb = _read_kb(server.pid, "VmHWM")
+    finally:
+        server.terminate()
+        server.wait()
+
+    ok = sum(1 for code in statuses if code == 200)
+    print(f"{uploads} concurrent uploads of ~{pad_mb:.1f} MB: {ok} succeeded in {elapsed:.2f}s")
+    print(f"server RSS idle={idle_kb / 1024:.1f} MB peak={peak_kb / 1024:.1f} MB")
+    print(f"peak growth per concurrent upload: {(peak_kb - idle_kb) / 1024 / uploads:.2f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--pad-mb", type=float, default=4.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        os.chdir(os.path.dirname(os.environ.get("UPLOAD_DIR", tempfile.mkdtemp())))
+        serve(args.port)
+    else:
+        main(args.uploads, args.pad_mb, args.port)
@@ -0,0 +1,67 @@
+"""
+Gunicorn settings for running the API in production. From the `backend` folder:
+
+    gunicorn app.main:app
+
+Gunicorn reads this file automatically. What it sets up:
+
+- The app is imported once in the master process (preload_app), and the workers
+  are forked from it, so every worker shares the already-loaded code instead of
+  importing FastAPI, SQLAlchemy, NumPy etc. itself.
+- Schema setup runs once, in the master, before any worker starts. The workers
+  skip it (DB_INIT_ON_STARTUP=false).
+- Nothing that holds a connection or a thread is created before the fork. The
+  master's database connections are discarded, and the Gemini client and the
+  PDF process pool are created lazily inside each worker.
+"""
+import importlib
+import multiprocessing
+import os
+
+# Must be set before the app is imported (which happens right after this file is read).
+os.environ.setdefault("DB_INIT_ON_STARTUP", "false")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# LLM calls can take a while, and uploads wait for them.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+# Libraries imported (not initialized) in the master so the workers share them.
+# The Gemini SDK is only worth it when it's the provider actually in use.
+SHARED_MODULES = ["pdfminer.high_level", "pdfplumber"]
+if os.getenv("LLM_PROVIDER", "gemini") == "gemini":
+    SHARED_MODULES.append("google.generativeai")
+
+
+def on_starting(server):
+    from app.db.database import engine
+    from app.db.schema import init_db
+
+    init_db()
+    # Don't hand the master's pooled connections down to the workers.
+    engine.dispose()
+
+    for module in SHARED_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def post_fork(server, worker):
+    from app.db.database import engine
+
+    # Forget (without closing) any connection inherited from the master, so the
+    # worker opens its own. Closing it here would break it for the master too.
+    engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # With PROMETHEUS_MULTIPROC_DIR set, a dead worker's metric files must be cleaned up.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)